@@ -0,0 +1,277 @@
+# benchmarks/run_benchmarks.py
+"""
+Mede os caminhos críticos do projeto com dados sintéticos e um LLM simulado (sem Ollama).
+
+Uso, a partir da raiz do repositório:
+
+    python -m benchmarks.run_benchmarks --registros 200000 --chamadas 100000
+    python -m benchmarks.run_benchmarks --comparar benchmarks/results/anterior.json
+
+Cada etapa roda em um processo novo, de modo que o pico de memória (RSS) informado é o
+da etapa. O resultado é gravado em JSON para comparar execuções entre commits.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import scipy.stats as st
+
+import config
+from .synthetic import make_dataset, write_csv
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+RESULTS_DIR = os.path.join(config.BASE_DIR, "benchmarks", "results")
+
+
+def _pico_rss_mb():
+    """Pico de memória residente do processo atual, em MB."""
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KB; macOS, em bytes.
+        return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+    import psutil
+    return psutil.Process().memory_info().peak_wset / (1024 * 1024)
+
+
+def _cronometrar(funcao, repeticoes):
+    """Executa `funcao` `repeticoes` vezes; retorna o menor tempo e o último resultado."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return min(tempos), resultado
+
+
+def _distribuicoes_sinteticas():
+    # Utilização de ~80% com BENCH_UNIDADES unidades: fila relevante sem divergir.
+    return {
+        "chegadas": (st.expon, (0, 1.5)),
+        "atendimento_humano": (st.lognorm, (0.7, 0, 1.2)),
+        "atendimento_simples": (st.lognorm, (0.7, 0, 0.8)),
+        "servico_bombeiros": (st.lognorm, (0.8, 0, 15.0)),
+    }
+
+
+BENCH_UNIDADES = 14
+
+
+def etapa_carregamento_csv(opcoes, diretorio):
+    from src.utils.data_loader import load_dataset
+    config.CACHE_DIR = diretorio
+    caminho = opcoes['csv']
+    segundos, df = _cronometrar(lambda: load_dataset(caminho, use_snapshot=False), opcoes['repeticoes'])
+    load_dataset(caminho)  # grava o snapshot Parquet
+    segundos_snapshot, _ = _cronometrar(lambda: load_dataset(caminho), opcoes['repeticoes'])
+    return {
+        'segundos': segundos,
+        'registros': len(df),
+        'registros_por_segundo': len(df) / segundos,
+        'segundos_snapshot': segundos_snapshot,
+        'registros_por_segundo_snapshot': len(df) / segundos_snapshot,
+    }
+
+
+def etapa_ajuste_distribuicoes(opcoes, diretorio):
+    from src.analysis.distribution_fitter import find_best_distribution
+    df = make_dataset(opcoes['registros'], opcoes['seed'])
+    serie = ((df['Available DtTm'] - df['On Scene DtTm']).dt.total_seconds() / 60.0).rename("Serviço (sintético)")
+    segundos, _ = _cronometrar(
+        lambda: find_best_distribution(serie, use_cache=False, parallel=False, subsample=opcoes['subamostra']),
+        opcoes['repeticoes']
+    )
+    return {'segundos': segundos, 'pontos': len(serie), 'pontos_por_segundo': len(serie) / segundos}
+
+
+def etapa_geracao_cenarios(opcoes, diretorio):
+    from src.agent.call_generator import generate_call_scenarios
+    df = make_dataset(opcoes['registros'], opcoes['seed'])
+    n = opcoes['chamadas']
+    segundos, cenarios = _cronometrar(lambda: generate_call_scenarios(df, n, seed=opcoes['seed']), opcoes['repeticoes'])
+    return {'segundos': segundos, 'chamadas': len(cenarios), 'chamadas_por_segundo': len(cenarios) / segundos}
+
+
+def etapa_triagem(opcoes, diretorio):
+    from src.agent.call_generator import CallScenarioSource
+    from src.agent.fast_triage import call_type_profiles
+    from .stubs import make_offline_agent
+    df = make_dataset(min(opcoes['registros'], 10000), opcoes['seed'])
+    fonte = CallScenarioSource(df, num_chamadas=opcoes['chamadas'], seed=opcoes['seed'])
+    textos = [fonte.text(id_frase) for id_frase in fonte]
+
+    caminho_cache = os.path.join(diretorio, "triagem.sqlite")
+    perfis_tipo = call_type_profiles(df) if opcoes['triagem_rapida'] else None
+    agente = make_offline_agent(caminho_cache, latencia=opcoes['latencia_llm'],
+                                triagem_rapida=opcoes['triagem_rapida'], perfis_tipo=perfis_tipo)
+    inicio = time.perf_counter()
+    agente.classify_calls(fonte.phrases)
+    segundos_frio = time.perf_counter() - inicio
+    segundos_quente, _ = _cronometrar(lambda: agente.classify_calls(textos), opcoes['repeticoes'])
+    estatisticas = agente.cache.stats()
+    agente.cache.close()
+    rapida = agente.triagem_rapida.stats() if agente.triagem_rapida is not None else {}
+    return {
+        **{f'triagem_rapida_{chave}': valor for chave, valor in rapida.items()},
+        'segundos': segundos_frio + segundos_quente,
+        'frases_distintas': len(fonte.phrases),
+        'segundos_cache_frio': segundos_frio,
+        'chamadas_por_segundo_cache_frio': len(fonte.phrases) / segundos_frio,
+        'chamadas': len(textos),
+        'segundos_cache_quente': segundos_quente,
+        'chamadas_por_segundo_cache_quente': len(textos) / segundos_quente,
+        'taxa_acerto_cache': estatisticas['taxa_acerto'],
+    }
+
+
+def _etapa_simulacao(opcoes, motor):
+    from src.simulation.environment import run_simulation
+    from src.utils import instrumentation
+
+    # Contadores próprios da etapa, ligados mesmo com INSTRUMENTACAO = False: os eventos
+    # por segundo vêm do que o motor SimPy de fato processou ('simpy_eventos').
+    instrumentation.registro = instrumentation.RunInstrumentation(ativo=True, intervalo_memoria=None)
+    rng = np.random.default_rng(opcoes['seed'])
+    prioridades = rng.integers(0, 3, opcoes['chamadas']).tolist()
+    decisoes = np.where(rng.random(opcoes['chamadas']) < 0.4, 'Simples', 'Complexo').tolist()
+    triagens = list(zip(prioridades, decisoes))
+    dists = _distribuicoes_sinteticas()
+    segundos, stats = _cronometrar(
+        lambda: run_simulation(BENCH_UNIDADES, triagens, dists, rng=np.random.default_rng(opcoes['seed']), motor=motor),
+        opcoes['repeticoes']
+    )
+    chamadas = stats['total_chamadas']
+    resultado = {
+        'segundos': segundos,
+        'chamadas': chamadas,
+        'chamadas_por_segundo': chamadas / segundos,
+        'espera_media': stats['resumo']['tempos_espera_bombeiros']['media'],
+    }
+    # Só o motor SimPy tem eventos para contar; o "rapido" informa apenas chamadas por segundo.
+    contadores = instrumentation.registro.contadores
+    if contadores.get('simpy_segundos'):
+        resultado['eventos'] = contadores['simpy_eventos'] // opcoes['repeticoes']
+        resultado['eventos_por_segundo'] = contadores['simpy_eventos'] / contadores['simpy_segundos']
+    return resultado
+
+
+def etapa_simulacao_simpy(opcoes, diretorio):
+    return _etapa_simulacao(opcoes, "simpy")
+
+
+def etapa_simulacao_rapido(opcoes, diretorio):
+    return _etapa_simulacao(opcoes, "rapido")
+
+
+ETAPAS = {
+    'carregamento_csv': etapa_carregamento_csv,
+    'ajuste_distribuicoes': etapa_ajuste_distribuicoes,
+    'geracao_cenarios': etapa_geracao_cenarios,
+    'triagem': etapa_triagem,
+    'simulacao_simpy': etapa_simulacao_simpy,
+    'simulacao_rapido': etapa_simulacao_rapido,
+}
+
+
+def _executar_etapa(nome, opcoes, diretorio):
+    rss_inicial = _pico_rss_mb()
+    resultado = ETAPAS[nome](opcoes, diretorio)
+    resultado['pico_rss_mb'] = _pico_rss_mb()
+    resultado['rss_inicial_mb'] = rss_inicial
+    return resultado
+
+
+def _commit_atual():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=config.BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmarks(opcoes, etapas=tuple(ETAPAS)):
+    """Executa as etapas pedidas, cada uma em um processo novo, e retorna o relatório."""
+    contexto = multiprocessing.get_context("spawn")
+    relatorio = {
+        'commit': _commit_atual(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'parametros': {chave: valor for chave, valor in opcoes.items() if chave != 'csv'},
+        'etapas': {},
+    }
+    with tempfile.TemporaryDirectory(prefix="bench_simoia_") as diretorio:
+        if 'carregamento_csv' in etapas:
+            print(f"Gerando CSV sintético com {opcoes['registros']} registros...")
+            opcoes = dict(opcoes, csv=write_csv(make_dataset(opcoes['registros'], opcoes['seed']),
+                                                os.path.join(diretorio, "dataset_sintetico.csv")))
+        for nome in etapas:
+            print(f"-> Etapa '{nome}'...", flush=True)
+            with contexto.Pool(1) as pool:
+                resultado = pool.apply(_executar_etapa, (nome, opcoes, diretorio))
+            relatorio['etapas'][nome] = resultado
+            print(f"   {resultado['segundos']:.3f} s, pico de {resultado['pico_rss_mb']:.0f} MB")
+    return relatorio
+
+
+def compare_reports(atual, anterior):
+    """Imprime a razão (atual / anterior) de tempos e vazões das etapas em comum."""
+    print(f"\n--- Comparação com o commit {anterior.get('commit')} ---")
+    for nome, metricas in atual['etapas'].items():
+        antes = anterior.get('etapas', {}).get(nome)
+        if not antes:
+            continue
+        for chave, valor in metricas.items():
+            if (chave.startswith('segundos') or chave.endswith('por_segundo') or chave == 'pico_rss_mb') and antes.get(chave):
+                print(f"{nome:>22} {chave:<36} {antes[chave]:>14.3f} -> {valor:>14.3f}  ({valor / antes[chave]:.2f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de carregamento, ajuste, triagem e simulação.")
+    parser.add_argument("--registros", type=int, default=200_000, help="Registros do dataset sintético.")
+    parser.add_argument("--chamadas", type=int, default=100_000, help="Chamadas geradas, triadas e simuladas.")
+    parser.add_argument("--subamostra", type=int, default=None, help="Subamostra do ajuste de distribuições.")
+    parser.add_argument("--latencia-llm", type=float, default=0.0, help="Segundos de espera por chamada no LLM simulado.")
+    parser.add_argument("--triagem-rapida", action="store_true", help="Ativa a triagem local antes do LLM simulado.")
+    parser.add_argument("--repeticoes", type=int, default=1, help="Repetições por etapa (vale o menor tempo).")
+    parser.add_argument("--seed", type=int, default=config.SEED)
+    parser.add_argument("--etapas", nargs="+", choices=list(ETAPAS), default=list(ETAPAS))
+    parser.add_argument("--saida", default=None, help="Arquivo JSON de saída (padrão: benchmarks/results/).")
+    parser.add_argument("--comparar", default=None, help="JSON de uma execução anterior para comparar.")
+    args = parser.parse_args(argv)
+
+    opcoes = {
+        'registros': args.registros, 'chamadas': args.chamadas, 'subamostra': args.subamostra,
+        'latencia_llm': args.latencia_llm, 'triagem_rapida': args.triagem_rapida, 'repeticoes': args.repeticoes, 'seed': args.seed,
+    }
+    relatorio = run_benchmarks(opcoes, args.etapas)
+
+    saida = args.saida or os.path.join(
+        RESULTS_DIR, f"bench_{relatorio['commit'] or 'sem_commit'}_{datetime.now():%Y%m%d_%H%M%S}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, indent=2)
+    print(f"\n-> Resultados salvos em: {saida}")
+
+    if args.comparar:
+        with open(args.comparar, 'r', encoding='utf-8') as f:
+            compare_reports(relatorio, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/stubs.py
+import os
+import time
+
+import joblib
+import numpy as np
+from langchain_core.runnables import RunnableLambda
+
+import config
+from src.agent.cache import TriageCache
+from src.agent.chatbot import EmergencyCallInfo, EmergencyResponseAgent
+from src.agent.call_generator import load_natural_language_bank
+from src.agent.fast_triage import build_fast_triage
+from src.agent.prompts import PROMPT_TEMPLATE
+from .synthetic import GRUPOS_POR_TIPO
+
+
+class _PreprocessadorStub:
+    """Substitui o pré-processador salvo quando ele não está em `models/`."""
+
+    def transform(self, df):
+        return df[['Original Priority']].to_numpy(dtype=float)
+
+
+class _ClassificadorStub:
+    """Marca como complexas as chamadas de prioridade 3, como um classificador trivial."""
+
+    def predict(self, matriz):
+        return (np.asarray(matriz)[:, -1] >= 3).astype(int)
+
+
+def stub_extraction_chain(latencia=0.0):
+    """
+    Cadeia offline no lugar de `prompt | ChatOllama.with_structured_output(...)`.
+
+    Formata o prompt real (para manter esse custo), reconhece o Call Type pela frase do
+    banco e devolve um `EmergencyCallInfo`, esperando `latencia` segundos por chamada
+    para imitar o tempo de resposta do LLM. Por ser um Runnable, `batch` respeita
+    `max_concurrency` e `return_exceptions` como a cadeia verdadeira.
+    """
+    tipo_por_frase = {
+        frase: tipo for tipo, frases in load_natural_language_bank().items() for frase in frases
+    }
+
+    def extrair(entrada):
+        texto = entrada["natural_language_input"]
+        PROMPT_TEMPLATE.format(natural_language_input=texto)
+        if latencia:
+            time.sleep(latencia)
+        tipo = tipo_por_frase.get(texto, "Medical Incident")
+        return EmergencyCallInfo(
+            call_type=tipo,
+            call_type_group=GRUPOS_POR_TIPO.get(tipo, "Alarm"),
+            original_priority=3 if GRUPOS_POR_TIPO.get(tipo) == "Fire" else 2,
+        )
+
+    return RunnableLambda(extrair)
+
+
+def make_offline_agent(cache_path, latencia=0.0, triagem_rapida=False, perfis_tipo=None):
+    """
+    Cria um `EmergencyResponseAgent` sem Ollama: a cadeia de extração é o stub acima, o
+    cache de triagem fica em `cache_path` e o pré-processador/classificador vêm de
+    `models/` quando existem (senão, dos stubs). Com `triagem_rapida`, treina a
+    triagem local como o agente verdadeiro faria.
+    """
+    agente = EmergencyResponseAgent.__new__(EmergencyResponseAgent)
+    agente.cache = TriageCache(cache_path)
+    if os.path.exists(config.PREPROCESSOR_PATH) and os.path.exists(config.CLASSIFIER_PATH):
+        agente.preprocessor = joblib.load(config.PREPROCESSOR_PATH)
+        agente.classifier = joblib.load(config.CLASSIFIER_PATH)
+    else:
+        agente.preprocessor = _PreprocessadorStub()
+        agente.classifier = _ClassificadorStub()
+    agente.assinatura_classificador = "benchmark"
+    agente.extraction_chain = stub_extraction_chain(latencia)
+    agente.triagem_rapida = build_fast_triage(agente.cache, perfis_tipo) if triagem_rapida else None
+    return agente
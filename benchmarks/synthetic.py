@@ -0,0 +1,56 @@
+# benchmarks/synthetic.py
+import numpy as np
+import pandas as pd
+
+import config
+from src.agent.call_generator import load_natural_language_bank
+
+# Grupo de cada Call Type do banco de frases; tipos fora da lista caem em 'Alarm'.
+GRUPOS_POR_TIPO = {
+    'Structure Fire': 'Fire', 'Outside Fire': 'Fire', 'Vehicle Fire': 'Fire', 'Explosion': 'Fire',
+    'Alarms': 'Alarm', 'Smoke Investigation (Outside)': 'Alarm', 'Odor (Strange / Unknown)': 'Alarm',
+    'Medical Incident': 'Potentially Life-Threatening', 'Traffic Collision': 'Potentially Life-Threatening',
+    'Water Rescue': 'Potentially Life-Threatening', 'HazMat': 'Potentially Life-Threatening',
+}
+
+
+def make_dataset(num_registros, seed=config.SEED):
+    """
+    Gera um DataFrame com as colunas usadas do dataset de despacho de São Francisco,
+    com tempos plausíveis (chegadas Poisson, durações lognormais/gama) e Call Types
+    do banco de frases, para medir o pipeline sem o CSV real.
+    """
+    rng = np.random.default_rng(seed)
+    tipos = np.array(sorted(load_natural_language_bank()))
+    pesos = rng.dirichlet(np.ones(len(tipos)))
+    tipo = tipos[rng.choice(len(tipos), size=num_registros, p=pesos)]
+
+    segundos = np.cumsum(rng.exponential(90.0, num_registros))
+    recebida = pd.Timestamp('2024-01-01') + pd.to_timedelta(segundos, unit='s')
+    entrada = recebida + pd.to_timedelta(rng.lognormal(4.0, 0.7, num_registros), unit='s')
+    resposta = entrada + pd.to_timedelta(rng.exponential(60.0, num_registros), unit='s')
+    no_local = resposta + pd.to_timedelta(rng.exponential(420.0, num_registros), unit='s')
+    disponivel = no_local + pd.to_timedelta(rng.gamma(2.0, 900.0, num_registros), unit='s')
+
+    return pd.DataFrame({
+        'Call Number': np.arange(num_registros),
+        'Incident Number': np.arange(num_registros),
+        'Call Type': tipo,
+        'Call Type Group': pd.Series(tipo).map(GRUPOS_POR_TIPO).fillna('Alarm').to_numpy(),
+        'Received DtTm': recebida,
+        'Entry DtTm': entrada,
+        'Response DtTm': resposta,
+        'On Scene DtTm': no_local,
+        'Available DtTm': disponivel,
+        'Final Priority': rng.choice([2, 3], size=num_registros, p=[0.6, 0.4]),
+    })
+
+
+def write_csv(df, path):
+    """Grava o dataset sintético no mesmo formato de data do CSV original."""
+    saida = df.copy()
+    for coluna in saida.columns:
+        if coluna.endswith('DtTm'):
+            saida[coluna] = saida[coluna].dt.strftime(config.FORMATO_DATA_DATASET)
+    saida.to_csv(path, index=False)
+    return path
@@ -8,13 +8,108 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 MODELS_DIR = os.path.join(BASE_DIR, "models")
 DATA_DIR = os.path.join(BASE_DIR, "data", "raw")
 RESULTS_DIR = os.path.join(BASE_DIR, "results")
+CACHE_DIR = os.path.join(BASE_DIR, "cache")
 
 PREPROCESSOR_PATH = os.path.join(MODELS_DIR, "feature_preprocessor_final.pkl")
 CLASSIFIER_PATH = os.path.join(MODELS_DIR, "best_classifier_pipeline.pkl")
 DATASET_PATH = os.path.join(DATA_DIR, "Fire_Department_and_Emergency_Medical_Services_Dispatched_Calls_for_Service_20250904.csv")
+FORMATO_DATA_DATASET = "%m/%d/%Y %I:%M:%S %p"  # Formato das colunas "... DtTm" do dataset de São Francisco
 
 # --- Parâmetros da Simulação ---
 NUM_CHAMADAS_SIMULADAS = 5000  # Número de chamadas para simular em cada cenário
 CENARIOS_UNIDADES = [3, 5, 8, 10] # Cenários de unidades de bombeiros a testar
+SEED = 42  # Semente raiz de todos os sorteios (cenários e replicações)
+NUM_REPLICACOES = 1  # Replicações independentes por cenário de unidades (1 = só a execução detalhada; ex.: 30 para ICs)
+MAX_WORKERS = None  # Processos usados nas replicações (None = todos os núcleos)
+MOTOR_SIMULACAO = "simpy"  # "simpy" ou "rapido" (calendário heapq, mesmo resultado, muito mais rápido)
+MODO_CHEGADAS = "estacionario"  # "estacionario" (distribuição ajustada) ou "perfil" (taxas por hora e dia da semana)
+INICIO_SIMULACAO_MINUTOS = 0  # No modo "perfil", minutos após segunda-feira 00h em que a simulação começa
+FATOR_TEMPO_CHATBOT = 0.5  # O chatbot atende chamadas simples na metade do tempo de um operador
+TAMANHO_BLOCO_VARIAVEIS = 4096  # Tempos aleatórios sorteados por vez em cada distribuição
+ARMAZENAR_AMOSTRAS = True  # False = guarda só média, desvio e quantis (memória constante em execuções longas)
+QUANTIS_METRICAS = (0.5, 0.9)  # Quantis incluídos no resumo de cada métrica
 
-OLLAMA_MODEL = "phi3"
\ No newline at end of file
+# --- Modelo de Despacho (src/simulation/dispatch.py, só no motor "simpy") ---
+# Com os valores padrão vale o modelo original: operador e chatbot sem fila e uma única frota.
+NUM_OPERADORES = None  # Operadores humanos simultâneos (None = sem limite)
+CAPACIDADE_CHATBOT = None  # Conversas simultâneas do chatbot (None = sem limite)
+PROPORCAO_TIPOS_UNIDADE = None  # Ex.: {"engine": 0.4, "medic": 0.5, "truck": 0.1}; None = frota única
+TIPO_UNIDADE_POR_GRUPO = {  # Tipo de unidade despachado para cada Call Type Group
+    "Fire": "engine",
+    "Alarm": "truck",
+    "Alarms": "truck",
+    "Potentially Life-Threatening": "medic",
+    "Non Life-threatening": "medic",
+}
+TIPO_UNIDADE_PADRAO = "engine"  # Grupos desconhecidos ou ausentes
+PREEMPCAO_PRIORIDADE_MAXIMA = False  # Chamadas de prioridade 3 interrompem o serviço da chamada menos urgente
+
+# --- Horizonte, Aquecimento e Parada Automática ---
+HORIZONTE_SIMULACAO = None  # Tempo simulado máximo em minutos (None = até esgotar as chamadas; limita também o modo automático)
+PERIODO_AQUECIMENTO = 0.0  # Minutos iniciais cujas chamadas não entram nas estatísticas
+MEIA_LARGURA_ALVO = None  # Modo automático: para quando o IC95% da espera média ficar abaixo disso (min)
+TAMANHO_LOTE_MEDIAS = 500  # Observações por lote no método de médias em lotes
+MIN_LOTES_MEDIAS = 20  # Lotes mínimos antes de avaliar o critério de parada
+MAX_CHAMADAS_AUTOMATICO = 1_000_000  # Modo automático: esperas medidas antes de desistir (convergiu=False)
+
+# --- Reprodução do Histórico ---
+VALIDAR_COM_HISTORICO = False  # Reproduz as chamadas reais do dataset com e sem chatbot (src/simulation/replay.py)
+TAMANHO_BLOCO_REPLAY = 500_000  # Chamadas históricas lidas e simuladas por bloco
+
+# --- Estudo Comparativo (números aleatórios comuns) ---
+COMPARAR_POLITICAS = False  # Compara as políticas abaixo sobre os mesmos sorteios (src/simulation/comparison.py)
+POLITICAS_COMPARADAS = ("baseline", "chatbot")  # Nomes de comparison.POLITICAS; a primeira é a referência
+REPLICACOES_COMPARACAO = 10  # Com diferenças pareadas, bem menos replicações que em replicações independentes bastam
+
+# --- Rastreamento de Eventos ---
+# 0 = desligado, 1 = grava o log de eventos em results/traces, 2 = grava e imprime cada evento
+NIVEL_RASTREAMENTO = 0
+TRACES_DIR = os.path.join(RESULTS_DIR, "traces")
+NIVEL_LOG = "INFO"  # Use "DEBUG" para ver cada chamada triada pelo agente
+
+# --- Otimização de Capacidade ---
+OTIMIZAR_CAPACIDADE = False  # Busca a menor capacidade que cumpre o SLA em vez de usar só CENARIOS_UNIDADES
+SLA_ESPERA_MINUTOS = 5.0  # Limite do quantil de espera pelas unidades
+QUANTIL_SLA = 0.9  # Quantil do tempo de espera avaliado no SLA (P90)
+REPLICACOES_OTIMIZADOR = 10  # Replicações máximas por candidato
+MAX_UNIDADES_OTIMIZADOR = 200  # Limite superior da busca
+
+# --- Ajuste de Distribuições ---
+# Candidatas do scipy.stats testadas em cada ajuste, todas sempre não negativas:
+# exponencial (clássica para tempos de chegada), log-normal (comum para tempos de
+# serviço), gama (flexível para tempos de espera) e Weibull (confiabilidade e tempo de vida).
+DISTRIBUICOES_CANDIDATAS = ("expon", "lognorm", "gamma", "weibull_min")
+AJUSTE_PARALELO = True  # Ajusta cada distribuição candidata em um processo separado
+AJUSTE_SUBAMOSTRA = None  # Pontos usados no MLE (None = série completa); o KS usa sempre a série completa
+
+# --- Checkpoints ---
+RETOMAR_EXECUCAO = True  # Reaproveita etapas já concluídas (ajustes, triagem, cenários) com as mesmas entradas
+CHECKPOINT_DIR = os.path.join(CACHE_DIR, "etapas")
+
+# --- Gráficos ---
+GRAFICOS_SEM_JANELA = True  # Backend Agg: só salva os PNGs, sem abrir janelas (execução em servidor)
+GRAFICOS_PARALELO = True  # Renderiza os três gráficos em processos separados
+MAX_AMOSTRAS_GRAFICO = 20000  # Acima disso, cada cenário é reduzido a quantis/bins antes de plotar
+
+# --- Instrumentação ---
+INSTRUMENTACAO = True  # Mede tempo, CPU e pico de memória por etapa, latência do LLM e eventos por segundo
+INTERVALO_MEMORIA_SEGUNDOS = 0.1  # Intervalo de amostragem da memória residente durante as etapas
+FORMATOS_INSTRUMENTACAO = ("json", "prometheus")  # Arquivos gravados em METRICS_DIR no fim da execução
+METRICS_DIR = os.path.join(RESULTS_DIR, "metrics")
+PERFILADOR = None  # None, "cprofile" (grava perfil.prof) ou "pyinstrument" (grava perfil.html; pacote opcional)
+
+OLLAMA_MODEL = "phi3"
+LLM_MAX_CONCURRENCY = 4  # Requisições simultâneas ao Ollama durante a triagem em lote
+TRIAGEM_RAPIDA = False  # Resolve localmente (TF-IDF + regressão logística) os textos conhecidos ou de alta confiança
+LIMIAR_TRIAGEM_RAPIDA = 0.6  # Probabilidade mínima do Call Type previsto para dispensar o LLM
+
+# --- Triagem Sob Demanda ---
+TRIAGEM_SOB_DEMANDA = False  # Tria durante a simulação, à frente das chegadas, em vez de pré-calcular a tabela
+TRIAGEM_ANTECEDENCIA = 128  # Chamadas enviadas à triagem à frente do cursor de chegadas
+TRIAGEM_FILA_MAX = 256  # Textos distintos aguardando triagem antes de bloquear novos pedidos
+TRIAGEM_LOTE_MAX = 32  # Textos por lote enviado ao agente
+TRIAGEM_MEMORIA_MAX = 4096  # Triagens recentes reaproveitadas sem passar pelo agente
+
+# --- Cache de Triagem ---
+TRIAGE_CACHE_PATH = os.path.join(CACHE_DIR, "triagem.sqlite")
+TRIAGE_CACHE_MAX_ENTRIES = 50000  # Acima disso, as entradas menos usadas são descartadas (LRU)
\ No newline at end of file
@@ -1,115 +1,319 @@
 # main.py
+import argparse
+import logging
 import pandas as pd
 import numpy as np
 import os
 
-# Importa as configurações e os módulos do projeto
+# Importa as configurações e os módulos do projeto. O ajuste de distribuições (scipy),
+# o agente de IA (LangChain, Ollama, scikit-learn) e os gráficos (matplotlib, seaborn)
+# são importados só nas etapas que os usam, para que os comandos que não passam por
+# elas (e os processos trabalhadores) não paguem essas importações.
 import config
-from src.analysis.distribution_fitter import find_best_distribution
-from src.agent.call_generator import generate_call_scenarios
-from src.agent.chatbot import EmergencyResponseAgent
+from src.agent import prompts
+from src.agent.cache import classifier_signature
+from src.agent.call_generator import CallScenarioSource
+from src.agent.triage import TriagedCalls, triage_phrases
+from src.agent.triage_service import PrefetchedTriages
+from src.simulation.capacity import optimize_capacity
+from src.simulation.comparison import run_comparison
+from src.simulation.dispatch import minimum_units
+from src.simulation.arrivals import ArrivalProfile
 from src.simulation.environment import run_simulation
-from src.utils import plotter
+from src.simulation.metrics import build_results_table, quantile_columns
+from src.simulation.random_streams import portable_distributions
+from src.simulation.replay import TraceReplay, compare_replay
+from src.simulation.replications import build_jobs, run_replications
+from src.simulation.tracing import EventTracer
+from src.utils import instrumentation
+from src.utils.checkpoint import PipelineCheckpoint, file_signature, input_hash
+from src.utils.data_loader import load_dataset, simple_call_mask
 
-def main():
+# Subcomandos da linha de comando; cada um executa as etapas até a sua.
+COMANDOS = {
+    "fit": "carrega os dados e ajusta as distribuições",
+    "triage": "gera os cenários e tria as frases com o agente de IA",
+    "simulate": "executa os cenários e estudos e grava as tabelas (sem gráficos)",
+    "report": "execução completa: tabelas e gráficos (padrão)",
+}
+
+def preparar_dados():
+    """Carrega o dataset, remove registros incompletos e calcula as durações usadas nos ajustes."""
+    df = load_dataset(config.DATASET_PATH)
+
+    timestamp_cols = ['Received DtTm', 'Entry DtTm', 'On Scene DtTm', 'Available DtTm']
+    df.dropna(subset=timestamp_cols + ['Call Type Group', 'Final Priority'], inplace=True)
+
+    # `load_dataset` já entrega as linhas em ordem de 'Received DtTm'.
+    df['tempo_entre_chegadas'] = df['Received DtTm'].diff().dt.total_seconds() / 60.0
+    df['on_scene_time'] = (df['Available DtTm'] - df['On Scene DtTm']).dt.total_seconds() / 60.0
+    df['operator_duration'] = (df['Entry DtTm'] - df['Received DtTm']).dt.total_seconds() / 60.0
+    return df
+
+def ajustar_distribuicoes(df):
+    """
+    Ajusta as distribuições de chegada, serviço e atendimento usadas na simulação.
+    Retorna as distribuições pelo nome (ver `portable_distributions`): a simulação
+    sorteia com o numpy e não precisa do scipy para carregá-las do checkpoint.
+    """
+    from src.analysis.distribution_fitter import find_best_distribution
+
+    with instrumentation.stage('chegadas'):
+        dist_chegadas = find_best_distribution(df[df['tempo_entre_chegadas'] > 0]['tempo_entre_chegadas'].rename("Tempo entre Chegadas"))
+    with instrumentation.stage('servico_bombeiros'):
+        dist_servico_bombeiros = find_best_distribution(df[df['on_scene_time'] > 0]['on_scene_time'].rename("Tempo de Serviço no Local"))
+    with instrumentation.stage('atendimento_humano'):
+        dist_atendimento_humano = find_best_distribution(df[df['operator_duration'] > 0]['operator_duration'].rename("Duração Atendimento Humano (Complexo)"))
+
+    # --- CORREÇÃO PRINCIPAL AQUI ---
+    # Tempo de Atendimento do Operador (APENAS para casos simples, alinhado com o KDD):
+    # prioridade, grupo e limite de outlier da duração do incidente (ver simple_call_mask).
+    df_simples_mask = simple_call_mask(df)
+    
+    with instrumentation.stage('atendimento_simples'):
+        dist_atendimento_simples = find_best_distribution(df[df_simples_mask & (df['operator_duration'] > 0)]['operator_duration'].rename("Duração Atendimento Humano (Simples)"))
+
+    if config.MODO_CHEGADAS == "perfil":
+        # Chegadas com taxa por hora e dia da semana, no lugar da distribuição estacionária.
+        dist_chegadas = ArrivalProfile.from_dataframe(df)
+        print(f"Perfil de chegadas: pico de {dist_chegadas.peak_rate() * 60:.1f} chamadas/h, "
+              f"{dist_chegadas.chamadas_por_semana:.0f} chamadas/semana.")
+
+    return portable_distributions({
+        "chegadas": dist_chegadas,
+        "atendimento_humano": dist_atendimento_humano,
+        "atendimento_simples": dist_atendimento_simples,
+        "servico_bombeiros": dist_servico_bombeiros,
+    })
+
+def criar_agente(df):
+    """Instancia o agente de IA (com os perfis do dataset, se a triagem rápida estiver ativa)."""
+    from src.agent.chatbot import EmergencyResponseAgent
+    from src.agent.fast_triage import call_type_profiles
+
+    perfis_tipo = call_type_profiles(df) if config.TRIAGEM_RAPIDA else None
+    return EmergencyResponseAgent(perfis_tipo=perfis_tipo)
+
+def main(comando="report"):
     """
     Função principal que orquestra todo o processo de simulação e análise.
+
+    `comando` (um de `COMANDOS`) define até onde o pipeline vai: "fit" para nos
+    ajustes, "triage" na tabela de triagem, "simulate" nas tabelas de resultados e
+    "report" também gera os gráficos.
+
+    Cada etapa é salva em `config.CHECKPOINT_DIR` com a chave das suas entradas; uma
+    nova execução com as mesmas entradas retoma as etapas e cenários já concluídos.
+    Assim, "simulate" e "report" reaproveitam os ajustes e a triagem de um "fit" e
+    de um "triage" anteriores.
     """
+    logging.basicConfig(level=config.NIVEL_LOG, format="%(message)s")
     print("--- INICIANDO PROJETO DE SIMULAÇÃO DE ATENDIMENTO DE EMERGÊNCIA ---")
+    try:
+        executar_pipeline(comando)
+    finally:
+        caminhos_metricas = instrumentation.registro.export()
+        instrumentation.registro.close()
+        if caminhos_metricas:
+            print(f"\n-> Métricas da execução salvas em: {', '.join(caminhos_metricas)}")
+
+def executar_pipeline(comando):
+    """Executa as etapas de `main` até a do `comando`."""
+    checkpoint = PipelineCheckpoint()
+    min_unidades = minimum_units()
+    pequenos = [n for n in config.CENARIOS_UNIDADES if n < min_unidades]
+    if pequenos:
+        print(f"ERRO: CENARIOS_UNIDADES {pequenos} abaixo de {min_unidades} unidades, "
+              f"uma para cada tipo de PROPORCAO_TIPOS_UNIDADE. Ajuste a configuração.")
+        return
     
     # 1. Carregar e preparar os dados para análise
     print("\n[ETAPA 1/5] Carregando e preparando dados para análise...")
     try:
-        df = pd.read_csv(config.DATASET_PATH, engine='python')
-        
-        timestamp_cols = ['Received DtTm', 'Entry DtTm', 'On Scene DtTm', 'Available DtTm']
-        for col in timestamp_cols:
-            df[col] = pd.to_datetime(df[col], errors='coerce')
-        
-        df['Final Priority'] = pd.to_numeric(df['Final Priority'], errors='coerce')
-        df.dropna(subset=timestamp_cols + ['Call Type Group', 'Final Priority'], inplace=True)
-        
+        chave_dados = input_hash(file_signature(config.DATASET_PATH))
     except FileNotFoundError:
         print(f"ERRO: Dataset não encontrado em '{config.DATASET_PATH}'. Verifique o caminho.")
         return
+    # Sem checkpoint próprio: o cache desta etapa é o snapshot Parquet de `load_dataset`,
+    # já identificado pela assinatura do CSV e lido mapeado em memória.
+    with instrumentation.stage('dados'):
+        df = preparar_dados()
 
     # 2. Encontrar as melhores distribuições de probabilidade
     print("\n[ETAPA 2/5] Analisando distribuições de probabilidade dos tempos...")
-    
-    df.sort_values('Received DtTm', inplace=True)
-    df['tempo_entre_chegadas'] = df['Received DtTm'].diff().dt.total_seconds() / 60.0
-    dist_chegadas = find_best_distribution(df[df['tempo_entre_chegadas'] > 0]['tempo_entre_chegadas'].rename("Tempo entre Chegadas"))
-    
-    df['on_scene_time'] = (df['Available DtTm'] - df['On Scene DtTm']).dt.total_seconds() / 60.0
-    dist_servico_bombeiros = find_best_distribution(df[df['on_scene_time'] > 0]['on_scene_time'].rename("Tempo de Serviço no Local"))
-    
-    df['operator_duration'] = (df['Entry DtTm'] - df['Received DtTm']).dt.total_seconds() / 60.0
-    dist_atendimento_humano = find_best_distribution(df[df['operator_duration'] > 0]['operator_duration'].rename("Duração Atendimento Humano (Complexo)"))
+    chave_dists = input_hash(
+        chave_dados, list(config.DISTRIBUICOES_CANDIDATAS), config.AJUSTE_SUBAMOSTRA,
+        config.SEED, config.MODO_CHEGADAS, config.INICIO_SIMULACAO_MINUTOS
+    )
+    if comando == "triage":
+        print("-> Não usada pelo comando 'triage'.")
+    else:
+        dists = checkpoint.run('distribuicoes', chave_dists, lambda: ajustar_distribuicoes(df))
+    if comando == "fit":
+        for nome, dist in dists.items():
+            print(f"   {nome}: {dist if isinstance(dist, ArrivalProfile) else f'{dist[0]} {dist[1]}'}")
+        print("\n--- AJUSTES CONCLUÍDOS ---")
+        return
 
-    # --- CORREÇÃO PRINCIPAL AQUI ---
-    # Tempo de Atendimento do Operador (APENAS para casos simples, alinhado com o KDD)
-    
-    # Primeiro, calculamos o limite de outlier, exatamente como no KDD
-    df['incident_duration'] = (df['Available DtTm'] - df['Received DtTm']).dt.total_seconds() / 60.0
-    Q3 = df['incident_duration'].quantile(0.75)
-    IQR = Q3 - df['incident_duration'].quantile(0.25)
-    upper_bound = Q3 + 1.5 * IQR
-    
-    # Agora, aplicamos a máscara com os TRÊS critérios
-    regra_prioridade = (df['Final Priority'] < 3)
-    regra_grupo = (~df['Call Type Group'].isin(['Fire', 'Alarms']))
-    regra_outlier = (df['incident_duration'] <= upper_bound)
-    
-    df_simples_mask = (regra_prioridade & regra_grupo & regra_outlier)
-    
-    dist_atendimento_simples = find_best_distribution(df[df_simples_mask & (df['operator_duration'] > 0)]['operator_duration'].rename("Duração Atendimento Humano (Simples)"))
-    
     # 3. Gerar cenários e instanciar o agente de IA
     print("\n[ETAPA 3/5] Gerando cenários e inicializando o agente de IA...")
-    cenarios = generate_call_scenarios(df, config.NUM_CHAMADAS_SIMULADAS)
-    agente_ia = EmergencyResponseAgent()
+    # Com horizonte ou parada automática, a fonte de chamadas é ilimitada: quem encerra
+    # a execução é o tempo simulado ou o critério estatístico.
+    execucao_aberta = config.HORIZONTE_SIMULACAO is not None or config.MEIA_LARGURA_ALVO is not None
+    num_chamadas = None if execucao_aberta else config.NUM_CHAMADAS_SIMULADAS
+    with instrumentation.stage('cenarios'):
+        fonte_cenarios = CallScenarioSource(df, num_chamadas=num_chamadas, seed=config.SEED)
+    # A triagem depende só das frases, do modelo, do prompt e do classificador; as
+    # triagens que já chegaram ao cache SQLite também sobrevivem a uma falha no meio.
+    chave_triagem = input_hash(
+        fonte_cenarios.phrases, config.OLLAMA_MODEL, prompts.PROMPT_TEMPLATE, classifier_signature(),
+        config.TRIAGEM_RAPIDA and (chave_dados, config.LIMIAR_TRIAGEM_RAPIDA)
+    )
+    agente_ia = criar_agente(df) if config.TRIAGEM_SOB_DEMANDA else None
+    tabelas = {}
+
+    def triagens_em_tabela():
+        # Tabela (prioridade, decisão, grupo) por frase; é o que vai para outros processos
+        # (otimizador e replicações). Só é montada na primeira vez em que é pedida.
+        if 'triagens' not in tabelas:
+            tabela_triagem = checkpoint.run(
+                'triagem', chave_triagem, lambda: triage_phrases(agente_ia or criar_agente(df), fonte_cenarios)
+            )
+            tabelas['triagens'] = TriagedCalls(fonte_cenarios, tabela_triagem)
+        return tabelas['triagens']
+
+    if comando == "triage":
+        triagens = triagens_em_tabela()
+        simples = sum(triagem[1] == 'Simples' for triagem in triagens.tabela)
+        print(f"-> {len(triagens.tabela)} frases triadas ({simples} simples).")
+        print("\n--- TRIAGEM CONCLUÍDA ---")
+        return
+
+    if config.TRIAGEM_SOB_DEMANDA:
+        # As simulações detalhadas triam cada chamada durante a execução, à frente do
+        # cursor de chegadas, em vez de esperar a tabela inteira ficar pronta.
+        triagens_cenarios = PrefetchedTriages(fonte_cenarios, agente_ia)
+    else:
+        triagens_cenarios = triagens_em_tabela()
 
     # 4. Executar a simulação para cada cenário
     print("\n[ETAPA 4/5] Executando os cenários de simulação...")
     all_results = {}
-    df_plot_data = pd.DataFrame()
+    # Tudo o que define a execução de um cenário, exceto o número de unidades.
+    chave_execucao = input_hash(
+        chave_dists, chave_triagem, num_chamadas, config.SEED, config.MOTOR_SIMULACAO,
+        config.FATOR_TEMPO_CHATBOT, config.HORIZONTE_SIMULACAO, config.PERIODO_AQUECIMENTO,
+        config.MEIA_LARGURA_ALVO, config.TAMANHO_LOTE_MEDIAS, config.MIN_LOTES_MEDIAS, config.MAX_CHAMADAS_AUTOMATICO,
+        list(config.QUANTIS_METRICAS),
+        config.ARMAZENAR_AMOSTRAS, config.NUM_OPERADORES, config.CAPACIDADE_CHATBOT,
+        config.PROPORCAO_TIPOS_UNIDADE, config.PROPORCAO_TIPOS_UNIDADE and config.TIPO_UNIDADE_POR_GRUPO,
+        config.PROPORCAO_TIPOS_UNIDADE and config.TIPO_UNIDADE_PADRAO, config.PREEMPCAO_PRIORIDADE_MAXIMA
+    )
     
-    dists = {
-        "chegadas": dist_chegadas,
-        "atendimento_humano": dist_atendimento_humano,
-        "atendimento_simples": dist_atendimento_simples,
-        "servico_bombeiros": dist_servico_bombeiros,
-    }
-    
-    for n_unidades in config.CENARIOS_UNIDADES:
+    cenarios_unidades = config.CENARIOS_UNIDADES
+    resultado_otimizacao = None
+    if config.OTIMIZAR_CAPACIDADE:
+        print(f"\n--- Otimização de capacidade (P{int(config.QUANTIL_SLA * 100)} da espera <= {config.SLA_ESPERA_MINUTOS} min) ---")
+        chave_otimizacao = input_hash(
+            chave_execucao, config.SLA_ESPERA_MINUTOS, config.QUANTIL_SLA,
+            config.REPLICACOES_OTIMIZADOR, config.MAX_UNIDADES_OTIMIZADOR, config.NUM_CHAMADAS_SIMULADAS
+        )
+        resultado_otimizacao = checkpoint.run(
+            'otimizacao', chave_otimizacao, lambda: optimize_capacity(triagens_em_tabela(), dists, min_unidades=min_unidades)
+        )
+        if resultado_otimizacao['unidades'] is not None:
+            # O relatório detalhado passa a cobrir a capacidade recomendada e suas vizinhas.
+            c = resultado_otimizacao['unidades']
+            cenarios_unidades = sorted({max(min_unidades, c - 1), c, c + 1})
+
+    for n_unidades in cenarios_unidades:
         print(f"\n--- Cenário com {n_unidades} unidades ---")
-        resultados_cenario = run_simulation(
-            num_unidades=n_unidades,
-            agente_ia=agente_ia,
-            cenarios=cenarios,
-            distributions=dists
+        rastreador = EventTracer(config.NIVEL_RASTREAMENTO)
+
+        def simular_cenario():
+            with instrumentation.stage(f'simulacao_{n_unidades}_unidades') as medicao:
+                resultados = run_simulation(
+                    num_unidades=n_unidades,
+                    triagens=triagens_cenarios,
+                    distributions=dists,
+                    rng=np.random.default_rng(config.SEED),
+                    rastreador=rastreador
+                )
+                medicao['chamadas'] = resultados['total_chamadas']
+            if rastreador.ativo:
+                rastreador.save(os.path.join(config.TRACES_DIR, f"eventos_{n_unidades}_unidades.npz"))
+            return resultados
+
+        # Com rastreamento ligado o cenário é sempre executado, para gravar o log de eventos.
+        if rastreador.ativo:
+            all_results[n_unidades] = simular_cenario()
+        else:
+            chave_cenario = input_hash(chave_execucao, n_unidades)
+            all_results[n_unidades] = checkpoint.run('cenario', chave_cenario, simular_cenario)
+        lotes = all_results[n_unidades].get('medias_em_lotes')
+        if lotes is not None and not lotes['convergiu']:
+            print(f"AVISO: o IC da espera média não atingiu {config.MEIA_LARGURA_ALVO} min "
+                  f"(parada por '{lotes['motivo'] or 'fim das chamadas'}', meia-largura {lotes['meia_largura']:.1f} min).")
+
+    df_plot_data = build_results_table(all_results)
+
+    if config.NUM_REPLICACOES > 1:
+        print(f"\n--- {config.NUM_REPLICACOES} replicações por cenário ---")
+        jobs = build_jobs(cenarios_unidades, config.NUM_REPLICACOES, config.SEED)
+        chave_replicacoes = input_hash(chave_execucao, list(cenarios_unidades), config.NUM_REPLICACOES)
+        df_replicacoes, df_intervalos = checkpoint.run(
+            'replicacoes', chave_replicacoes, lambda: run_replications(jobs, triagens_em_tabela(), dists)
+        )
+    else:
+        df_replicacoes = df_intervalos = None
+
+    df_comparacao = df_diferencas = None
+    if config.COMPARAR_POLITICAS:
+        print(f"\n--- Estudo comparativo: {', '.join(config.POLITICAS_COMPARADAS)} ---")
+        chave_comparacao = input_hash(
+            chave_execucao, list(cenarios_unidades), list(config.POLITICAS_COMPARADAS), config.REPLICACOES_COMPARACAO
+        )
+        df_comparacao, df_diferencas = checkpoint.run(
+            'comparacao', chave_comparacao, lambda: run_comparison(
+                triagens_em_tabela(), dists, cenarios_unidades, config.REPLICACOES_COMPARACAO,
+                politicas=config.POLITICAS_COMPARADAS, referencia=config.POLITICAS_COMPARADAS[0]
+            )
+        )
+
+    df_historico = None
+    if config.VALIDAR_COM_HISTORICO:
+        print("\n--- Reprodução do histórico real (sem e com chatbot) ---")
+        chave_historico = input_hash(
+            chave_dados, list(cenarios_unidades), config.FATOR_TEMPO_CHATBOT, config.PERIODO_AQUECIMENTO
+        )
+        df_historico = checkpoint.run(
+            'historico', chave_historico, lambda: compare_replay(TraceReplay.from_dataframe(df), cenarios_unidades)
         )
-        all_results[n_unidades] = resultados_cenario
-        
-        temp_df = pd.DataFrame({
-            'Tempo de Espera': resultados_cenario.get('tempos_espera_bombeiros', []),
-            'Unidades': str(n_unidades)
-        })
-        df_plot_data = pd.concat([df_plot_data, temp_df], ignore_index=True)
         
     # 5. Apresentar os resultados
     print("\n[ETAPA 5/5] Gerando tabela de resultados e gráficos...")
     
     tabela_resumo = []
     for n_unidades, data in all_results.items():
-        tabela_resumo.append({
+        linha = {
             'Unidades': n_unidades,
             'Chamadas Atendidas': data.get('total_chamadas', 0),
             'Simples (Chatbot)': data.get('chamadas_simples', 0),
             'Complexas (Humano)': data.get('chamadas_complexas', 0),
-            'Tempo médio de espera (min)': np.mean(data.get('tempos_espera_bombeiros', [0])),
-            'Tempo médio de serviço (min)': np.mean(data.get('tempos_servico_bombeiros', [0]))
-        })
+            'Tempo simulado (min)': data['tempo_simulado'],
+            'Tempo médio de espera (min)': data['resumo']['tempos_espera_bombeiros']['media'],
+            **quantile_columns(data['resumo']['tempos_espera_bombeiros'], 'do tempo de espera (min)'),
+            'Tempo médio de serviço (min)': data['resumo']['tempos_servico_bombeiros']['media']
+        }
+        # Colunas do modelo de despacho (src/simulation/dispatch.py), quando ligado.
+        if 'tempos_espera_atendimento' in data['resumo']:
+            linha['Espera por operador/chatbot (min)'] = data['resumo']['tempos_espera_atendimento']['media']
+            linha['Preempções'] = data['preempcoes']
+        if 'convergiu' in data['resumo']:
+            linha['Convergiu'] = data['resumo']['convergiu']
+        if 'frota' in data:
+            linha['Frota'] = ", ".join(f"{tipo}: {quantidade}" for tipo, quantidade in data['frota'].items())
+        tabela_resumo.append(linha)
     df_resumo = pd.DataFrame(tabela_resumo)
     print("\n--- Tabela de Resumo dos Resultados (com Chatbot) ---")
     print(df_resumo.to_string(index=False))
@@ -117,12 +321,56 @@ def main():
     path_tabela = os.path.join(config.RESULTS_DIR, "tables", "resumo_simulacao.csv")
     df_resumo.to_csv(path_tabela, index=False)
     print(f"\n-> Tabela salva em: {path_tabela}")
+
+    if resultado_otimizacao is not None:
+        path_otimizacao = os.path.join(config.RESULTS_DIR, "tables", "otimizacao_capacidade.csv")
+        resultado_otimizacao['avaliacoes'].to_csv(path_otimizacao, index=False)
+        print(f"-> Avaliações da otimização de capacidade salvas em: {path_otimizacao}")
+
+    if df_intervalos is not None:
+        print("\n--- Médias e Intervalos de Confiança entre Replicações ---")
+        print(df_intervalos.to_string(index=False))
+        path_replicacoes = os.path.join(config.RESULTS_DIR, "tables", "replicacoes_simulacao.csv")
+        df_replicacoes.to_csv(path_replicacoes, index=False)
+        path_intervalos = os.path.join(config.RESULTS_DIR, "tables", "intervalos_confianca.csv")
+        df_intervalos.to_csv(path_intervalos, index=False)
+        print(f"-> Tabelas salvas em: {path_replicacoes} e {path_intervalos}")
+
+    if df_diferencas is not None:
+        print(f"\n--- Diferenças Pareadas em Relação a '{config.POLITICAS_COMPARADAS[0]}' ---")
+        print(df_diferencas.to_string(index=False))
+        path_comparacao = os.path.join(config.RESULTS_DIR, "tables", "comparacao_politicas.csv")
+        df_comparacao.to_csv(path_comparacao, index=False)
+        path_diferencas = os.path.join(config.RESULTS_DIR, "tables", "diferencas_pareadas.csv")
+        df_diferencas.to_csv(path_diferencas, index=False)
+        print(f"-> Tabelas salvas em: {path_comparacao} e {path_diferencas}")
+
+    if df_historico is not None:
+        print("\n--- Validação com o Histórico Real ---")
+        print(df_historico.to_string(index=False))
+        path_historico = os.path.join(config.RESULTS_DIR, "tables", "validacao_historico.csv")
+        df_historico.to_csv(path_historico, index=False)
+        print(f"-> Tabela salva em: {path_historico}")
     
-    plotter.plot_boxplot(df_plot_data)
-    plotter.plot_distribution(df_plot_data)
-    plotter.plot_cumulative_wait_time(all_results)
+    if comando == "report":
+        with instrumentation.stage('graficos'):
+            from src.utils import plotter
+            plotter.plot_all(df_plot_data, all_results)
     
     print("\n--- PROJETO FINALIZADO ---")
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Simulação do atendimento de emergência com e sem o chatbot de triagem."
+    )
+    subparsers = parser.add_subparsers(dest="comando", metavar="comando")
+    for nome, ajuda in COMANDOS.items():
+        subparsers.add_parser(nome, help=ajuda)
+    args = parser.parse_args(argv)
+    args.comando = args.comando or "report"
+    return args
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    args = parse_args()
+    with instrumentation.profile():
+        main(args.comando)
\ No newline at end of file
@@ -0,0 +1,162 @@
+# src/agent/cache.py
+import hashlib
+import json
+import os
+import sqlite3
+
+import config
+from . import prompts
+
+
+def classifier_signature(path=config.CLASSIFIER_PATH):
+    """Identifica a versão do classificador salvo em disco (tamanho e data de modificação)."""
+    try:
+        info = os.stat(path)
+    except FileNotFoundError:
+        return ""
+    return f"{info.st_size}-{info.st_mtime_ns}"
+
+
+class TriageCache:
+    """
+    Cache persistente (SQLite) das triagens feitas pelo agente de IA.
+
+    A chave é um hash do prompt, do modelo do Ollama e do texto da chamada, de modo que
+    qualquer mudança em um deles invalida a entrada. Cada entrada guarda a extração
+    estruturada (`EmergencyCallInfo`) e a decisão final do classificador, junto da
+    assinatura do classificador que a produziu. O número de entradas é limitado e as
+    menos usadas recentemente são descartadas primeiro (LRU).
+    """
+
+    def __init__(self, path=config.TRIAGE_CACHE_PATH, max_entries=config.TRIAGE_CACHE_MAX_ENTRIES):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        # A conexão pode ser usada pela thread despachante do `TriageService`.
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS triagem ("
+                " chave TEXT PRIMARY KEY,"
+                " info_extraida TEXT NOT NULL,"
+                " decisao_final TEXT NOT NULL,"
+                " assinatura_classificador TEXT NOT NULL,"
+                " ultimo_acesso INTEGER NOT NULL)"
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_triagem_acesso ON triagem (ultimo_acesso)")
+        # Relógio lógico do LRU: cresce a cada leitura ou escrita.
+        self._relogio = self.conn.execute("SELECT COALESCE(MAX(ultimo_acesso), 0) FROM triagem").fetchone()[0]
+
+    @staticmethod
+    def make_key(natural_language_input):
+        """Gera a chave da entrada a partir do prompt, do modelo e do texto da chamada."""
+        h = hashlib.sha256()
+        for parte in (prompts.PROMPT_TEMPLATE, config.OLLAMA_MODEL, natural_language_input):
+            h.update(parte.encode('utf-8'))
+            h.update(b'\0')
+        return h.hexdigest()
+
+    def _tick(self):
+        self._relogio += 1
+        return self._relogio
+
+    def get(self, natural_language_input):
+        """
+        Retorna um dicionário com `info_extraida`, `decisao_final` e
+        `assinatura_classificador`, ou None se o texto ainda não foi triado.
+        """
+        return self.get_many([natural_language_input]).get(natural_language_input)
+
+    def get_many(self, natural_language_inputs):
+        """
+        Versão em lote de `get`: retorna {texto: entrada} dos textos que estão no cache.
+        Conta acertos e falhas e atualiza o LRU de todos os acertos com um único
+        `executemany` e um único commit.
+        """
+        chaves = {self.make_key(texto): texto for texto in natural_language_inputs}
+        encontrados = {}
+        acessos = []
+        for chave, info, decisao, assinatura in self._select(
+            chaves, "chave, info_extraida, decisao_final, assinatura_classificador"
+        ):
+            encontrados[chaves[chave]] = {
+                "info_extraida": json.loads(info),
+                "decisao_final": decisao,
+                "assinatura_classificador": assinatura,
+            }
+            acessos.append((self._tick(), chave))
+        self.hits += len(encontrados)
+        self.misses += len(chaves) - len(encontrados)
+
+        if acessos:
+            with self.conn:
+                self.conn.executemany("UPDATE triagem SET ultimo_acesso = ? WHERE chave = ?", acessos)
+        return encontrados
+
+    def peek_many(self, natural_language_inputs):
+        """
+        Retorna {texto: info_extraida} dos textos que estão no cache, sem contar acertos
+        nem atualizar o LRU (usado para treinar a triagem rápida).
+        """
+        chaves = {self.make_key(texto): texto for texto in natural_language_inputs}
+        return {chaves[chave]: json.loads(info) for chave, info in self._select(chaves, "chave, info_extraida")}
+
+    def _select(self, chaves, colunas):
+        """Linhas das `chaves` presentes no cache, consultadas em lotes de 500 parâmetros."""
+        lista = list(chaves)
+        for inicio in range(0, len(lista), 500):
+            lote = lista[inicio:inicio + 500]
+            yield from self.conn.execute(
+                f"SELECT {colunas} FROM triagem WHERE chave IN ({','.join('?' * len(lote))})", lote
+            ).fetchall()
+
+    def put(self, natural_language_input, info_extraida, decisao_final, assinatura_classificador):
+        """Grava (ou substitui) a triagem de um texto e aplica o limite de tamanho."""
+        self.put_many([(natural_language_input, info_extraida, decisao_final, assinatura_classificador)])
+
+    def put_many(self, entradas):
+        """
+        Grava várias triagens em uma única transação. Cada entrada é uma tupla
+        (texto, info_extraida, decisao_final, assinatura_classificador).
+        """
+        linhas = [
+            (
+                self.make_key(texto),
+                json.dumps(info_extraida, ensure_ascii=False),
+                decisao_final,
+                assinatura,
+                self._tick(),
+            )
+            for texto, info_extraida, decisao_final, assinatura in entradas
+        ]
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO triagem VALUES (?, ?, ?, ?, ?)", linhas)
+            self._evict()
+
+    def _evict(self):
+        excesso = len(self) - self.max_entries
+        if excesso > 0:
+            self.conn.execute(
+                "DELETE FROM triagem WHERE chave IN "
+                "(SELECT chave FROM triagem ORDER BY ultimo_acesso ASC LIMIT ?)",
+                (excesso,)
+            )
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM triagem").fetchone()[0]
+
+    def stats(self):
+        """Contadores de acertos e falhas desde a abertura do cache."""
+        consultas = self.hits + self.misses
+        return {
+            "entradas": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "taxa_acerto": self.hits / consultas if consultas else 0.0,
+        }
+
+    def close(self):
+        self.conn.close()
@@ -1,15 +1,21 @@
 import pandas as pd
-import random
+import numpy as np
 import json
 import os
+import sys
+from functools import lru_cache
 import config
 
 # banco de dados JSON
 JSON_BANK_PATH = os.path.join(config.BASE_DIR, "src", "agent", "data", "natural_language_bank.json")
 
+FRASE_GENERICA = "Chamada de emergência genérica."
+
+@lru_cache(maxsize=1)
 def load_natural_language_bank():
     """
     Carrega o banco de dados de frases a partir do arquivo JSON.
+    O arquivo é lido uma única vez por processo; o dicionário retornado é compartilhado.
     """
     try:
         with open(JSON_BANK_PATH, 'r', encoding='utf-8') as f:
@@ -23,34 +29,117 @@ def load_natural_language_bank():
         print(f"ERRO: O arquivo '{JSON_BANK_PATH}' não é um JSON válido.")
         return None
 
-def generate_call_scenarios(df, num_calls):
+class AliasTable:
+    """
+    Tabela de alias (método de Vose) para sortear índices com pesos arbitrários em O(1)
+    por amostra, de forma vetorizada.
+    """
+    def __init__(self, pesos):
+        pesos = np.asarray(pesos, dtype=float)
+        n = len(pesos)
+        escalados = pesos * n / pesos.sum()
+        self.prob = np.ones(n)
+        self.alias = np.arange(n)
+
+        pequenos = [i for i in range(n) if escalados[i] < 1.0]
+        grandes = [i for i in range(n) if escalados[i] >= 1.0]
+        while pequenos and grandes:
+            p, g = pequenos.pop(), grandes.pop()
+            self.prob[p] = escalados[p]
+            self.alias[p] = g
+            escalados[g] -= 1.0 - escalados[p]
+            (pequenos if escalados[g] < 1.0 else grandes).append(g)
+
+    def sample(self, rng, tamanho):
+        """Sorteia `tamanho` índices de acordo com os pesos."""
+        indices = rng.integers(len(self.prob), size=tamanho)
+        aceita = rng.random(tamanho) < self.prob[indices]
+        return np.where(aceita, indices, self.alias[indices])
+
+class CallScenarioSource:
+    """
+    Fonte preguiçosa e com semente de cenários de chamada, representados por IDs
+    inteiros de frases do banco.
+
+    Os pesos dos Call Types são calculados uma única vez a partir do dataset e
+    sorteados por tabela de alias; as frases ficam internadas em `self.phrases`
+    (uma cópia de cada texto). Cada iteração recomeça da semente e entrega os IDs
+    sob demanda, em blocos, usando memória constante. Com `num_chamadas=None` a
+    fonte é infinita (para execuções limitadas por horizonte de tempo).
+    """
+    def __init__(self, df, num_chamadas=None, seed=None, tamanho_bloco=config.TAMANHO_BLOCO_VARIAVEIS):
+        natural_language_bank = load_natural_language_bank()
+        if not natural_language_bank:
+            raise ValueError(f"Banco de frases indisponível em '{JSON_BANK_PATH}'.")
+
+        self.num_chamadas = num_chamadas
+        self.seed = seed
+        self.tamanho_bloco = tamanho_bloco
+
+        # Calcula a frequência de cada Call Type
+        call_type_weights = df['Call Type'].value_counts(normalize=True)
+        call_type_weights = call_type_weights[call_type_weights > 0]
+        self.call_types = call_type_weights.index.tolist()
+        self._alias = AliasTable(call_type_weights.values)
+
+        # Frases de cada tipo ficam contíguas em um único array de IDs.
+        self.phrases = []
+        ids_por_texto = {}
+        ids_planos, inicios, quantidades = [], [], []
+        for call_type in self.call_types:
+            # Se o tipo de chamada sorteado não estiver no nosso banco,
+            # usamos um tipo genérico como 'Medical Incident' para não quebrar a simulação.
+            frases = natural_language_bank.get(call_type, natural_language_bank.get("Medical Incident", [FRASE_GENERICA]))
+            inicios.append(len(ids_planos))
+            quantidades.append(len(frases))
+            for frase in frases:
+                if frase not in ids_por_texto:
+                    ids_por_texto[frase] = len(self.phrases)
+                    self.phrases.append(sys.intern(frase))
+                ids_planos.append(ids_por_texto[frase])
+        self._ids_planos = np.array(ids_planos, dtype=np.int32)
+        self._inicios = np.array(inicios, dtype=np.int64)
+        self._quantidades = np.array(quantidades, dtype=np.int64)
+
+    def __len__(self):
+        if self.num_chamadas is None:
+            raise TypeError("Fonte de cenários ilimitada não tem tamanho.")
+        return self.num_chamadas
+
+    def _sample_block(self, rng, tamanho):
+        tipos = self._alias.sample(rng, tamanho)
+        deslocamentos = (rng.random(tamanho) * self._quantidades[tipos]).astype(np.int64)
+        return self._ids_planos[self._inicios[tipos] + deslocamentos]
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed)
+        restantes = self.num_chamadas
+        while restantes is None or restantes > 0:
+            tamanho = self.tamanho_bloco if restantes is None else min(self.tamanho_bloco, restantes)
+            yield from self._sample_block(rng, tamanho).tolist()
+            if restantes is not None:
+                restantes -= tamanho
+
+    def text(self, id_frase):
+        """Texto da frase com o ID informado."""
+        return self.phrases[id_frase]
+
+def generate_call_scenarios(df, num_calls, seed=None):
     """
     Gera uma lista de textos de chamada em linguagem natural baseada na
     distribuição de probabilidade dos Call Types do dataset.
+    Com `seed` definido, a lista gerada é sempre a mesma.
+    Para simulações longas, prefira iterar `CallScenarioSource` diretamente.
     """
     print(f"\nGerando {num_calls} cenários de chamada...")
     
-    natural_language_bank = load_natural_language_bank()
-    if not natural_language_bank:
+    try:
+        fonte = CallScenarioSource(df, num_chamadas=num_calls, seed=seed)
+    except ValueError:
         # Se não conseguir carregar o banco, interrompe a geração
         return []
 
-    # Calcula a frequência de cada Call Type
-    call_type_weights = df['Call Type'].value_counts(normalize=True)
-    
-    # Sorteia os Call Types com base na sua frequência real
-    call_type_list = call_type_weights.index.tolist()
-    weights_list = call_type_weights.values.tolist()
-    
-    generated_call_types = random.choices(call_type_list, weights=weights_list, k=num_calls)
-    
-    # Para cada Call Type sorteado, escolhe uma frase aleatória do banco
-    call_scenarios = []
-    for call_type in generated_call_types:
-        # Se o tipo de chamada sorteado não estiver no nosso banco,
-        # usamos um tipo genérico como 'Medical Incident' para não quebrar a simulação.
-        phrases = natural_language_bank.get(call_type, natural_language_bank.get("Medical Incident", ["Chamada de emergência genérica."]))
-        call_scenarios.append(random.choice(phrases))
+    call_scenarios = [fonte.text(id_frase) for id_frase in fonte]
         
     print("-> Cenários gerados com sucesso.")
-    return call_scenarios
\ No newline at end of file
+    return call_scenarios
@@ -1,14 +1,21 @@
+import logging
+import time
+
 import joblib
 import pandas as pd
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnableLambda
 from langchain_ollama import ChatOllama
 from pydantic import BaseModel, Field
 
 import config
+from src.utils import instrumentation
 from . import prompts
+from .cache import TriageCache, classifier_signature
+from .fast_triage import build_fast_triage
 
-import langchain
-from langchain.cache import InMemoryCache
+# Mensagens por chamada ficam no nível DEBUG para não inundar a saída em lotes grandes.
+logger = logging.getLogger(__name__)
 
 class EmergencyCallInfo(BaseModel):
     """Estrutura para armazenar as informações extraídas da chamada."""
@@ -23,17 +30,25 @@ class EmergencyCallInfo(BaseModel):
     original_priority: int = Field(description="A urgência inicial da chamada (1, 2 ou 3).")
 
 class EmergencyResponseAgent:
-    def __init__(self):
+    def __init__(self, perfis_tipo=None, triagem_rapida=config.TRIAGEM_RAPIDA):
+        """
+        Com `triagem_rapida`, textos conhecidos ou classificados com confiança por um
+        modelo local (TF-IDF + regressão logística, ver `fast_triage.py`) não passam pelo
+        LLM. `perfis_tipo` ({Call Type: info}, de `call_type_profiles`) rotula os tipos
+        que o LLM ainda não respondeu.
+        """
         print("Inicializando o Agente de Resposta a Emergências (usando Ollama)...")
         
         # --- CACHE ---
-        langchain.llm_cache = InMemoryCache()
-        print("Cache em memória para o LLM ativado.")
+        # Persistente em disco: uma nova execução reaproveita as triagens das anteriores.
+        self.cache = TriageCache()
+        print(f"Cache persistente de triagem ativado ({len(self.cache)} entradas em '{self.cache.path}').")
         
         # 1. Carrega o modelo de ML e o pré-processador
         try:
             self.preprocessor = joblib.load(config.PREPROCESSOR_PATH)
             self.classifier = joblib.load(config.CLASSIFIER_PATH)
+            self.assinatura_classificador = classifier_signature(config.CLASSIFIER_PATH)
             print("Modelos de ML carregados com sucesso.")
         except FileNotFoundError as e:
             print(f"Erro: Arquivo de modelo não encontrado. {e}")
@@ -48,34 +63,134 @@ class EmergencyResponseAgent:
         self.extraction_chain = ChatPromptTemplate.from_template(prompts.PROMPT_TEMPLATE) | self.llm.with_structured_output(EmergencyCallInfo)
         print(f"Agente pronto para operar com o modelo local '{config.OLLAMA_MODEL}'.")
 
+        # 3. Triagem rápida local (opcional), treinada com o banco e as respostas em cache
+        self.triagem_rapida = None
+        if triagem_rapida:
+            self.triagem_rapida = build_fast_triage(self.cache, perfis_tipo)
+            print(f"Triagem rápida ativada (limiar de confiança {self.triagem_rapida.limiar}).")
+
+    def _extract(self, entrada):
+        """Uma extração pelo LLM, com a latência registrada na instrumentação."""
+        inicio = time.perf_counter()
+        try:
+            return self.extraction_chain.invoke(entrada)
+        finally:
+            instrumentation.observe('llm_latencia_segundos', time.perf_counter() - inicio)
+
     def classify_call(self, natural_language_input: str) -> dict:
         """
         Processa um texto de chamada, extrai as features iniciais e classifica a complexidade.
         """
-        print(f"\nProcessando nova chamada: '{natural_language_input}'")
-        
-        # Etapa 1: Extrair features com o LLM local
-        print("-> Etapa 1: Extraindo informações iniciais com o LLM (Ollama, com cache)...")
-        extracted_info = self.extraction_chain.invoke({"natural_language_input": natural_language_input})
-        
-        print("-> Etapa 2: Preparando dados para o classificador de complexidade...")
-        input_df = pd.DataFrame([{
-            "Call Type": extracted_info.call_type,
-            "Call Type Group": extracted_info.call_type_group,
-            "Original Priority": extracted_info.original_priority
-        }])
-        
-        processed_input = self.preprocessor.transform(input_df)
-        
-        print("-> Etapa 3: Classificando a complexidade...")
-        prediction = self.classifier.predict(processed_input)
-        complexity = "Complexo" if prediction[0] == 1 else "Simples"
-        
-        result = {
-            "texto_original": natural_language_input,
-            "info_extraida": extracted_info.dict(),
-            "decisao_final": complexity
-        }
-        
-        print(f"--> Decisão Final: {complexity}")
-        return result
\ No newline at end of file
+        logger.debug("Processando nova chamada: '%s'", natural_language_input)
+        result = self.classify_calls([natural_language_input])[0]
+        logger.debug("--> Decisão Final: %s", result['decisao_final'])
+        return result
+
+    def classify_calls(self, natural_language_inputs, max_concurrency=config.LLM_MAX_CONCURRENCY) -> list:
+        """
+        Versão em lote de `classify_call`: retorna um resultado por texto, na mesma ordem.
+
+        Textos repetidos são processados uma única vez. Os que não estão no cache são
+        enviados ao LLM concorrentemente (no máximo `max_concurrency` requisições ao mesmo
+        tempo) e o pré-processador e o classificador rodam uma única vez sobre todas as
+        extrações.
+        """
+        textos = list(natural_language_inputs)
+        unicos = list(dict.fromkeys(textos))
+        resultados = {}
+        infos_para_classificar = {}
+        pendentes_llm = []
+
+        respostas_llm = {}
+        rapidas = set()
+
+        # Uma consulta e um único commit do LRU para todos os acertos do lote.
+        entradas_cache = self.cache.get_many(unicos)
+        for texto in unicos:
+            em_cache = entradas_cache.get(texto)
+            if em_cache is None:
+                pendentes_llm.append(texto)
+                continue
+            respostas_llm[texto] = em_cache['info_extraida']
+            if em_cache['assinatura_classificador'] == self.assinatura_classificador:
+                resultados[texto] = {
+                    "texto_original": texto,
+                    "info_extraida": em_cache['info_extraida'],
+                    "decisao_final": em_cache['decisao_final']
+                }
+            else:
+                # A extração continua válida; só o classificador mudou, então refazemos apenas a decisão.
+                infos_para_classificar[texto] = em_cache['info_extraida']
+
+        instrumentation.count('triagem_cache_acertos', len(unicos) - len(pendentes_llm))
+        instrumentation.count('triagem_cache_faltas', len(pendentes_llm))
+
+        # Etapa 0: Triagem rápida local; só os textos ambíguos seguem para o LLM
+        if self.triagem_rapida is not None and pendentes_llm:
+            ambiguos = []
+            for texto, info in zip(pendentes_llm, self.triagem_rapida.predict(pendentes_llm)):
+                if info is None:
+                    ambiguos.append(texto)
+                else:
+                    infos_para_classificar[texto] = EmergencyCallInfo(**info).dict()
+                    rapidas.add(texto)
+            logger.info("-> Etapa 0: %d chamadas triadas localmente, %d enviadas ao LLM.",
+                        len(rapidas), len(ambiguos))
+            pendentes_llm = ambiguos
+            instrumentation.count('triagem_rapida_resolvidas', len(rapidas))
+
+        # Etapa 1: Extrair features com o LLM local, em paralelo
+        erros = []
+        if pendentes_llm:
+            logger.info("-> Etapa 1: Extraindo informações de %d chamadas com o LLM (Ollama, até %d em paralelo)...",
+                        len(pendentes_llm), max_concurrency)
+            extracoes = RunnableLambda(self._extract).batch(
+                [{"natural_language_input": texto} for texto in pendentes_llm],
+                config={"max_concurrency": max_concurrency},
+                return_exceptions=True
+            )
+            for texto, extracted_info in zip(pendentes_llm, extracoes):
+                if isinstance(extracted_info, Exception):
+                    erros.append(extracted_info)
+                else:
+                    infos_para_classificar[texto] = extracted_info.dict()
+                    respostas_llm[texto] = infos_para_classificar[texto]
+
+            instrumentation.count('llm_chamadas', len(pendentes_llm))
+            instrumentation.count('llm_erros', len(erros))
+
+        if infos_para_classificar:
+            logger.info("-> Etapa 2: Preparando %d chamadas para o classificador de complexidade...",
+                        len(infos_para_classificar))
+            input_df = pd.DataFrame([{
+                "Call Type": info['call_type'],
+                "Call Type Group": info['call_type_group'],
+                "Original Priority": info['original_priority']
+            } for info in infos_para_classificar.values()])
+
+            processed_input = self.preprocessor.transform(input_df)
+
+            logger.info("-> Etapa 3: Classificando a complexidade...")
+            predictions = self.classifier.predict(processed_input)
+
+            novas_entradas = []
+            for (texto, info), prediction in zip(infos_para_classificar.items(), predictions):
+                complexity = "Complexo" if prediction == 1 else "Simples"
+                resultados[texto] = {
+                    "texto_original": texto,
+                    "info_extraida": info,
+                    "decisao_final": complexity
+                }
+                # Só respostas do LLM vão para o cache: ele também é a base de treino da triagem rápida.
+                if texto not in rapidas:
+                    novas_entradas.append((texto, info, complexity, self.assinatura_classificador))
+            self.cache.put_many(novas_entradas)
+
+        if self.triagem_rapida is not None:
+            self.triagem_rapida.compare(respostas_llm)
+
+        # As extrações bem-sucedidas já ficaram no cache; só então propagamos a falha.
+        if erros:
+            raise erros[0]
+
+        return [resultados[texto] for texto in textos]
@@ -0,0 +1,187 @@
+# src/agent/fast_triage.py
+import logging
+from collections import Counter
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, cross_val_predict
+
+import config
+from .call_generator import load_natural_language_bank
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_INFO = ("call_type", "call_type_group", "original_priority")
+# Regularização fraca: com poucas frases por tipo, C alto evita probabilidades achatadas
+# entre as dezenas de classes e torna o limiar de confiança utilizável.
+C_REGRESSAO = 100.0
+
+
+def call_type_profiles(df):
+    """
+    Grupo e prioridade mais frequentes de cada Call Type no dataset, no formato de
+    `EmergencyCallInfo`. Usado pela triagem rápida para tipos que o LLM ainda não viu.
+    """
+    perfis = {}
+    agrupado = df.dropna(subset=['Call Type', 'Call Type Group', 'Final Priority']).groupby('Call Type', observed=True)
+    for tipo, grupo in agrupado:
+        perfis[str(tipo)] = {
+            "call_type": str(tipo),
+            "call_type_group": str(grupo['Call Type Group'].mode().iloc[0]),
+            "original_priority": int(grupo['Final Priority'].mode().iloc[0]),
+        }
+    return perfis
+
+
+class FastTriage:
+    """
+    Triagem local em dois níveis, usada antes do LLM.
+
+    1. Textos conhecidos (frases do banco) saem direto da tabela de rótulos.
+    2. Textos novos passam por TF-IDF + regressão logística sobre o Call Type; se a
+       probabilidade da classe prevista atinge `limiar`, o grupo e a prioridade vêm do
+       perfil desse tipo. Abaixo do limiar, o texto é devolvido como None e vai ao LLM.
+
+    O treino usa as respostas do LLM já gravadas no cache quando existem, e o Call Type
+    de origem do banco (com o perfil do dataset) quando não existem; só as respostas do
+    LLM entram na tabela do primeiro nível. A concordância com o LLM vem sempre das
+    previsões do próprio modelo para textos que ele não viu: validação cruzada no
+    treino (`concordancia_validacao`) e, durante o uso, em `compare`.
+    """
+
+    def __init__(self, limiar=config.LIMIAR_TRIAGEM_RAPIDA):
+        self.limiar = limiar
+        self.rotulos = {}
+        self.perfis = {}
+        self.vetorizador = None
+        self.modelo = None
+        self.concordancia_validacao = None
+        self._treino = set()
+        self._previstos_validacao = {}
+        self.rapidas = 0
+        self.enviadas_llm = 0
+        self._comparadas = 0
+        self._acertos = Counter()
+
+    def fit(self, textos, infos, perfis_tipo=None, rotulos=None):
+        """
+        Treina com `textos` e suas `infos` (dicionários de `EmergencyCallInfo`). O perfil
+        de cada Call Type é a combinação (grupo, prioridade) mais frequente entre as
+        infos desse tipo; `perfis_tipo` completa os tipos sem nenhuma info. `rotulos`
+        ({texto: info}) é a tabela de textos conhecidos, devolvidos sem passar pelo modelo.
+        """
+        self.rotulos = {texto: dict(info) for texto, info in (rotulos or {}).items()}
+        self._treino = set(textos)
+        combinacoes = {}
+        for info in infos:
+            combinacoes.setdefault(info["call_type"], Counter())[
+                (info["call_type_group"], info["original_priority"])
+            ] += 1
+        self.perfis = dict(perfis_tipo or {})
+        for tipo, contagem in combinacoes.items():
+            grupo, prioridade = contagem.most_common(1)[0][0]
+            self.perfis[tipo] = {"call_type": tipo, "call_type_group": grupo, "original_priority": prioridade}
+
+        tipos = [info["call_type"] for info in infos]
+        if len(set(tipos)) < 2:
+            self.vetorizador = self.modelo = None
+            return self
+        self.vetorizador = TfidfVectorizer(ngram_range=(1, 2), sublinear_tf=True, strip_accents='unicode')
+        matriz = self.vetorizador.fit_transform(textos)
+        self.modelo = LogisticRegression(C=C_REGRESSAO, max_iter=1000)
+        self.modelo.fit(matriz, tipos)
+        self._validar(textos, matriz, np.array(tipos))
+        return self
+
+    def _validar(self, textos, matriz, tipos):
+        # Call Type previsto para cada texto do treino por um modelo que não o viu
+        # (validação cruzada); é a base das concordâncias reportadas.
+        _, contagens = np.unique(tipos, return_counts=True)
+        dobras = min(5, int(contagens.min()))
+        if dobras < 2:
+            return
+        previstos = cross_val_predict(
+            LogisticRegression(C=C_REGRESSAO, max_iter=1000), matriz, tipos,
+            cv=StratifiedKFold(dobras, shuffle=True, random_state=config.SEED)
+        )
+        self.concordancia_validacao = float(np.mean(previstos == tipos))
+        self._previstos_validacao = dict(zip(textos, previstos))
+
+    def predict(self, textos):
+        """
+        Retorna, para cada texto, o dicionário de `EmergencyCallInfo` previsto ou None
+        quando a confiança fica abaixo do limiar.
+        """
+        resultados = [self.rotulos.get(texto) for texto in textos]
+        novos = [i for i, info in enumerate(resultados) if info is None]
+        if novos and self.modelo is not None:
+            probabilidades = self.modelo.predict_proba(self.vetorizador.transform([textos[i] for i in novos]))
+            melhores = probabilidades.argmax(axis=1)
+            for i, classe, confianca in zip(novos, melhores, probabilidades[np.arange(len(novos)), melhores]):
+                tipo = self.modelo.classes_[classe]
+                if confianca >= self.limiar and tipo in self.perfis:
+                    resultados[i] = dict(self.perfis[tipo])
+        rapidas = sum(info is not None for info in resultados)
+        self.rapidas += rapidas
+        self.enviadas_llm += len(textos) - rapidas
+        return resultados
+
+    def compare(self, respostas_llm):
+        """
+        Compara as previsões do modelo com respostas do LLM ({texto: info}) e acumula a
+        concordância. Textos do treino usam a previsão da validação cruzada (de um modelo
+        que não os viu) e ficam de fora quando ela não existe; a tabela de `rotulos`
+        nunca entra na comparação.
+        """
+        if not respostas_llm or self.modelo is None:
+            return
+        previstos = {
+            texto: self._previstos_validacao[texto]
+            for texto in respostas_llm if texto in self._previstos_validacao
+        }
+        novos = [texto for texto in respostas_llm if texto not in self._treino]
+        if novos:
+            probabilidades = self.modelo.predict_proba(self.vetorizador.transform(novos))
+            previstos.update(zip(novos, self.modelo.classes_[probabilidades.argmax(axis=1)]))
+        for texto, tipo in previstos.items():
+            info_llm = respostas_llm[texto]
+            info = self.perfis.get(tipo, {"call_type": tipo})
+            self._comparadas += 1
+            for campo in CAMPOS_INFO:
+                self._acertos[campo] += info.get(campo) == info_llm.get(campo)
+
+    def stats(self):
+        """Chamadas resolvidas localmente, enviadas ao LLM e taxas de concordância com o LLM."""
+        return {
+            "rapidas": self.rapidas,
+            "enviadas_llm": self.enviadas_llm,
+            "comparadas": self._comparadas,
+            "concordancia_validacao": self.concordancia_validacao,
+            **{
+                f"concordancia_{campo}": self._acertos[campo] / self._comparadas if self._comparadas else None
+                for campo in CAMPOS_INFO
+            },
+        }
+
+
+def build_fast_triage(cache, perfis_tipo=None, limiar=config.LIMIAR_TRIAGEM_RAPIDA):
+    """
+    Treina a `FastTriage` com as frases do banco: cada frase é rotulada pela resposta
+    do LLM no cache, se houver, ou pelo Call Type de origem com o perfil do dataset.
+    Frases de tipos sem perfil nenhum ficam de fora. Só as respostas do LLM formam a
+    tabela de textos conhecidos; as demais frases passam pelo modelo e pelo limiar.
+    """
+    banco = load_natural_language_bank() or {}
+    tipo_por_frase = {frase: tipo for tipo, frases in banco.items() for frase in frases}
+    respostas_llm = cache.peek_many(tipo_por_frase)
+    perfis_tipo = perfis_tipo or {}
+
+    textos, infos = [], []
+    for frase, tipo in tipo_por_frase.items():
+        info = respostas_llm.get(frase) or perfis_tipo.get(tipo)
+        if info is not None:
+            textos.append(frase)
+            infos.append({campo: info[campo] for campo in CAMPOS_INFO})
+    logger.info("Triagem rápida: %d frases de treino (%d com resposta do LLM).", len(textos), len(respostas_llm))
+    return FastTriage(limiar).fit(textos, infos, perfis_tipo, rotulos=respostas_llm)
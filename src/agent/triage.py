@@ -0,0 +1,85 @@
+# src/agent/triage.py
+
+
+def _triagem_do_resultado(resultado_agente):
+    # A fila dos bombeiros atende primeiro os menores valores: prioridade 3 (risco de vida) vira 0.
+    # O Call Type Group define o tipo de unidade no modelo de despacho (ver src/simulation/dispatch.py).
+    info = resultado_agente['info_extraida']
+    prioridade = 3 - info.get('original_priority', 2)
+    return (prioridade, resultado_agente['decisao_final'], info.get('call_type_group'))
+
+
+def _print_cache_stats(agente_ia):
+    cache_stats = agente_ia.cache.stats()
+    print(f"-> Cache de triagem: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+          f"({cache_stats['entradas']} entradas).")
+    triagem_rapida = getattr(agente_ia, 'triagem_rapida', None)
+    if triagem_rapida is not None:
+        rapida = triagem_rapida.stats()
+        concordancia = ", ".join(
+            f"{campo} {rapida[f'concordancia_{campo}']:.1%}"
+            for campo in ("call_type", "call_type_group", "original_priority")
+            if rapida[f'concordancia_{campo}'] is not None
+        )
+        validacao = rapida['concordancia_validacao']
+        print(f"-> Triagem rápida: {rapida['rapidas']} textos resolvidos localmente, "
+              f"{rapida['enviadas_llm']} enviados ao LLM. "
+              f"Concordância do tipo em validação cruzada: "
+              f"{f'{validacao:.1%}' if validacao is not None else 'indisponível'} "
+              f"(previsões fora do treino comparadas ao LLM: {concordancia or 'sem comparações'}).")
+
+
+def triage_scenarios(agente_ia, cenarios):
+    """
+    Etapa de triagem executada antes das simulações.
+
+    Cada texto distinto é classificado uma única vez, em lote, pelo agente de IA e o resultado
+    é reaproveitado por todas as chamadas (e por todos os cenários de unidades) que
+    usam a mesma frase. Retorna uma lista alinhada com `cenarios`, contendo a tupla
+    (prioridade, decisão, grupo) de cada chamada.
+    """
+    textos_unicos = list(dict.fromkeys(cenarios))
+    print(f"Triando {len(textos_unicos)} textos distintos para {len(cenarios)} chamadas...")
+
+    resultados_por_texto = {}
+    for texto, resultado_agente in zip(textos_unicos, agente_ia.classify_calls(textos_unicos)):
+        resultados_por_texto[texto] = _triagem_do_resultado(resultado_agente)
+
+    print("-> Triagem concluída.")
+    _print_cache_stats(agente_ia)
+    return [resultados_por_texto[texto] for texto in cenarios]
+
+
+def triage_phrases(agente_ia, fonte):
+    """
+    Tria de uma vez todas as frases que uma `CallScenarioSource` pode sortear.
+    Retorna a tabela (prioridade, decisão, grupo) indexada pelo ID da frase.
+    """
+    print(f"Triando as {len(fonte.phrases)} frases do banco usadas nos cenários...")
+    tabela = [_triagem_do_resultado(resultado) for resultado in agente_ia.classify_calls(fonte.phrases)]
+    print("-> Triagem concluída.")
+    _print_cache_stats(agente_ia)
+    return tabela
+
+
+class TriagedCalls:
+    """
+    Sequência de triagens (prioridade, decisão, grupo), uma por chamada, gerada sob demanda a
+    partir de uma `CallScenarioSource` e da tabela de `triage_phrases`.
+
+    Pode ser iterada várias vezes (cada iteração repete a mesma sequência de chamadas,
+    como uma lista faria) e é enviada a processos trabalhadores sem materializar as
+    chamadas. Pode ser passada diretamente como `triagens` para `run_simulation`.
+    """
+
+    def __init__(self, fonte, tabela):
+        self.fonte = fonte
+        self.tabela = tabela
+
+    def __len__(self):
+        return len(self.fonte)
+
+    def __iter__(self):
+        tabela = self.tabela
+        for id_frase in self.fonte:
+            yield tabela[id_frase]
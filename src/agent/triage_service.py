@@ -0,0 +1,189 @@
+# src/agent/triage_service.py
+import collections
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import config
+from .triage import _triagem_do_resultado
+
+logger = logging.getLogger(__name__)
+
+_FIM = object()
+
+
+class TriageService:
+    """
+    Fila de triagem assíncrona na frente de um `EmergencyResponseAgent`.
+
+    `submit(texto)` devolve imediatamente um `Future` com a tupla (prioridade, decisão, grupo).
+    Uma thread despachante junta os pedidos da fila em lotes de até `tamanho_lote`
+    textos e os envia a `agente_ia.classify_calls`, que consulta o cache e chama o LLM
+    com `config.LLM_MAX_CONCURRENCY` requisições simultâneas. Só essa thread usa o
+    agente enquanto o serviço está aberto.
+
+    - Coalescência: pedidos de um texto já na fila ou já resolvido recentemente (até
+      `max_memoria` textos) recebem o mesmo resultado, sem novo envio ao agente.
+    - Contrapressão: no máximo `max_pendentes` textos distintos aguardam triagem; além
+      disso, `submit` bloqueia até algum lote terminar.
+    """
+
+    def __init__(self, agente_ia, max_pendentes=config.TRIAGEM_FILA_MAX, tamanho_lote=config.TRIAGEM_LOTE_MAX,
+                 max_memoria=config.TRIAGEM_MEMORIA_MAX):
+        self.agente_ia = agente_ia
+        self.tamanho_lote = tamanho_lote
+        self.max_memoria = max_memoria
+        self._vagas = threading.BoundedSemaphore(max_pendentes)
+        self._fila = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._em_andamento = {}
+        self._resolvidos = collections.OrderedDict()
+        self._contadores = collections.Counter()
+        self._tempo_bloqueado = 0.0
+        self._despachante = threading.Thread(target=self._despachar, name="triagem", daemon=True)
+        self._despachante.start()
+
+    def submit(self, texto):
+        """Enfileira a triagem de `texto` e retorna um `Future` com (prioridade, decisão, grupo)."""
+        with self._lock:
+            self._contadores['pedidos'] += 1
+            if texto in self._resolvidos:
+                self._resolvidos.move_to_end(texto)
+                self._contadores['coalescidos'] += 1
+                futuro = Future()
+                futuro.set_result(self._resolvidos[texto])
+                return futuro
+            if texto in self._em_andamento:
+                self._contadores['coalescidos'] += 1
+                return self._em_andamento[texto]
+
+        if not self._vagas.acquire(blocking=False):
+            inicio = time.perf_counter()
+            self._vagas.acquire()
+            self._tempo_bloqueado += time.perf_counter() - inicio
+            self._contadores['bloqueios'] += 1
+
+        with self._lock:
+            # Outro pedido do mesmo texto pode ter entrado enquanto esperávamos a vaga.
+            if texto in self._em_andamento:
+                self._vagas.release()
+                self._contadores['coalescidos'] += 1
+                return self._em_andamento[texto]
+            futuro = Future()
+            self._em_andamento[texto] = futuro
+        self._fila.put(texto)
+        return futuro
+
+    def _despachar(self):
+        while True:
+            primeiro = self._fila.get()
+            if primeiro is _FIM:
+                return
+            lote = [primeiro]
+            encerrar = False
+            while len(lote) < self.tamanho_lote:
+                try:
+                    texto = self._fila.get_nowait()
+                except queue.Empty:
+                    break
+                if texto is _FIM:
+                    encerrar = True
+                    break
+                lote.append(texto)
+
+            try:
+                triagens = [_triagem_do_resultado(r) for r in self.agente_ia.classify_calls(lote)]
+                erro = None
+            except Exception as e:  # o erro chega a quem espera pelo resultado
+                logger.warning("Falha ao triar um lote de %d textos: %s", len(lote), e)
+                triagens, erro = [None] * len(lote), e
+
+            with self._lock:
+                self._contadores['lotes'] += 1
+                self._contadores['enviados'] += len(lote)
+                futuros = [self._em_andamento.pop(texto) for texto in lote]
+                if erro is None:
+                    for texto, triagem in zip(lote, triagens):
+                        self._resolvidos[texto] = triagem
+                    while len(self._resolvidos) > self.max_memoria:
+                        self._resolvidos.popitem(last=False)
+            for futuro, triagem in zip(futuros, triagens):
+                if erro is None:
+                    futuro.set_result(triagem)
+                else:
+                    futuro.set_exception(erro)
+                self._vagas.release()
+            if encerrar:
+                return
+
+    def stats(self):
+        """Pedidos recebidos, coalescidos, textos enviados ao agente, lotes e contrapressão."""
+        with self._lock:
+            return {
+                "pedidos": self._contadores['pedidos'],
+                "coalescidos": self._contadores['coalescidos'],
+                "enviados": self._contadores['enviados'],
+                "lotes": self._contadores['lotes'],
+                "bloqueios": self._contadores['bloqueios'],
+                "tempo_bloqueado": self._tempo_bloqueado,
+            }
+
+    def close(self):
+        """Processa o que já está na fila e encerra a thread despachante."""
+        self._fila.put(_FIM)
+        self._despachante.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PrefetchedTriages:
+    """
+    Sequência de triagens (prioridade, decisão, grupo) obtidas durante a simulação, com a
+    mesma interface de `TriagedCalls`, mas sem tabela pré-calculada.
+
+    A cada iteração, abre um `TriageService` e mantém `antecedencia` chamadas à frente
+    do cursor de chegadas já enviadas à triagem: enquanto a simulação processa a
+    chamada i, as próximas estão sendo triadas. A simulação só espera quando alcança
+    uma triagem ainda não concluída. `fonte` é uma `CallScenarioSource` (IDs de frases)
+    ou uma sequência de textos.
+    """
+
+    def __init__(self, fonte, agente_ia, antecedencia=config.TRIAGEM_ANTECEDENCIA, **opcoes_servico):
+        self.fonte = fonte
+        self.agente_ia = agente_ia
+        self.antecedencia = antecedencia
+        self.opcoes_servico = opcoes_servico
+        self.ultimo_stats = None
+
+    def __len__(self):
+        return len(self.fonte)
+
+    def _textos(self):
+        if hasattr(self.fonte, 'text'):
+            return (self.fonte.text(id_frase) for id_frase in self.fonte)
+        return iter(self.fonte)
+
+    def __iter__(self):
+        with TriageService(self.agente_ia, **self.opcoes_servico) as servico:
+            textos = self._textos()
+            janela = collections.deque(servico.submit(texto) for texto in _primeiros(textos, self.antecedencia))
+            try:
+                while janela:
+                    futuro = janela.popleft()
+                    for texto in _primeiros(textos, 1):
+                        janela.append(servico.submit(texto))
+                    yield futuro.result()
+            finally:
+                self.ultimo_stats = servico.stats()
+                logger.info("Triagem sob demanda: %s", self.ultimo_stats)
+
+
+def _primeiros(iterador, n):
+    for _, item in zip(range(n), iterador):
+        yield item
@@ -1,41 +1,156 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
 import scipy.stats as st
 import warnings
 
+import config
+
 warnings.filterwarnings('ignore')
 
-def find_best_distribution(data_series):
+# Lista de distribuições a serem testadas que SÃO SEMPRE NÃO-NEGATIVAS (ver config.py).
+CANDIDATE_DISTRIBUTIONS = [getattr(st, nome) for nome in config.DISTRIBUICOES_CANDIDATAS]
+
+FITS_CACHE_DIR = os.path.join(config.CACHE_DIR, "distribuicoes")
+
+
+def fit_cache_key(data_series, distributions, subsample=None, seed=None):
+    """
+    Hash dos valores da série, dos nomes das distribuições candidatas e, com subamostra,
+    do tamanho e da semente que a sorteia (outra semente gera outra subamostra).
+    """
+    valores = np.ascontiguousarray(data_series.to_numpy(dtype=np.float64))
+    h = hashlib.blake2b(valores.tobytes(), digest_size=16)
+    h.update(",".join(d.name for d in distributions).encode('utf-8'))
+    if subsample is not None:
+        h.update(f"subamostra={subsample};semente={seed}".encode('utf-8'))
+    return h.hexdigest()
+
+
+def load_fit(chave):
+    """Retorna o ajuste salvo para a chave, ou None se ainda não existir."""
+    path = os.path.join(FITS_CACHE_DIR, f"{chave}.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def save_fit(chave, ajuste):
+    """Grava o ajuste (melhor distribuição, parâmetros e estatísticas KS de todas as candidatas)."""
+    os.makedirs(FITS_CACHE_DIR, exist_ok=True)
+    path = os.path.join(FITS_CACHE_DIR, f"{chave}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(ajuste, f, indent=2)
+
+
+def stratified_subsample(dados_ordenados, tamanho, rng):
+    """
+    Subamostra estratificada de um array ordenado: divide-o em `tamanho` estratos de
+    mesmo número de elementos e sorteia um valor em cada, preservando a forma da
+    distribuição (inclusive as caudas) com bem menos pontos.
+    """
+    n = len(dados_ordenados)
+    if tamanho is None or tamanho >= n:
+        return dados_ordenados
+    indices = ((np.arange(tamanho) + rng.random(tamanho)) * (n / tamanho)).astype(np.int64)
+    return dados_ordenados[np.minimum(indices, n - 1)]
+
+
+def ks_statistic(dados_ordenados, cdf):
+    """
+    Estatística D do teste KS contra uma CDF, reaproveitando um array já ordenado
+    (equivalente a `st.kstest(...)[0]`, sem reordenar os dados a cada candidata).
+    """
+    n = len(dados_ordenados)
+    cdf_vals = cdf(dados_ordenados)
+    d_plus = np.max(np.arange(1, n + 1) / n - cdf_vals)
+    d_minus = np.max(cdf_vals - np.arange(0, n) / n)
+    return float(max(d_plus, d_minus))
+
+
+def _fit_candidate(distribution, amostra):
+    """Ajusta uma candidata por MLE; roda nos processos trabalhadores no modo paralelo."""
+    inicio = time.perf_counter()
+    try:
+        params = distribution.fit(amostra)
+    except Exception:
+        params = None
+    return params, time.perf_counter() - inicio
+
+
+def find_best_distribution(data_series, use_cache=True, parallel=config.AJUSTE_PARALELO,
+                           subsample=config.AJUSTE_SUBAMOSTRA, seed=config.SEED):
     """
     Testa várias distribuições de probabilidade em uma série de dados e retorna a melhor
     com base no teste de Kolmogorov-Smirnov (KS).
+
+    Com `parallel`, cada candidata é ajustada em um processo separado. Com `subsample`,
+    o ajuste por MLE usa uma subamostra estratificada desse tamanho, mas o KS que define
+    a vencedora é sempre calculado sobre a série completa, ordenada uma única vez.
+
+    O resultado fica salvo em `config.CACHE_DIR`, indexado pelo hash da série, das
+    candidatas e da subamostra; uma nova execução com os mesmos dados reaproveita o ajuste sem refazê-lo.
     """
     print(f"Iniciando busca pela melhor distribuição para '{data_series.name}'...")
     
-    # Lista de distribuições a serem testadas que SÃO SEMPRE NÃO-NEGATIVAS.
-    distributions = [
-        st.expon,       # Exponencial: Clássica para tempos de chegada
-        st.lognorm,     # Log-Normal: Comum para tempos de serviço
-        st.gamma,       # Gamma: Flexível para tempos de espera
-        st.weibull_min  # Weibull: Usada em análises de confiabilidade e tempo de vida
-    ]
-    
-    best_distribution = None
-    best_params = None
-    best_ks_stat = np.inf
-
-    for distribution in distributions:
-        try:
-            params = distribution.fit(data_series)
-            D, p_value = st.kstest(data_series, distribution.name, args=params)
-            
-            if D < best_ks_stat:
+    distributions = CANDIDATE_DISTRIBUTIONS
+    chave = fit_cache_key(data_series, distributions, subsample, seed) if use_cache else None
+    ajuste = load_fit(chave) if use_cache else None
+
+    if ajuste is not None:
+        print("-> Ajuste reaproveitado do cache.")
+    else:
+        dados_ordenados = np.sort(data_series.to_numpy(dtype=np.float64))
+        amostra = stratified_subsample(dados_ordenados, subsample, np.random.default_rng(seed))
+
+        if parallel:
+            with ProcessPoolExecutor(max_workers=len(distributions)) as pool:
+                futuros = [pool.submit(_fit_candidate, distribution, amostra) for distribution in distributions]
+                ajustes = [futuro.result() for futuro in futuros]
+        else:
+            ajustes = [_fit_candidate(distribution, amostra) for distribution in distributions]
+
+        best_distribution = None
+        best_params = None
+        best_ks_stat = np.inf
+        ks_stats = {}
+        tempos = {}
+
+        for distribution, (params, tempo_ajuste) in zip(distributions, ajustes):
+            inicio = time.perf_counter()
+            try:
+                D = ks_statistic(dados_ordenados, lambda x: distribution.cdf(x, *params))
+            except Exception:
+                D = None
+            tempos[distribution.name] = {"ajuste_s": tempo_ajuste, "ks_s": time.perf_counter() - inicio}
+            ks_stats[distribution.name] = D
+            print(f"   {distribution.name:<12} KS = {D if D is not None else 'falhou'} "
+                  f"(ajuste {tempo_ajuste:.2f}s, KS {tempos[distribution.name]['ks_s']:.2f}s)")
+
+            if D is not None and D < best_ks_stat:
                 best_ks_stat = D
                 best_distribution = distribution
                 best_params = params
-        except Exception:
-            continue
 
+        ajuste = {
+            "distribuicao": best_distribution.name,
+            "params": [float(p) for p in best_params],
+            "ks": ks_stats,
+            "tamanho_amostra_ajuste": int(len(amostra)),
+            "tempos": tempos,
+        }
+        if use_cache:
+            save_fit(chave, ajuste)
+
+    best_distribution = getattr(st, ajuste["distribuicao"])
+    best_params = tuple(ajuste["params"])
     print(f"-> Melhor distribuição encontrada: {best_distribution.name}")
     print(f"-> Parâmetros: {best_params}")
-    return best_distribution, best_params
\ No newline at end of file
+    return best_distribution, best_params
@@ -0,0 +1,123 @@
+# src/simulation/arrivals.py
+import numpy as np
+
+import config
+
+MINUTOS_POR_HORA = 60
+HORAS_POR_SEMANA = 7 * 24
+MINUTOS_POR_SEMANA = HORAS_POR_SEMANA * MINUTOS_POR_HORA
+
+
+class ArrivalProfile:
+    """
+    Perfil semanal de taxas de chegada (processo de Poisson não homogêneo).
+
+    `taxas_por_hora` tem 168 posições, uma por hora da semana (segunda 00h = posição 0),
+    com a taxa média de chamadas por minuto naquela hora. O tempo 0 da simulação
+    corresponde a `inicio_minutos` minutos após segunda-feira 00h.
+    """
+
+    def __init__(self, taxas_por_hora, inicio_minutos=config.INICIO_SIMULACAO_MINUTOS):
+        taxas = np.asarray(taxas_por_hora, dtype=float)
+        if taxas.shape != (HORAS_POR_SEMANA,):
+            raise ValueError(f"O perfil precisa de {HORAS_POR_SEMANA} taxas horárias, recebeu {taxas.shape}.")
+        self.taxas = taxas
+        self.inicio_minutos = inicio_minutos
+        # Intensidade acumulada Λ no início de cada hora da semana (e no fim da semana).
+        self.acumulada = np.concatenate([[0.0], np.cumsum(taxas * MINUTOS_POR_HORA)])
+        self.chamadas_por_semana = self.acumulada[-1]
+
+    @classmethod
+    def from_dataframe(cls, df, coluna='Received DtTm', inicio_minutos=config.INICIO_SIMULACAO_MINUTOS):
+        """
+        Calcula as taxas a partir dos horários de recebimento do dataset: número de
+        chamadas em cada (dia da semana, hora) dividido pelo número de vezes em que
+        aquela hora aparece no período coberto. Horas sem observação recebem a taxa média.
+        """
+        horarios = df[coluna].dropna()
+        horas = horarios.dt.floor('h')
+        slot = (horarios.dt.dayofweek * 24 + horarios.dt.hour).to_numpy()
+        chamadas = np.bincount(slot, minlength=HORAS_POR_SEMANA).astype(float)
+
+        # Exposição: quantas horas de cada posição da semana existem entre a primeira e a última chamada.
+        todas_as_horas = np.arange(horas.min(), horas.max() + np.timedelta64(1, 'h'), np.timedelta64(1, 'h'))
+        todas_as_horas = todas_as_horas.astype('datetime64[h]')
+        dias = (todas_as_horas.astype('datetime64[D]').view('int64') + 3) % 7  # 1970-01-01 foi quinta-feira
+        slot_exposicao = dias * 24 + (todas_as_horas.view('int64') % 24)
+        exposicao = np.bincount(slot_exposicao, minlength=HORAS_POR_SEMANA).astype(float)
+
+        taxas = np.divide(chamadas, exposicao * MINUTOS_POR_HORA, out=np.zeros(HORAS_POR_SEMANA), where=exposicao > 0)
+        taxas[taxas <= 0] = chamadas.sum() / (exposicao.sum() * MINUTOS_POR_HORA)
+        return cls(taxas, inicio_minutos)
+
+    def rate_at(self, tempo):
+        """Taxa de chegada (chamadas/min) no tempo simulado `tempo`."""
+        hora = int(((tempo + self.inicio_minutos) % MINUTOS_POR_SEMANA) // MINUTOS_POR_HORA)
+        return self.taxas[hora]
+
+    def cumulative(self, tempos):
+        """Intensidade acumulada Λ desde segunda 00h até os instantes absolutos `tempos` (min)."""
+        tempos = np.asarray(tempos, dtype=float)
+        semanas, resto = np.divmod(tempos, MINUTOS_POR_SEMANA)
+        hora = np.minimum((resto // MINUTOS_POR_HORA).astype(np.int64), HORAS_POR_SEMANA - 1)
+        return (semanas * self.chamadas_por_semana + self.acumulada[hora]
+                + (resto - hora * MINUTOS_POR_HORA) * self.taxas[hora])
+
+    def inverse_cumulative(self, alvos):
+        """Inverte Λ: instantes absolutos (min desde segunda 00h) em que Λ atinge `alvos`."""
+        semanas, resto = np.divmod(np.asarray(alvos, dtype=float), self.chamadas_por_semana)
+        hora = np.minimum(np.searchsorted(self.acumulada, resto, side='right') - 1, HORAS_POR_SEMANA - 1)
+        return (semanas * MINUTOS_POR_SEMANA + hora * MINUTOS_POR_HORA
+                + (resto - self.acumulada[hora]) / self.taxas[hora])
+
+    def peak_rate(self):
+        """Maior taxa horária do perfil (chamadas/min)."""
+        return float(self.taxas.max())
+
+
+class NonHomogeneousArrivalStream:
+    """
+    Intervalos entre chegadas de um processo de Poisson não homogêneo, com a mesma
+    interface de `VariateStream` (`next` e `take`).
+
+    Sorteia por inversão, em blocos vetorizados: somas acumuladas de exponenciais de
+    taxa 1 são levadas ao tempo real pela inversa da intensidade acumulada do perfil.
+    """
+
+    def __init__(self, perfil, rng=None, tamanho_bloco=config.TAMANHO_BLOCO_VARIAVEIS):
+        self.perfil = perfil
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.tamanho_bloco = tamanho_bloco
+        self._tempo_absoluto = float(perfil.inicio_minutos)
+        self._buffer = []
+        self._pos = 0
+
+    def _sortear_bloco(self, n):
+        inicio = self._tempo_absoluto
+        alvos = self.perfil.cumulative(inicio) + np.cumsum(self.rng.exponential(1.0, n))
+        instantes = self.perfil.inverse_cumulative(alvos)
+        self._tempo_absoluto = float(instantes[-1])
+        return np.diff(instantes, prepend=inicio)
+
+    def next(self):
+        """Retorna o próximo intervalo entre chegadas."""
+        if self._pos == len(self._buffer):
+            self._buffer = self._sortear_bloco(self.tamanho_bloco).tolist()
+            self._pos = 0
+        valor = self._buffer[self._pos]
+        self._pos += 1
+        return valor
+
+    __next__ = next
+
+    def __iter__(self):
+        return self
+
+    def take(self, n):
+        """Retorna os próximos `n` intervalos entre chegadas como um array numpy."""
+        restantes = self._buffer[self._pos:]
+        if len(restantes) >= n:
+            self._pos += n
+            return np.array(restantes[:n])
+        self._buffer, self._pos = [], 0
+        return np.concatenate([np.array(restantes), self._sortear_bloco(n - len(restantes))])
@@ -0,0 +1,195 @@
+# src/simulation/capacity.py
+import itertools
+import math
+
+import numpy as np
+
+import config
+from .arrivals import ArrivalProfile
+from .environment import run_simulation
+from .metrics import t_quantile
+from .random_streams import distribution_moments
+
+
+def erlang_c(num_unidades, carga):
+    """
+    Probabilidade de espera de Erlang C para `num_unidades` servidores e carga
+    oferecida `carga` = λ/μ (em erlangs). Calculada pela recursão estável de Erlang B.
+    """
+    if carga >= num_unidades:
+        return 1.0
+    erlang_b = 1.0
+    for k in range(1, num_unidades + 1):
+        erlang_b = carga * erlang_b / (k + carga * erlang_b)
+    return num_unidades * erlang_b / (num_unidades - carga * (1 - erlang_b))
+
+
+def _media_e_cv2(distribution_tuple):
+    if isinstance(distribution_tuple, ArrivalProfile):
+        # Perfil horário: dimensiona pela hora de pico, com chegadas de Poisson (cv² = 1).
+        return 1.0 / distribution_tuple.peak_rate(), 1.0
+    return distribution_moments(distribution_tuple)
+
+
+def analytic_wait_quantile(num_unidades, distributions, quantil=config.QUANTIL_SLA):
+    """
+    Aproximação M/G/c (Erlang C com a correção de Allen-Cunneen) do quantil do tempo de
+    espera pelas unidades, a partir das distribuições ajustadas de chegada e de serviço.
+    Com um `ArrivalProfile` nas chegadas, usa a taxa da hora de pico.
+    Retorna infinito quando o sistema é instável (utilização >= 1).
+    """
+    media_chegadas, cv2_chegadas = _media_e_cv2(distributions['chegadas'])
+    media_servico, cv2_servico = _media_e_cv2(distributions['servico_bombeiros'])
+    taxa_chegada = 1.0 / media_chegadas
+    carga = taxa_chegada * media_servico
+    if carga >= num_unidades:
+        return math.inf
+
+    prob_espera = erlang_c(num_unidades, carga)
+    if prob_espera <= 1 - quantil:
+        return 0.0
+    # P(W > t) ≈ C·exp(-t/θ), com θ = E[W | W > 0] corrigido pela variabilidade.
+    theta = media_servico / (num_unidades - carga) * (cv2_chegadas + cv2_servico) / 2
+    return theta * math.log(prob_espera / (1 - quantil))
+
+
+def estimate_capacity(distributions, sla_minutos, quantil=config.QUANTIL_SLA, max_unidades=config.MAX_UNIDADES_OTIMIZADOR,
+                      min_unidades=1):
+    """Menor número de unidades, a partir de `min_unidades`, cujo quantil analítico de espera cumpre o SLA."""
+    for num_unidades in range(min_unidades, max_unidades + 1):
+        if analytic_wait_quantile(num_unidades, distributions, quantil) <= sla_minutos:
+            return num_unidades
+    return max_unidades
+
+
+def _avaliar_candidato(num_unidades, triagens, distributions, sla_minutos, quantil, sementes, confianca, motor,
+                       num_chamadas):
+    """
+    Roda replicações sequenciais de um candidato e para assim que o IC do quantil de
+    espera fica inteiramente acima do SLA (inviável) ou abaixo dele (viável).
+
+    Cada replicação simula as `num_chamadas` primeiras chamadas de `triagens`, sem o modo
+    automático (`MEIA_LARGURA_ALVO`): um candidato inviável é justamente uma fila que
+    não estabiliza. As amostras de espera são sempre armazenadas, qualquer que seja
+    `ARMAZENAR_AMOSTRAS`, porque o quantil é calculado sobre elas. Uma replicação sem
+    nenhuma espera medida (por exemplo, horizonte ou aquecimento que não deixam
+    chamadas atendidas) não permite verificar o SLA, e o candidato é inviável.
+    """
+    quantis = []
+    decisao = None
+    for semente in sementes:
+        stats = run_simulation(num_unidades, itertools.islice(triagens, num_chamadas), distributions,
+                               rng=np.random.default_rng(semente), motor=motor,
+                               armazenar_amostras=True, meia_largura_alvo=None)
+        esperas = stats['tempos_espera_bombeiros']
+        if not len(esperas):
+            quantis.append(math.inf)
+            decisao = 'inviável (sem amostras)'
+            break
+        quantis.append(float(np.quantile(esperas, quantil)))
+
+        if len(quantis) >= 2:
+            media = np.mean(quantis)
+            desvio = np.std(quantis, ddof=1)
+            meia_largura = t_quantile(confianca, len(quantis) - 1) * desvio / math.sqrt(len(quantis))
+            if media - meia_largura > sla_minutos:
+                decisao = 'inviável'
+                break
+            if media + meia_largura <= sla_minutos:
+                decisao = 'viável'
+                break
+
+    media = float(np.mean(quantis))
+    if len(quantis) >= 2 and math.isfinite(media):
+        meia_largura = float(t_quantile(confianca, len(quantis) - 1) * np.std(quantis, ddof=1) / math.sqrt(len(quantis)))
+    else:
+        meia_largura = math.nan
+    if decisao is None:
+        # Sem separação estatística após todas as replicações: decide pela média.
+        decisao = 'viável (inconclusivo)' if media <= sla_minutos else 'inviável (inconclusivo)'
+
+    return {
+        'Unidades': num_unidades,
+        'Replicações': len(quantis),
+        f'P{int(quantil * 100)} médio da espera (min)': media,
+        f'IC{int(confianca * 100)}% (±)': meia_largura,
+        'Decisão': decisao,
+    }
+
+
+def optimize_capacity(triagens, distributions, sla_minutos=config.SLA_ESPERA_MINUTOS, quantil=config.QUANTIL_SLA,
+                      replicacoes=config.REPLICACOES_OTIMIZADOR, confianca=0.95, seed=config.SEED,
+                      max_unidades=config.MAX_UNIDADES_OTIMIZADOR, motor=config.MOTOR_SIMULACAO, min_unidades=1,
+                      num_chamadas=config.NUM_CHAMADAS_SIMULADAS):
+    """
+    Busca o menor número de unidades cujo quantil `quantil` do tempo de espera fica
+    abaixo de `sla_minutos`.
+
+    Parte da estimativa analítica M/G/c, delimita o intervalo de busca (descendo se o
+    ponto de partida já é viável, subindo em passos dobrados se não é) e termina com
+    uma busca binária. Cada candidato recebe até `replicacoes` replicações, com as
+    mesmas sementes para todos (números aleatórios comuns), e é descartado assim que
+    fica claramente inviável. Nenhum candidato abaixo de `min_unidades` é simulado
+    (com frotas por tipo, é preciso ao menos uma unidade de cada tipo; ver
+    `dispatch.minimum_units`). Só as `num_chamadas` primeiras chamadas de `triagens`
+    são simuladas, mesmo que a sequência seja ilimitada.
+
+    Retorna um dicionário com a capacidade mínima viável, a estimativa analítica e um
+    DataFrame com a avaliação de cada candidato simulado.
+    """
+    import pandas as pd
+    sementes = np.random.SeedSequence(seed).spawn(replicacoes)
+    estimativa = estimate_capacity(distributions, sla_minutos, quantil, max_unidades, min_unidades)
+    print(f"Estimativa analítica (M/G/c): {estimativa} unidades para P{int(quantil * 100)} da espera <= {sla_minutos} min.")
+
+    avaliacoes = {}
+
+    def viavel(num_unidades):
+        if num_unidades not in avaliacoes:
+            avaliacoes[num_unidades] = _avaliar_candidato(
+                num_unidades, triagens, distributions, sla_minutos, quantil, sementes, confianca, motor, num_chamadas
+            )
+            linha = avaliacoes[num_unidades]
+            print(f"   {num_unidades} unidades: {linha['Decisão']} ({linha['Replicações']} replicações)")
+        return avaliacoes[num_unidades]['Decisão'].startswith('viável')
+
+    # 1. Delimita o intervalo [inviável, viável].
+    if viavel(estimativa):
+        viavel_min, inviavel_max = estimativa, 0
+        passo = 1
+        while viavel_min - passo >= min_unidades and viavel(viavel_min - passo):
+            viavel_min -= passo
+            passo *= 2
+        inviavel_max = max(min_unidades - 1, viavel_min - passo)
+    else:
+        inviavel_max, passo = estimativa, 1
+        viavel_min = None
+        while inviavel_max + passo <= max_unidades:
+            if viavel(inviavel_max + passo):
+                viavel_min = inviavel_max + passo
+                break
+            inviavel_max += passo
+            passo *= 2
+        if viavel_min is None:
+            viavel_min = max_unidades if viavel(max_unidades) else None
+
+    # 2. Busca binária dentro do intervalo.
+    if viavel_min is not None:
+        while viavel_min - inviavel_max > 1:
+            meio = (viavel_min + inviavel_max) // 2
+            if viavel(meio):
+                viavel_min = meio
+            else:
+                inviavel_max = meio
+
+    df_avaliacoes = pd.DataFrame(sorted(avaliacoes.values(), key=lambda linha: linha['Unidades']))
+    if viavel_min is None:
+        print(f"-> Nenhuma capacidade até {max_unidades} unidades cumpre o SLA.")
+    else:
+        print(f"-> Capacidade mínima viável: {viavel_min} unidades "
+              f"({len(avaliacoes)} candidatos simulados em vez de uma grade completa).")
+    return {
+        'unidades': viavel_min,
+        'estimativa_analitica': estimativa,
+        'avaliacoes': df_avaliacoes,
+    }
@@ -0,0 +1,220 @@
+# src/simulation/comparison.py
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import config
+from .fast_engine import _chegadas_ate_horizonte, simular_fila_prioridade
+from .metrics import t_quantile
+from .random_streams import build_streams, portable_distributions
+
+
+def _sem_chatbot(prioridades, simples):
+    return np.zeros(len(simples), dtype=bool)
+
+
+def _chatbot_nas_simples(prioridades, simples):
+    return simples
+
+
+# Políticas de triagem comparadas: cada uma recebe os arrays de prioridades e de
+# decisões 'Simples' do agente e retorna a máscara das chamadas atendidas pelo chatbot.
+# As demais vão para o operador humano. Novas políticas entram aqui (ou são passadas
+# diretamente como funções para `run_comparison`).
+POLITICAS = {
+    'baseline': _sem_chatbot,
+    'chatbot': _chatbot_nas_simples,
+}
+
+METRICAS_COMPARACAO = (
+    'Tempo médio de espera (min)',
+    'P90 do tempo de espera (min)',
+    'Tempo médio no sistema (min)',
+)
+
+# Estado compartilhado por todas as replicações de um processo trabalhador.
+_triagens_worker = None
+_distributions_worker = None
+_opcoes_worker = None
+
+
+def draw_common_numbers(triagens, distributions, rng, horizonte=config.HORIZONTE_SIMULACAO):
+    """
+    Sorteia, uma única vez, todos os números aleatórios de uma replicação.
+
+    Cada chamada recebe o instante de chegada, o tempo de serviço da unidade e os dois
+    tempos de atendimento possíveis (operador humano e chatbot), sorteados pelo índice
+    da chamada e não pela ordem de uso. Assim, trocar a política muda só qual dos dois
+    tempos a chamada usa: chegadas, serviços e os tempos das demais chamadas são os
+    mesmos em todas as políticas (números aleatórios comuns).
+    """
+    streams = build_streams(distributions, rng)
+    if horizonte is None:
+        triagens = list(triagens)
+        chegadas = np.cumsum(streams['chegadas'].take(len(triagens)))
+    else:
+        chegadas = _chegadas_ate_horizonte(streams['chegadas'], horizonte, config.TAMANHO_BLOCO_VARIAVEIS)
+        triagens = list(itertools.islice(triagens, len(chegadas)))
+        chegadas = chegadas[:len(triagens)]
+    n = len(triagens)
+    return {
+        'chegadas': chegadas,
+        'prioridades': np.fromiter((triagem[0] for triagem in triagens), dtype=np.int64, count=n),
+        'simples': np.fromiter((triagem[1] == 'Simples' for triagem in triagens), dtype=bool, count=n),
+        'servicos': streams['servico_bombeiros'].take(n),
+        'atendimento_humano': streams['atendimento_humano'].take(n),
+        'atendimento_chatbot': streams['atendimento_simples'].take(n),
+    }
+
+
+def evaluate_policy(numeros, num_unidades, chatbot, horizonte=config.HORIZONTE_SIMULACAO,
+                    aquecimento=config.PERIODO_AQUECIMENTO):
+    """
+    Simula uma política sobre os números de `draw_common_numbers`. `chatbot` é a
+    máscara das chamadas atendidas pelo chatbot. A fila das unidades é a mesma dos
+    motores de simulação; retorna as métricas de `METRICAS_COMPARACAO` e a contagem
+    de chamadas, com as mesmas regras de horizonte e aquecimento de `run_simulation`.
+    """
+    chegadas, servicos = numeros['chegadas'], numeros['servicos']
+    atendimento = np.where(chatbot, numeros['atendimento_chatbot'], numeros['atendimento_humano'])
+    entradas_fila = chegadas + atendimento
+    inicios = simular_fila_prioridade(entradas_fila, numeros['prioridades'], servicos, num_unidades)
+    fins = inicios + servicos
+
+    limite = horizonte if horizonte is not None else np.inf
+    medidas = chegadas >= aquecimento
+    esperas = (inicios - entradas_fila)[medidas & (inicios <= limite)]
+    no_sistema = (fins - chegadas)[medidas & (fins <= limite)]
+    return {
+        'Chamadas Atendidas': int(medidas.sum()),
+        'Chatbot': int((chatbot & medidas).sum()),
+        'Tempo médio de espera (min)': float(esperas.mean()) if len(esperas) else np.nan,
+        'P90 do tempo de espera (min)': float(np.percentile(esperas, 90)) if len(esperas) else np.nan,
+        'Tempo médio no sistema (min)': float(no_sistema.mean()) if len(no_sistema) else np.nan,
+    }
+
+
+def _resolver_politicas(politicas):
+    """Aceita nomes de `POLITICAS` ou um dicionário nome -> função."""
+    if isinstance(politicas, dict):
+        return politicas
+    desconhecidas = [nome for nome in politicas if nome not in POLITICAS]
+    if desconhecidas:
+        raise ValueError(f"Políticas desconhecidas: {desconhecidas}. Use {list(POLITICAS)}.")
+    return {nome: POLITICAS[nome] for nome in politicas}
+
+
+def compare_replication(triagens, distributions, cenarios_unidades, semente, politicas=tuple(POLITICAS),
+                        horizonte=config.HORIZONTE_SIMULACAO, aquecimento=config.PERIODO_AQUECIMENTO):
+    """
+    Uma replicação do estudo comparativo: sorteia os números aleatórios uma vez e
+    avalia todas as políticas em todos os cenários de unidades sobre eles.
+    Retorna uma linha por (unidades, política).
+    """
+    politicas = _resolver_politicas(politicas)
+    numeros = draw_common_numbers(triagens, distributions, np.random.default_rng(semente), horizonte)
+    linhas = []
+    for nome, politica in politicas.items():
+        chatbot = np.asarray(politica(numeros['prioridades'], numeros['simples']), dtype=bool)
+        for num_unidades in cenarios_unidades:
+            linha = {'Unidades': num_unidades, 'Política': nome}
+            linha.update(evaluate_policy(numeros, num_unidades, chatbot, horizonte, aquecimento))
+            linhas.append(linha)
+    return linhas
+
+
+def _iniciar_worker(triagens, distributions, opcoes):
+    global _triagens_worker, _distributions_worker, _opcoes_worker
+    _triagens_worker = triagens
+    _distributions_worker = distributions
+    _opcoes_worker = opcoes
+
+
+def _executar_replicacao(job):
+    replicacao, semente = job
+    linhas = compare_replication(_triagens_worker, _distributions_worker, semente=semente, **_opcoes_worker)
+    for linha in linhas:
+        linha['Replicação'] = replicacao
+    return linhas
+
+
+def summarize_paired_differences(df_comparacao, referencia='baseline', confianca=0.95):
+    """
+    Diferenças pareadas de cada política em relação à `referencia`, por número de
+    unidades: média da diferença entre replicações e meia-largura do IC (t de Student)
+    calculada sobre as diferenças de cada replicação.
+
+    Também informa a meia-largura que o mesmo número de replicações teria com
+    políticas simuladas de forma independente e a redução de variância, que é a razão
+    entre as duas variâncias, ou seja, quantas vezes mais replicações seriam
+    necessárias sem números aleatórios comuns para a mesma precisão.
+    """
+    import pandas as pd
+    base = df_comparacao[df_comparacao['Política'] == referencia].set_index(['Unidades', 'Replicação'])
+    sufixo = f'± IC{int(confianca * 100)}%'
+    linhas = []
+    for (num_unidades, politica), grupo in df_comparacao.groupby(['Unidades', 'Política'], sort=False):
+        if politica == referencia:
+            continue
+        grupo = grupo.set_index(['Unidades', 'Replicação'])
+        pares = base.loc[grupo.index]
+        n = len(grupo)
+        t = t_quantile(confianca, n - 1) if n > 1 else np.nan
+        linha = {'Unidades': num_unidades, 'Política': politica, 'Referência': referencia, 'Replicações': n}
+        for metrica in METRICAS_COMPARACAO:
+            diferencas = grupo[metrica] - pares[metrica]
+            var_pareada = diferencas.var(ddof=1) if n > 1 else np.nan
+            var_independente = (grupo[metrica].var(ddof=1) + pares[metrica].var(ddof=1)) if n > 1 else np.nan
+            meia_largura = t * np.sqrt(var_pareada / n)
+            linha[f'Diferença {metrica}'] = diferencas.mean()
+            linha[f'Diferença {metrica} {sufixo}'] = meia_largura
+            linha[f'Diferença {metrica} {sufixo} (independente)'] = t * np.sqrt(var_independente / n)
+            if var_pareada > 0:
+                reducao = var_independente / var_pareada
+            else:
+                reducao = np.inf if var_independente > 0 else np.nan
+            linha[f'Redução de variância {metrica}'] = reducao
+            linha[f'Significativa {metrica}'] = bool(abs(diferencas.mean()) > meia_largura)
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+def run_comparison(triagens, distributions, cenarios_unidades, num_replicacoes=config.REPLICACOES_COMPARACAO,
+                   politicas=tuple(POLITICAS), referencia='baseline', seed=config.SEED,
+                   horizonte=config.HORIZONTE_SIMULACAO, aquecimento=config.PERIODO_AQUECIMENTO,
+                   max_workers=config.MAX_WORKERS):
+    """
+    Estudo comparativo entre políticas com números aleatórios comuns.
+
+    `politicas` são nomes de `POLITICAS` (ou um dicionário nome -> função definida no
+    nível do módulo, para poder ir aos processos trabalhadores). As sementes
+    das replicações são as mesmas de `build_jobs`, e cada replicação é executada uma
+    única vez para todas as políticas e cenários. Retorna dois DataFrames: as métricas
+    de cada (unidades, política, replicação) e as diferenças pareadas em relação à
+    `referencia` (ver `summarize_paired_differences`).
+    """
+    import pandas as pd
+    opcoes = {
+        'cenarios_unidades': list(cenarios_unidades),
+        'politicas': _resolver_politicas(politicas),
+        'horizonte': horizonte,
+        'aquecimento': aquecimento,
+    }
+    if referencia not in opcoes['politicas']:
+        raise ValueError(f"A política de referência '{referencia}' não está entre as comparadas.")
+    sementes = np.random.SeedSequence(seed).spawn(num_replicacoes)
+    jobs = list(enumerate(sementes))
+
+    print(f"Comparando {len(opcoes['politicas'])} políticas em {num_replicacoes} replicações...")
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_iniciar_worker,
+        initargs=(triagens, portable_distributions(distributions), opcoes)
+    ) as pool:
+        linhas = [linha for linhas_job in pool.map(_executar_replicacao, jobs) for linha in linhas_job]
+
+    colunas = ['Unidades', 'Política', 'Replicação', 'Chamadas Atendidas', 'Chatbot', *METRICAS_COMPARACAO]
+    df_comparacao = pd.DataFrame(linhas)[colunas]
+    print("-> Comparação concluída.")
+    return df_comparacao, summarize_paired_differences(df_comparacao, referencia)
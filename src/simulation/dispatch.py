@@ -0,0 +1,162 @@
+# src/simulation/dispatch.py
+import heapq
+import itertools
+
+import simpy
+from simpy.resources.resource import Preempted
+
+import config
+
+TIPO_UNICO = "unidade"  # Nome da frota quando as unidades não são divididas por tipo
+
+
+def unit_type(grupo, mapa=None, padrao=None):
+    """Tipo de unidade despachado para o Call Type Group informado pela triagem."""
+    mapa = config.TIPO_UNIDADE_POR_GRUPO if mapa is None else mapa
+    padrao = config.TIPO_UNIDADE_PADRAO if padrao is None else padrao
+    return mapa.get(grupo, padrao)
+
+
+def minimum_units(proporcoes=None):
+    """
+    Menor número de unidades de um cenário: uma por tipo de `proporcoes` (padrão:
+    `PROPORCAO_TIPOS_UNIDADE`) ou uma só, com frota única.
+    """
+    proporcoes = config.PROPORCAO_TIPOS_UNIDADE if proporcoes is None else proporcoes
+    return max(1, len(proporcoes or ()))
+
+
+def split_fleet(num_unidades, proporcoes):
+    """
+    Divide `num_unidades` entre os tipos de `proporcoes` (tipo -> peso) pelo método
+    dos maiores restos, com ao menos uma unidade de cada tipo.
+    """
+    if num_unidades < len(proporcoes):
+        raise ValueError(f"São necessárias ao menos {len(proporcoes)} unidades para os tipos {list(proporcoes)}.")
+    total = sum(proporcoes.values())
+    cotas = {tipo: num_unidades * peso / total for tipo, peso in proporcoes.items()}
+    frota = {tipo: max(1, int(cota)) for tipo, cota in cotas.items()}
+    sobra = num_unidades - sum(frota.values())
+    while sobra != 0:
+        if sobra > 0:
+            tipo = max(frota, key=lambda t: cotas[t] - frota[t])
+            frota[tipo] += 1
+            sobra -= 1
+        else:
+            tipo = min((t for t in frota if frota[t] > 1), key=lambda t: cotas[t] - frota[t])
+            frota[tipo] -= 1
+            sobra += 1
+    return frota
+
+
+class UnitRequest(simpy.Event):
+    """
+    Pedido de uma unidade. O evento dispara com o número da unidade alocada; `inicio`
+    é o instante da alocação.
+    """
+
+    def __init__(self, env, prioridade, ordem, processo):
+        super().__init__(env)
+        self.prioridade = prioridade
+        self.ordem = ordem
+        self.processo = processo
+        self.unidade = None
+        self.inicio = None
+
+
+class UnitPool:
+    """
+    Frota de unidades de um tipo, com fila por prioridade e preempção opcional.
+
+    As unidades livres ficam em um conjunto (retirar e devolver são O(1)), a fila de
+    espera é um heap (prioridade, ordem de entrada) e, com preempção, as chamadas em
+    serviço ficam em um segundo heap, da menos urgente para a mais urgente, de onde a
+    vítima sai em O(log n). Nenhuma operação percorre a frota, o que mantém o custo
+    por evento estável com dezenas de unidades e centenas de chamadas simultâneas.
+    """
+
+    def __init__(self, env, tipo, capacidade, preempcao=False):
+        self.env = env
+        self.tipo = tipo
+        self.capacidade = capacidade
+        self.preempcao = preempcao
+        self.livres = set(range(capacidade))
+        self.em_servico = {}  # unidade -> UnitRequest
+        self.fila = []
+        self.preempcoes = 0
+        self._vitimas = []  # (-prioridade, -ordem, seq, pedido), com remoção preguiçosa
+        self._ordem = itertools.count()
+        self._seq = itertools.count()
+
+    def request(self, prioridade, processo, ordem=None, preemptivo=False):
+        """
+        Pede uma unidade para `processo`. Com `preemptivo` (e preempção ligada na
+        frota), o pedido pode tomar a unidade da chamada em serviço menos urgente, cujo
+        processo recebe um `simpy.Interrupt` com causa `Preempted`. `ordem` preserva a
+        posição original na fila de uma chamada interrompida que volta a pedir unidade.
+        """
+        pedido = UnitRequest(self.env, prioridade, next(self._ordem) if ordem is None else ordem, processo)
+        if self.livres:
+            self._alocar(pedido, self.livres.pop())
+        elif not (self.preempcao and preemptivo and self._preemptar(pedido)):
+            heapq.heappush(self.fila, (pedido.prioridade, pedido.ordem, next(self._seq), pedido))
+        return pedido
+
+    def release(self, pedido):
+        """Devolve a unidade de `pedido` e a passa para o próximo da fila, se houver."""
+        unidade = pedido.unidade
+        if self.em_servico.get(unidade) is not pedido:
+            return  # A unidade já foi tomada por uma preempção
+        del self.em_servico[unidade]
+        if self.fila:
+            self._alocar(heapq.heappop(self.fila)[-1], unidade)
+        else:
+            self.livres.add(unidade)
+        if len(self._vitimas) > 2 * len(self.em_servico) + 64:
+            self._vitimas = [item for item in self._vitimas if self._ativo(item[-1])]
+            heapq.heapify(self._vitimas)
+
+    def _ativo(self, pedido):
+        return self.em_servico.get(pedido.unidade) is pedido
+
+    def _alocar(self, pedido, unidade):
+        pedido.unidade = unidade
+        pedido.inicio = self.env.now
+        self.em_servico[unidade] = pedido
+        if self.preempcao:
+            heapq.heappush(self._vitimas, (-pedido.prioridade, -pedido.ordem, next(self._seq), pedido))
+        pedido.succeed(unidade)
+
+    def _preemptar(self, pedido):
+        while self._vitimas:
+            vitima = self._vitimas[0][-1]
+            if not self._ativo(vitima):
+                heapq.heappop(self._vitimas)
+                continue
+            if vitima.prioridade <= pedido.prioridade:
+                return False
+            heapq.heappop(self._vitimas)
+            del self.em_servico[vitima.unidade]
+            vitima.processo.interrupt(Preempted(by=pedido.processo, usage_since=vitima.inicio, resource=self))
+            self.preempcoes += 1
+            self._alocar(pedido, vitima.unidade)
+            return True
+        return False
+
+
+def build_fleets(env, num_unidades, proporcoes=None, preempcao=False):
+    """
+    Frotas do modelo de despacho: uma por tipo de `proporcoes` ou, sem tipos, uma
+    única frota com todas as unidades. Todo tipo de `TIPO_UNIDADE_POR_GRUPO` precisa
+    ter frota, senão as chamadas desse grupo nunca seriam atendidas.
+    """
+    if not proporcoes:
+        return {TIPO_UNICO: UnitPool(env, TIPO_UNICO, num_unidades, preempcao)}
+    tipos_usados = set(config.TIPO_UNIDADE_POR_GRUPO.values()) | {config.TIPO_UNIDADE_PADRAO}
+    sem_frota = sorted(tipos_usados - set(proporcoes))
+    if sem_frota:
+        raise ValueError(f"Tipos de unidade sem frota em PROPORCAO_TIPOS_UNIDADE: {sem_frota}.")
+    return {
+        tipo: UnitPool(env, tipo, quantidade, preempcao)
+        for tipo, quantidade in split_fleet(num_unidades, proporcoes).items()
+    }
@@ -1,96 +1,318 @@
 # src/simulation/environment.py
+import time
+
 import simpy
-import numpy as np
+from simpy.core import EmptySchedule
 
-def get_random_time(distribution_tuple):
-    """Função auxiliar para sortear um tempo de uma distribuição e garantir que seja positivo."""
-    dist, params = distribution_tuple
-    return max(0, dist.rvs(*params))
+import config
+from src.utils import instrumentation
+from .arrivals import ArrivalProfile, MINUTOS_POR_SEMANA
+from .dispatch import build_fleets, unit_type
+from .fast_engine import run_simulation_fast
+from .metrics import BatchMeansMonitor, MetricSeries, new_stats, finalize_stats, discard_stats
+from .random_streams import build_streams, distribution_moments
+from .tracing import (
+    EventTracer, NIVEL_DESLIGADO, EVENTO_CHEGADA, EVENTO_INICIO_CHATBOT, EVENTO_INICIO_HUMANO,
+    EVENTO_ENTRADA_FILA, EVENTO_INICIO_SERVICO, EVENTO_FIM, EVENTO_PREEMPCAO
+)
 
 class CentralDeEmergencia:
     """
-    O único recurso com fila são as unidades de bombeiros.
+    No modelo original, o único recurso com fila são as unidades de bombeiros. Com o
+    modelo de despacho, operadores e conversas do chatbot passam a ter capacidade
+    limitada, e as unidades ficam em frotas por tipo (ver dispatch.py), com preempção
+    opcional pelas chamadas de risco de vida.
+    """
+    def __init__(self, env, num_unidades, num_operadores=None, capacidade_chatbot=None,
+                 proporcao_tipos=None, preempcao=False):
+        self.operadores = simpy.PriorityResource(env, capacity=num_operadores) if num_operadores else None
+        self.chatbot = simpy.Resource(env, capacity=capacidade_chatbot) if capacidade_chatbot else None
+        if proporcao_tipos or preempcao:
+            self.bombeiros = None
+            self.frotas = build_fleets(env, num_unidades, proporcao_tipos, preempcao)
+        else:
+            self.bombeiros = simpy.PriorityResource(env, capacity=num_unidades)
+            self.frotas = None
+
+    def frota(self, grupo):
+        """Frota que atende o Call Type Group informado."""
+        if len(self.frotas) == 1:
+            return next(iter(self.frotas.values()))
+        return self.frotas[unit_type(grupo)]
+
+def _atendimento(env, recurso, duracao, stats_locais, prioridade=None):
+    """
+    Atendimento inicial por operador ou chatbot. Sem `recurso` (capacidade ilimitada)
+    é só a espera pelo tempo de atendimento, como no modelo original.
+    """
+    if recurso is None:
+        if 'tempos_espera_atendimento' in stats_locais:
+            stats_locais['tempos_espera_atendimento'].append(0.0)
+        yield env.timeout(duracao)
+        return
+    inicio_espera = env.now
+    with (recurso.request() if prioridade is None else recurso.request(priority=prioridade)) as pedido:
+        yield pedido
+        stats_locais['tempos_espera_atendimento'].append(env.now - inicio_espera)
+        yield env.timeout(duracao)
+
+def _servico_despachado(env, id_chamada, central, prioridade, grupo, tempo_servico, stats_locais, rastreador, monitor):
+    """
+    Serviço por uma unidade da frota do tipo da chamada. Com preempção, as chamadas de
+    prioridade 0 (risco de vida) podem tomar a unidade da chamada menos urgente em
+    serviço; a interrompida volta à fila na posição que tinha e, quando recebe outra
+    unidade, cumpre só o tempo de serviço que faltava.
     """
-    def __init__(self, env, num_unidades):
-        self.bombeiros = simpy.PriorityResource(env, capacity=num_unidades)
+    frota = central.frota(grupo)
+    processo = env.active_process
+    tempo_entrada_fila = env.now
+    restante = tempo_servico
+    ordem = None
+    iniciado = False
+    while True:
+        pedido = frota.request(prioridade, processo, ordem, preemptivo=prioridade == 0)
+        ordem = pedido.ordem
+        try:
+            # A preempção pode chegar já na alocação, antes de o processo retomar: a
+            # espera pelo pedido também fica dentro do `try`.
+            yield pedido
+            if not iniciado:
+                iniciado = True
+                tempo_espera = env.now - tempo_entrada_fila
+                stats_locais['tempos_espera_bombeiros'].append(tempo_espera)
+                if monitor is not None:
+                    monitor.add(tempo_espera)
+                stats_locais['tempos_servico_bombeiros'].append(tempo_servico)
+            if rastreador.ativo:
+                rastreador.registrar(id_chamada, EVENTO_INICIO_SERVICO, env.now)
+            yield env.timeout(restante)
+        except simpy.Interrupt:
+            restante -= env.now - pedido.inicio
+            stats_locais['preempcoes'] += 1
+            if rastreador.ativo:
+                rastreador.registrar(id_chamada, EVENTO_PREEMPCAO, env.now)
+            if restante <= 0:
+                return
+            continue
+        frota.release(pedido)
+        return
 
-def chamada(env, nome, central, agente_ia, cenario, distributions, stats_locais):
+def chamada(env, id_chamada, central, triagem, streams, stats_locais, rastreador, monitor=None):
     """
     Processo que simula a jornada completa de uma chamada.
     """
     stats_locais['total_chamadas'] += 1
     tempo_chegada = env.now
+    rastrear = rastreador.ativo
     
-    # Etapa 1: Triagem imediata pelo Agente de IA, que usa o modelo de ML internamente.
-    resultado_agente = agente_ia.classify_call(cenario['texto'])
-    prioridade = 3 - resultado_agente['info_extraida'].get('original_priority', 2)
+    # Etapa 1: Triagem pelo Agente de IA, já calculada antes da simulação (ver src/agent/triage.py).
+    # O grupo (terceiro item) só é usado para escolher o tipo de unidade no modelo de despacho.
+    prioridade, decisao_modelo = triagem[0], triagem[1]
+    grupo = triagem[2] if len(triagem) > 2 else None
     
-    print(f"{env.now:.2f}: {nome} (Prioridade {prioridade}) chega.")
-
-
-    decisao_modelo = resultado_agente['decisao_final']
+    # O tempo de serviço é sorteado na chegada, e não no início do serviço: assim a
+    # n-ésima chamada recebe o n-ésimo valor do fluxo em qualquer motor (ver fast_engine.py).
+    # Pelo mesmo motivo, o tempo de atendimento também é sorteado antes de qualquer fila.
+    tempo_servico = streams['servico_bombeiros'].next()
     
+    if rastrear:
+        rastreador.registrar(id_chamada, EVENTO_CHEGADA, env.now)
+
     if decisao_modelo == 'Simples':
         stats_locais['chamadas_simples'] += 1
-        print(f"{env.now:.2f}: {nome} (Classificado como Simples) sendo atendido por chatbot...")
+        if rastrear:
+            rastreador.registrar(id_chamada, EVENTO_INICIO_CHATBOT, env.now)
         
         # Simula o tempo de atendimento do chatbot para coletar informações.
-        tempo_atendimento = get_random_time(distributions['atendimento_simples']) * 0.5
-        yield env.timeout(tempo_atendimento)
-        
-        print(f"{env.now:.2f}: {nome} (Simples) entra na fila para despacho.")
+        # O fluxo já aplica o fator de redução do chatbot (config.FATOR_TEMPO_CHATBOT).
+        yield from _atendimento(env, central.chatbot, streams['atendimento_simples'].next(), stats_locais)
         
     else: # Se a decisão do modelo for 'Complexo'
         stats_locais['chamadas_complexas'] += 1
-        print(f"{env.now:.2f}: {nome} (Classificado como Complexo) sendo atendido por humano...")
+        if rastrear:
+            rastreador.registrar(id_chamada, EVENTO_INICIO_HUMANO, env.now)
         
-        # Simula o tempo de atendimento de um operador humano.
-        yield env.timeout(get_random_time(distributions['atendimento_humano']))
-        
-        print(f"{env.now:.2f}: {nome} (Complexo) entra na fila para despacho.")
+        # Simula o tempo de atendimento de um operador humano; os operadores
+        # disponíveis atendem primeiro as chamadas mais urgentes.
+        yield from _atendimento(env, central.operadores, streams['atendimento_humano'].next(), stats_locais, prioridade)
 
     # --- ETAPA COMUM: Fila e Serviço dos Bombeiros ---
     # Todas as chamadas, simples ou complexas, que precisam de uma unidade, chegam aqui.
     
     tempo_entrada_fila_bombeiros = env.now
-    with central.bombeiros.request(priority=prioridade) as req_bombeiros:
-        yield req_bombeiros
-        stats_locais['tempos_espera_bombeiros'].append(env.now - tempo_entrada_fila_bombeiros)
-        
-        print(f"{env.now:.2f}: {nome} é atendido pelos bombeiros.")
-        
-        tempo_servico = get_random_time(distributions['servico_bombeiros'])
-        stats_locais['tempos_servico_bombeiros'].append(tempo_servico)
-        yield env.timeout(tempo_servico)
+    if rastrear:
+        rastreador.registrar(id_chamada, EVENTO_ENTRADA_FILA, env.now)
+    if central.frotas is not None:
+        yield from _servico_despachado(env, id_chamada, central, prioridade, grupo, tempo_servico,
+                                       stats_locais, rastreador, monitor)
+    else:
+        with central.bombeiros.request(priority=prioridade) as req_bombeiros:
+            yield req_bombeiros
+            tempo_espera = env.now - tempo_entrada_fila_bombeiros
+            stats_locais['tempos_espera_bombeiros'].append(tempo_espera)
+            if monitor is not None:
+                monitor.add(tempo_espera)
+            if rastrear:
+                rastreador.registrar(id_chamada, EVENTO_INICIO_SERVICO, env.now)
+            
+            stats_locais['tempos_servico_bombeiros'].append(tempo_servico)
+            yield env.timeout(tempo_servico)
         
     stats_locais['tempos_atendimento_total'].append(env.now - tempo_chegada)
-    print(f"{env.now:.2f}: {nome} finaliza o atendimento.")
+    if rastrear:
+        rastreador.registrar(id_chamada, EVENTO_FIM, env.now)
+
+def gerador_de_chamadas(env, central, triagens, streams, stats_locais, rastreador,
+                        aquecimento=0.0, stats_aquecimento=None, monitor=None):
+    """
+    Gera novas chamadas em intervalos de tempo aleatórios. As chamadas que chegam
+    antes de `aquecimento` registram suas métricas em `stats_aquecimento` (descartadas).
+    """
+    chegadas = streams['chegadas']
+    for i, triagem in enumerate(triagens):
+        yield env.timeout(chegadas.next())
+        if env.now < aquecimento:
+            env.process(chamada(env, i + 1, central, triagem, streams, stats_aquecimento, rastreador))
+        else:
+            env.process(chamada(env, i + 1, central, triagem, streams, stats_locais, rastreador, monitor))
+
+def _capacidade_inicial(triagens):
+    """Número de chamadas, se conhecido, para pré-alocar as séries de tempos."""
+    try:
+        return len(triagens)
+    except TypeError:
+        return config.TAMANHO_BLOCO_VARIAVEIS
+
+def _utilizacao(distributions, num_unidades):
+    """
+    Utilização média das unidades, λ·E[S]/c. Com um `ArrivalProfile`, usa a taxa média
+    da semana: a fila só é estável no longo prazo se ela ficar abaixo de 1.
+    """
+    chegadas = distributions['chegadas']
+    if isinstance(chegadas, ArrivalProfile):
+        taxa_chegada = chegadas.chamadas_por_semana / MINUTOS_POR_SEMANA
+    else:
+        taxa_chegada = 1.0 / distribution_moments(chegadas)[0]
+    return taxa_chegada * distribution_moments(distributions['servico_bombeiros'])[0] / num_unidades
 
-def gerador_de_chamadas(env, central, agente_ia, cenarios, distributions, stats_locais):
+def _processar_eventos(env, limite=float('inf'), monitor=None):
     """
-    Gera novas chamadas em intervalos de tempo aleatórios.
+    Processa os eventos do ambiente um a um até o próximo passar de `limite`, a fila
+    esvaziar ou o `monitor` (parada automática) concluir. Retorna quantos eventos foram
+    processados, contados só com a API pública do SimPy (`peek` e `step`).
     """
-    for i, cenario_texto in enumerate(cenarios):
-        yield env.timeout(get_random_time(distributions['chegadas']))
-        cenario_completo = {"texto": cenario_texto, "id": i+1}
-        env.process(chamada(env, f'Chamada-{i+1}', central, agente_ia, cenario_completo, distributions, stats_locais))
+    eventos = 0
+    if limite == float('inf') and monitor is None:
+        # Caso comum (até esgotar as chamadas): sem `peek` a cada passo.
+        passo = env.step
+        try:
+            while True:
+                passo()
+                eventos += 1
+        except EmptySchedule:
+            return eventos
+    while monitor is None or not monitor.concluido:
+        proximo = env.peek()
+        if proximo > limite or proximo == float('inf'):
+            break
+        env.step()
+        eventos += 1
+    return eventos
 
-def run_simulation(num_unidades, agente_ia, cenarios, distributions):
+def run_simulation(num_unidades, triagens, distributions, rng=None, rastreador=None, motor=config.MOTOR_SIMULACAO,
+                   armazenar_amostras=config.ARMAZENAR_AMOSTRAS, horizonte=config.HORIZONTE_SIMULACAO,
+                   aquecimento=config.PERIODO_AQUECIMENTO, meia_largura_alvo=config.MEIA_LARGURA_ALVO,
+                   max_chamadas_automatico=config.MAX_CHAMADAS_AUTOMATICO,
+                   num_operadores=config.NUM_OPERADORES, capacidade_chatbot=config.CAPACIDADE_CHATBOT,
+                   proporcao_tipos=config.PROPORCAO_TIPOS_UNIDADE, preempcao=config.PREEMPCAO_PRIORIDADE_MAXIMA):
     """
     Configura e executa um cenário completo de simulação.
+
+    `triagens` é a sequência de tuplas (prioridade, decisão, grupo), uma por chamada, na ordem
+    de chegada: a lista de `triage_scenarios` ou um `TriagedCalls`, consumido sob
+    demanda pelo gerador de chamadas. `rng` é o
+    numpy.random.Generator usado em todos os sorteios de tempo; passar um gerador
+    com semente fixa torna a execução reprodutível. `rastreador` é um `EventTracer`
+    opcional para registrar ou imprimir os eventos de cada chamada.
+
+    `distributions['chegadas']` pode ser uma tupla (distribuição, parâmetros), para
+    chegadas estacionárias, ou um `ArrivalProfile`, para taxas que variam com a hora e
+    o dia da semana (Poisson não homogêneo).
+
+    `motor` escolhe a implementação: "simpy" (processos SimPy) ou "rapido"
+    (calendário heapq de `fast_engine.py`), que produz o mesmo resultado.
+
+    As séries de tempos são devolvidas como arrays numpy, e `stats_locais['resumo']`
+    traz média, desvio e quantis de cada uma. Com `armazenar_amostras=False`, as
+    séries voltam vazias e só o resumo (calculado em fluxo) é mantido.
+
+    Por padrão a simulação roda até todas as chamadas saírem do sistema. Com
+    `horizonte`, para no tempo simulado informado (sem esvaziar o sistema); as
+    chamadas que chegam antes de `aquecimento` não entram nas estatísticas. Com
+    `meia_largura_alvo` (modo automático, só no motor "simpy"), para assim que o IC95%
+    da espera média por médias em lotes atingir essa meia-largura; use uma sequência
+    de triagens ilimitada (`TriagedCalls` sem `num_chamadas`) para esse modo. Como uma
+    fila instável nunca atinge o alvo, esse modo também para sem convergir quando a
+    utilização das unidades é >= 1, quando as médias dos lotes seguem em alta ou
+    depois de `max_chamadas_automatico` esperas medidas (ver `BatchMeansMonitor`);
+    `stats_locais['resumo']['convergiu']` diz se o alvo foi atingido.
+    `stats_locais['tempo_simulado']` informa onde a execução parou.
+
+    Os quatro últimos parâmetros ligam o modelo de despacho (só no motor "simpy"):
+    `num_operadores` e `capacidade_chatbot` limitam os atendimentos simultâneos,
+    `proporcao_tipos` divide as `num_unidades` em frotas por tipo, escolhidas pelo
+    grupo da triagem, e `preempcao` deixa as chamadas de risco de vida interromperem
+    o serviço das menos urgentes. Nesse modelo, `stats_locais` traz também a série
+    'tempos_espera_atendimento' (espera por operador ou chatbot), a contagem de
+    'preempcoes' e a 'frota' usada (tipo -> unidades).
     """
-    stats_locais = {
-        'total_chamadas': 0, 
-        'chamadas_simples': 0, 
-        'chamadas_complexas': 0,
-        'tempos_espera_bombeiros': [],
-        'tempos_atendimento_total': [],
-        'tempos_servico_bombeiros': []
-    }
+    if rastreador is None:
+        rastreador = EventTracer(NIVEL_DESLIGADO)
+
+    modelo_despacho = bool(num_operadores or capacidade_chatbot or proporcao_tipos or preempcao)
+    if motor == "rapido":
+        if meia_largura_alvo is not None:
+            raise ValueError("O modo automático (meia_largura_alvo) só está disponível no motor 'simpy'.")
+        if modelo_despacho:
+            raise ValueError("O modelo de despacho (operadores, chatbot, tipos de unidade, preempção) "
+                             "só está disponível no motor 'simpy'.")
+        return run_simulation_fast(num_unidades, triagens, distributions, rng, rastreador, armazenar_amostras,
+                                   horizonte, aquecimento)
+    if motor != "simpy":
+        raise ValueError(f"Motor de simulação desconhecido: '{motor}'. Use 'simpy' ou 'rapido'.")
+
+    stats_locais = new_stats(_capacidade_inicial(triagens), armazenar_amostras)
+    if modelo_despacho:
+        stats_locais['tempos_espera_atendimento'] = MetricSeries(_capacidade_inicial(triagens), armazenar_amostras)
+        stats_locais['preempcoes'] = 0
+    monitor = None
+    if meia_largura_alvo is not None:
+        monitor = BatchMeansMonitor(meia_largura_alvo, max_observacoes=max_chamadas_automatico,
+                                    sobrecarga=_utilizacao(distributions, num_unidades) >= 1)
     
+    inicio = time.perf_counter()
     env = simpy.Environment()
-    central = CentralDeEmergencia(env, num_unidades)
-    env.process(gerador_de_chamadas(env, central, agente_ia, cenarios, distributions, stats_locais))
-    env.run()
+    central = CentralDeEmergencia(env, num_unidades, num_operadores, capacidade_chatbot, proporcao_tipos, preempcao)
+    streams = build_streams(distributions, rng)
+    env.process(gerador_de_chamadas(env, central, triagens, streams, stats_locais, rastreador,
+                                    aquecimento, discard_stats(), monitor))
+
+    limite = horizonte if horizonte is not None else float('inf')
+    eventos = _processar_eventos(env, limite, monitor)
+    if horizonte is not None and env.now < horizonte and (monitor is None or not monitor.concluido):
+        # Não há mais eventos até o horizonte: só avança o relógio até ele.
+        env.run(until=horizonte)
     
+    instrumentation.count('simpy_eventos', eventos)
+    instrumentation.count('simpy_segundos', time.perf_counter() - inicio)
+    if modelo_despacho:
+        instrumentation.count('despacho_preempcoes', stats_locais['preempcoes'])
+
+    stats_locais = finalize_stats(stats_locais)
+    stats_locais['tempo_simulado'] = env.now
+    if central.frotas is not None:
+        stats_locais['frota'] = {tipo: frota.capacidade for tipo, frota in central.frotas.items()}
+    if monitor is not None:
+        stats_locais['medias_em_lotes'] = monitor.summary()
+        stats_locais['resumo']['convergiu'] = monitor.convergiu
     return stats_locais
\ No newline at end of file
@@ -0,0 +1,311 @@
+# src/simulation/fast_engine.py
+import heapq
+import itertools
+
+import numpy as np
+
+import config
+from .metrics import SERIES_TEMPOS, finalize_stats
+from .random_streams import build_streams
+from .tracing import (
+    EVENTO_CHEGADA, EVENTO_INICIO_CHATBOT, EVENTO_INICIO_HUMANO,
+    EVENTO_ENTRADA_FILA, EVENTO_INICIO_SERVICO, EVENTO_FIM
+)
+
+
+def simular_fila_prioridade(entradas, prioridades, servicos, num_unidades):
+    """
+    Fila com prioridade e `num_unidades` servidores idênticos, sem preempção, com a
+    mesma disciplina do `simpy.PriorityResource`: menor prioridade primeiro e, entre
+    iguais, quem entrou antes na fila.
+
+    Recebe, por chamada, o instante de entrada na fila, a prioridade e o tempo de
+    serviço; retorna o array com o instante de início do serviço de cada chamada.
+    """
+    n = len(entradas)
+    ordem = np.argsort(entradas, kind='stable').tolist()
+    entradas_l = entradas.tolist()
+    prioridades_l = prioridades.tolist()
+    servicos_l = servicos.tolist()
+    inicios = [0.0] * n
+
+    livres = num_unidades
+    conclusoes = []  # Heap com os instantes em que cada unidade ocupada fica livre
+    fila = []        # Heap (prioridade, entrada, ordem de chegada à fila, chamada)
+    proxima = 0
+    infinito = float('inf')
+
+    while proxima < n or fila:
+        t_entrada = entradas_l[ordem[proxima]] if proxima < n else infinito
+        if conclusoes and conclusoes[0] <= t_entrada:
+            agora = heapq.heappop(conclusoes)
+            if fila:
+                i = heapq.heappop(fila)[3]
+                inicios[i] = agora
+                heapq.heappush(conclusoes, agora + servicos_l[i])
+            else:
+                livres += 1
+        else:
+            i = ordem[proxima]
+            if livres:
+                livres -= 1
+                inicios[i] = t_entrada
+                heapq.heappush(conclusoes, t_entrada + servicos_l[i])
+            else:
+                heapq.heappush(fila, (prioridades_l[i], t_entrada, proxima, i))
+            proxima += 1
+
+    return np.array(inicios)
+
+
+class IncrementalPriorityQueue:
+    """
+    Versão incremental de `simular_fila_prioridade`, com a mesma disciplina de fila.
+
+    As chamadas podem ser entregues em partes (`add`) e a simulação avança até um
+    instante (`advance`), mantendo o estado entre as partes: é o que permite
+    reproduzir históricos longos em blocos. Cada chamada recebe um ID sequencial na
+    ordem em que foi adicionada. Quando todas as chamadas cabem na memória,
+    `simular_fila_prioridade` é mais rápida (não carrega o estado entre partes).
+    """
+
+    def __init__(self, num_unidades):
+        self.livres = num_unidades
+        self.conclusoes = []  # Heap com os instantes em que cada unidade ocupada fica livre
+        self.fila = []        # Heap (prioridade, entrada, ordem de chegada à fila, chamada, serviço, marca)
+        self.proximo_id = 0
+        self._contador_fila = 0
+        self._pendentes = tuple(np.empty(0, dtype=t) for t in (np.int64, float, np.int64, float, float))
+
+    def add(self, entradas, prioridades, servicos, marcas=None):
+        """
+        Adiciona chamadas (instante de entrada na fila, prioridade, tempo de serviço).
+        `marcas` é um valor opcional por chamada (por exemplo, o instante de chegada),
+        devolvido por `advance` quando o serviço da chamada começa.
+        """
+        ids = np.arange(self.proximo_id, self.proximo_id + len(entradas), dtype=np.int64)
+        self.proximo_id += len(entradas)
+        if marcas is None:
+            marcas = np.zeros(len(entradas))
+        novos = (ids, entradas, prioridades, servicos, marcas)
+        self._pendentes = tuple(
+            np.concatenate([pendente, np.asarray(novo, dtype=pendente.dtype)])
+            for pendente, novo in zip(self._pendentes, novos)
+        )
+        return ids
+
+    def advance(self, ate=np.inf):
+        """
+        Processa as entradas na fila e as liberações de unidades até o instante `ate`.
+        Chamadas que entram depois de `ate` ficam pendentes para a próxima parte.
+
+        Retorna os arrays (ids, inícios, entradas, serviços, marcas) das chamadas que
+        começaram a ser atendidas neste avanço, em ordem de início do serviço.
+        """
+        entradas_p = self._pendentes[1]
+        ordem = np.argsort(entradas_p, kind='stable')
+        k = int(np.searchsorted(entradas_p[ordem], ate, side='right'))
+        agora_ordem, resto = ordem[:k], ordem[k:]
+        ids_l, entradas_l, prioridades_l, servicos_l, marcas_l = (
+            pendente[agora_ordem].tolist() for pendente in self._pendentes
+        )
+        self._pendentes = tuple(pendente[resto] for pendente in self._pendentes)
+        iniciadas = []
+
+        livres = self.livres
+        conclusoes = self.conclusoes
+        fila = self.fila
+        contador = self._contador_fila
+        proxima = 0
+        infinito = float('inf')
+
+        while True:
+            t_entrada = entradas_l[proxima] if proxima < k else infinito
+            if conclusoes and conclusoes[0] <= t_entrada and conclusoes[0] <= ate:
+                agora = heapq.heappop(conclusoes)
+                if fila:
+                    _, t_fila, _, i, servico, marca = heapq.heappop(fila)
+                    iniciadas.append((i, agora, t_fila, servico, marca))
+                    heapq.heappush(conclusoes, agora + servico)
+                else:
+                    livres += 1
+            elif proxima < k:
+                servico = servicos_l[proxima]
+                if livres:
+                    livres -= 1
+                    iniciadas.append((ids_l[proxima], t_entrada, t_entrada, servico, marcas_l[proxima]))
+                    heapq.heappush(conclusoes, t_entrada + servico)
+                else:
+                    heapq.heappush(fila, (prioridades_l[proxima], t_entrada, contador, ids_l[proxima],
+                                          servico, marcas_l[proxima]))
+                    contador += 1
+                proxima += 1
+            else:
+                break
+
+        self.livres = livres
+        self._contador_fila = contador
+        if not iniciadas:
+            return (np.empty(0, dtype=np.int64),) + tuple(np.empty(0) for _ in range(4))
+        ids, inicios, entradas, servicos, marcas = zip(*iniciadas)
+        return (np.array(ids, dtype=np.int64), np.array(inicios), np.array(entradas),
+                np.array(servicos), np.array(marcas))
+
+
+def _chegadas_ate_horizonte(fluxo_chegadas, horizonte, tamanho_bloco):
+    """
+    Sorteia intervalos entre chegadas em blocos até passar do horizonte e retorna os
+    instantes de chegada. A soma acumulada é feita de uma vez só no fim, na mesma
+    ordem das somas do motor SimPy, para que os instantes coincidam exatamente.
+    """
+    blocos = []
+    total = 0.0
+    while total <= horizonte:
+        bloco = fluxo_chegadas.take(tamanho_bloco)
+        blocos.append(bloco)
+        total += bloco.sum()
+    chegadas = np.cumsum(np.concatenate(blocos))
+    return chegadas[:np.searchsorted(chegadas, horizonte, side='right')]
+
+
+def run_simulation_fast(num_unidades, triagens, distributions, rng=None, rastreador=None, armazenar_amostras=True,
+                        horizonte=None, aquecimento=0.0):
+    """
+    Mesmo modelo de `environment.run_simulation`, sem processos SimPy.
+
+    Os tempos são sorteados em bloco, nos mesmos fluxos e na mesma ordem que o motor
+    SimPy consome (n-ésima chamada recebe o n-ésimo valor de cada fluxo), e a fila das
+    unidades é resolvida por `simular_fila_prioridade`. Com o mesmo `rng`, os resultados
+    coincidem com os do motor SimPy. Retorna o mesmo dicionário `stats_locais`; aqui os
+    arrays são calculados de qualquer forma, e `armazenar_amostras=False` apenas os descarta.
+
+    `horizonte` e `aquecimento` têm o mesmo significado de `run_simulation`: só as
+    chamadas que chegam até o horizonte são simuladas, só os eventos até o horizonte
+    são medidos e as chegadas anteriores ao aquecimento ficam fora das estatísticas.
+    """
+    streams = build_streams(distributions, rng)
+
+    # O motor vetorizado precisa de todas as chamadas de uma vez.
+    if horizonte is None:
+        triagens = list(triagens)
+        chegadas = np.cumsum(streams['chegadas'].take(len(triagens)))
+    else:
+        chegadas = _chegadas_ate_horizonte(streams['chegadas'], horizonte, config.TAMANHO_BLOCO_VARIAVEIS)
+        triagens = list(itertools.islice(triagens, len(chegadas)))
+        chegadas = chegadas[:len(triagens)]
+    n = len(triagens)
+
+    prioridades = np.fromiter((triagem[0] for triagem in triagens), dtype=np.int64, count=n)
+    simples = np.fromiter((triagem[1] == 'Simples' for triagem in triagens), dtype=bool, count=n)
+
+    servicos = streams['servico_bombeiros'].take(n)
+    atendimento = np.empty(n)
+    atendimento[simples] = streams['atendimento_simples'].take(int(simples.sum()))
+    atendimento[~simples] = streams['atendimento_humano'].take(int((~simples).sum()))
+
+    entradas_fila = chegadas + atendimento
+    inicios = simular_fila_prioridade(entradas_fila, prioridades, servicos, num_unidades)
+    fins = inicios + servicos
+
+    limite = horizonte if horizonte is not None else np.inf
+    medidas = chegadas >= aquecimento
+    iniciadas = medidas & (inicios <= limite)
+    finalizadas = medidas & (fins <= limite)
+
+    # Mesma ordem de registro do motor SimPy: espera e serviço no início do atendimento,
+    # tempo total na finalização.
+    por_inicio = np.flatnonzero(iniciadas)[np.argsort(inicios[iniciadas], kind='stable')]
+    por_fim = np.flatnonzero(finalizadas)[np.argsort(fins[finalizadas], kind='stable')]
+
+    if rastreador is not None and rastreador.ativo:
+        ids = np.arange(1, n + 1)
+        for evento, mascara, tempos in (
+            (EVENTO_CHEGADA, None, chegadas),
+            (EVENTO_INICIO_CHATBOT, simples, chegadas),
+            (EVENTO_INICIO_HUMANO, ~simples, chegadas),
+            (EVENTO_ENTRADA_FILA, None, entradas_fila),
+            (EVENTO_INICIO_SERVICO, None, inicios),
+            (EVENTO_FIM, None, fins),
+        ):
+            mascara = tempos <= limite if mascara is None else mascara & (tempos <= limite)
+            rastreador.registrar_lote(ids[mascara].tolist(), evento, tempos[mascara].tolist())
+
+    num_simples = int((simples & medidas).sum())
+    stats_locais = finalize_stats({
+        'total_chamadas': int(medidas.sum()),
+        'chamadas_simples': num_simples,
+        'chamadas_complexas': int(medidas.sum()) - num_simples,
+        'tempos_espera_bombeiros': (inicios - entradas_fila)[por_inicio],
+        'tempos_atendimento_total': (fins - chegadas)[por_fim],
+        'tempos_servico_bombeiros': servicos[por_inicio],
+    })
+    if horizonte is not None:
+        stats_locais['tempo_simulado'] = float(horizonte)
+    else:
+        stats_locais['tempo_simulado'] = float(fins.max()) if n else 0.0
+    if not armazenar_amostras:
+        for chave in SERIES_TEMPOS:
+            stats_locais[chave] = np.empty(0)
+    return stats_locais
+
+
+def _tempos_por_chamada(rastreador):
+    """
+    Tempos de espera, de serviço e no sistema de cada chamada do log de eventos,
+    indexados pelo id da chamada (NaN quando o evento não ocorreu até o horizonte).
+    """
+    log = rastreador.to_arrays()
+    n = int(log['id_chamada'].max()) if len(log['id_chamada']) else 0
+    tempos = {}
+    for evento in (EVENTO_CHEGADA, EVENTO_ENTRADA_FILA, EVENTO_INICIO_SERVICO, EVENTO_FIM):
+        coluna = np.full(n, np.nan)
+        mascara = log['evento'] == evento
+        coluna[log['id_chamada'][mascara] - 1] = log['tempo'][mascara]
+        tempos[evento] = coluna
+    return {
+        'tempos_espera_bombeiros': tempos[EVENTO_INICIO_SERVICO] - tempos[EVENTO_ENTRADA_FILA],
+        'tempos_servico_bombeiros': tempos[EVENTO_FIM] - tempos[EVENTO_INICIO_SERVICO],
+        'tempos_atendimento_total': tempos[EVENTO_FIM] - tempos[EVENTO_CHEGADA],
+    }
+
+
+def _maior_diferenca(a, b):
+    """Maior diferença absoluta entre dois arrays alinhados (inf se tamanhos ou NaNs não coincidem)."""
+    if a.shape != b.shape or not np.array_equal(np.isnan(a), np.isnan(b)):
+        return np.inf
+    validos = ~np.isnan(a)
+    return float(np.max(np.abs(a[validos] - b[validos]))) if validos.any() else 0.0
+
+
+def check_parity(num_unidades, triagens, distributions, seed, tolerancia=1e-9, **opcoes):
+    """
+    Roda os dois motores com a mesma semente e compara as métricas de `stats_locais`.
+    `opcoes` (por exemplo `horizonte` e `aquecimento`) são repassadas aos dois motores.
+
+    As séries de tempos são comparadas ordenadas e, pelo log de eventos de cada motor,
+    chamada a chamada (mesmo id): duas chamadas com as esperas trocadas passam na
+    primeira comparação, mas não na segunda. Retorna um dicionário com a maior
+    diferença absoluta de cada série, a de cada tempo por chamada em 'por_chamada' e
+    a chave 'paridade' indicando se todas ficaram dentro da tolerância.
+    """
+    from .environment import run_simulation
+    from .tracing import EventTracer, NIVEL_EVENTOS
+
+    stats, por_chamada = {}, {}
+    for motor in ("simpy", "rapido"):
+        rastreador = EventTracer(NIVEL_EVENTOS)
+        stats[motor] = run_simulation(num_unidades, triagens, distributions, rng=np.random.default_rng(seed),
+                                      rastreador=rastreador, motor=motor, **opcoes)
+        por_chamada[motor] = _tempos_por_chamada(rastreador)
+    simpy_stats, rapido_stats = stats["simpy"], stats["rapido"]
+
+    resultado = {'paridade': True, 'por_chamada': {}}
+    for chave in ('total_chamadas', 'chamadas_simples', 'chamadas_complexas', 'tempo_simulado'):
+        if simpy_stats[chave] != rapido_stats[chave]:
+            resultado['paridade'] = False
+    for chave in ('tempos_espera_bombeiros', 'tempos_atendimento_total', 'tempos_servico_bombeiros'):
+        resultado[chave] = _maior_diferenca(np.sort(simpy_stats[chave]), np.sort(rapido_stats[chave]))
+        resultado['por_chamada'][chave] = _maior_diferenca(por_chamada["simpy"][chave], por_chamada["rapido"][chave])
+        if max(resultado[chave], resultado['por_chamada'][chave]) > tolerancia:
+            resultado['paridade'] = False
+    return resultado
@@ -0,0 +1,333 @@
+# src/simulation/metrics.py
+import math
+
+import numpy as np
+
+import config
+
+# Séries de tempos registradas em `stats_locais` por chamada atendida.
+SERIES_TEMPOS = ('tempos_espera_bombeiros', 'tempos_atendimento_total', 'tempos_servico_bombeiros')
+# Séries presentes só em alguns modelos (espera por operador ou chatbot no modelo de despacho).
+SERIES_OPCIONAIS = ('tempos_espera_atendimento',)
+
+
+class P2Quantile:
+    """
+    Estimador P² (Jain & Chlamtac, 1985) de um quantil em fluxo: mantém apenas cinco
+    marcadores, qualquer que seja o número de observações.
+    """
+
+    def __init__(self, p):
+        self.p = p
+        self._q = []
+        self._n = [0, 1, 2, 3, 4]
+        self._np = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+        self._dn = [0.0, p / 2, p, (1 + p) / 2, 1.0]
+
+    def add(self, x):
+        q = self._q
+        if len(q) < 5:
+            q.append(x)
+            q.sort()
+            return
+
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+
+        n = self._n
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._np[i] += self._dn[i]
+
+        for i in (1, 2, 3):
+            d = self._np[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                parabolico = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if q[i - 1] < parabolico < q[i + 1]:
+                    q[i] = parabolico
+                else:
+                    q[i] = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                n[i] += d
+
+    def value(self):
+        if not self._q:
+            return math.nan
+        if len(self._q) < 5:
+            return float(np.quantile(self._q, self.p))
+        return self._q[2]
+
+
+class MetricSeries:
+    """
+    Série de tempos de uma métrica da simulação, com a mesma interface `append` de uma lista.
+
+    Com `armazenar=True`, os valores ficam em um buffer numpy pré-alocado (dobrado
+    quando enche). Com `armazenar=False`, nada é guardado por amostra: apenas média e
+    variância (Welford) e os quantis de `quantis` (P²), em memória constante, para
+    execuções longas.
+    """
+
+    def __init__(self, capacidade=1024, armazenar=True, quantis=config.QUANTIS_METRICAS):
+        self.armazenar = armazenar
+        self.quantis = tuple(quantis)
+        self._n = 0
+        if armazenar:
+            self._buffer = np.empty(max(capacidade, 1))
+        else:
+            self._media = 0.0
+            self._m2 = 0.0
+            self._estimadores = [P2Quantile(q) for q in self.quantis]
+
+    def append(self, valor):
+        if self.armazenar:
+            if self._n == len(self._buffer):
+                self._buffer = np.resize(self._buffer, 2 * len(self._buffer))
+            self._buffer[self._n] = valor
+        else:
+            valor = float(valor)
+            delta = valor - self._media
+            self._media += delta / (self._n + 1)
+            self._m2 += delta * (valor - self._media)
+            for estimador in self._estimadores:
+                estimador.add(valor)
+        self._n += 1
+
+    def extend(self, valores):
+        """Registra vários valores de uma vez (vetorizado quando a série armazena amostras)."""
+        valores = np.asarray(valores, dtype=float)
+        if not self.armazenar:
+            for valor in valores.tolist():
+                self.append(valor)
+            return
+        necessario = self._n + len(valores)
+        if necessario > len(self._buffer):
+            self._buffer = np.resize(self._buffer, max(necessario, 2 * len(self._buffer)))
+        self._buffer[self._n:necessario] = valores
+        self._n = necessario
+
+    def __len__(self):
+        return self._n
+
+    def values(self):
+        """Valores registrados como array numpy (vazio se a série não armazena amostras)."""
+        if not self.armazenar:
+            return np.empty(0)
+        return self._buffer[:self._n]
+
+    def summary(self):
+        """Resumo da série: contagem, média, desvio padrão e quantis."""
+        if self.armazenar:
+            return summarize_values(self.values(), self.quantis)
+        resumo = {
+            'n': self._n,
+            'media': self._media if self._n else math.nan,
+            'desvio': math.sqrt(self._m2 / (self._n - 1)) if self._n > 1 else math.nan,
+        }
+        for q, estimador in zip(self.quantis, self._estimadores):
+            resumo[f'p{int(q * 100)}'] = estimador.value()
+        return resumo
+
+
+class _SerieDescartada:
+    """Série que ignora os valores: usada para as chamadas do período de aquecimento."""
+
+    def append(self, valor):
+        pass
+
+
+def discard_stats():
+    """`stats_locais` cujos registros são descartados (período de aquecimento)."""
+    stats_descartadas = {'total_chamadas': 0, 'chamadas_simples': 0, 'chamadas_complexas': 0, 'preempcoes': 0}
+    for chave in SERIES_TEMPOS + SERIES_OPCIONAIS:
+        stats_descartadas[chave] = _SerieDescartada()
+    return stats_descartadas
+
+
+def t_quantile(confianca, graus_liberdade):
+    """
+    Valor crítico bilateral da t de Student para o nível `confianca`. O scipy.stats só
+    é importado na primeira chamada, e não junto com os motores de simulação.
+    """
+    import scipy.stats as st
+    return float(st.t.ppf((1 + confianca) / 2, graus_liberdade))
+
+
+class BatchMeansMonitor:
+    """
+    Intervalo de confiança da média por médias em lotes (batch means).
+
+    As observações são agrupadas em lotes consecutivos de `tamanho_lote`; as médias dos
+    lotes são tratadas como aproximadamente independentes. A partir de `min_lotes`
+    lotes, a cada lote fechado calcula a meia-largura do IC (t de Student) e marca
+    `concluido` e `convergiu` quando ela fica abaixo de `meia_largura_alvo`.
+
+    Uma fila instável nunca chega lá: a espera cresce sem limite e a meia-largura
+    cresce junto. Por isso a execução também é encerrada, com `convergiu=False`, em três
+    casos, registrados em `motivo`:
+    - 'sobrecarga': `sobrecarga` (utilização >= 1, conhecida de antemão) e já há
+      `min_lotes` lotes para o relatório;
+    - 'tendencia': em duas vezes seguidas em que o número de lotes dobrou, a
+      meia-largura cresceu em vez de cair (~1/√2) e a média da metade recente dos
+      lotes superou a da metade antiga em mais de duas meias-larguras;
+    - 'orcamento': `max_observacoes` observações sem atingir o alvo.
+    """
+
+    def __init__(self, meia_largura_alvo, tamanho_lote=config.TAMANHO_LOTE_MEDIAS,
+                 min_lotes=config.MIN_LOTES_MEDIAS, confianca=0.95,
+                 max_observacoes=config.MAX_CHAMADAS_AUTOMATICO, sobrecarga=False):
+        self.meia_largura_alvo = meia_largura_alvo
+        self.tamanho_lote = tamanho_lote
+        self.min_lotes = min_lotes
+        self.confianca = confianca
+        self.max_observacoes = max_observacoes
+        self.sobrecarga = sobrecarga
+        self.medias_lotes = []
+        self.meia_largura = math.inf
+        self.concluido = False
+        self.convergiu = False
+        self.motivo = None
+        self.observacoes = 0
+        self._soma = 0.0
+        self._n = 0
+        self._proxima_verificacao = min_lotes
+        self._meia_largura_verificada = math.inf
+        self._altas_seguidas = 0
+
+    def add(self, valor):
+        self._soma += valor
+        self._n += 1
+        self.observacoes += 1
+        if self._n == self.tamanho_lote:
+            self.medias_lotes.append(self._soma / self._n)
+            self._soma = 0.0
+            self._n = 0
+            if len(self.medias_lotes) >= self.min_lotes:
+                self._atualizar_intervalo()
+        if not self.concluido and self.max_observacoes is not None and self.observacoes >= self.max_observacoes:
+            self._encerrar('orcamento')
+
+    def _encerrar(self, motivo, convergiu=False):
+        self.concluido = True
+        self.convergiu = convergiu
+        self.motivo = motivo
+
+    def _atualizar_intervalo(self):
+        k = len(self.medias_lotes)
+        t = t_quantile(self.confianca, k - 1)
+        self.meia_largura = float(t * np.std(self.medias_lotes, ddof=1) / math.sqrt(k))
+        if self.meia_largura <= self.meia_largura_alvo:
+            self._encerrar('meia_largura', convergiu=True)
+        elif self.sobrecarga:
+            self._encerrar('sobrecarga')
+        elif k == self._proxima_verificacao:
+            self._verificar_tendencia()
+
+    def _verificar_tendencia(self):
+        k = len(self.medias_lotes)
+        alta = np.mean(self.medias_lotes[k // 2:]) - np.mean(self.medias_lotes[:k // 2])
+        em_alta = self.meia_largura > self._meia_largura_verificada and alta > 2 * self.meia_largura
+        self._altas_seguidas = self._altas_seguidas + 1 if em_alta else 0
+        self._meia_largura_verificada = self.meia_largura
+        self._proxima_verificacao = 2 * k
+        if self._altas_seguidas >= 2:
+            self._encerrar('tendencia')
+
+    def summary(self):
+        return {
+            'lotes': len(self.medias_lotes),
+            'tamanho_lote': self.tamanho_lote,
+            'media': float(np.mean(self.medias_lotes)) if self.medias_lotes else math.nan,
+            'meia_largura': self.meia_largura,
+            'concluido': self.concluido,
+            'convergiu': self.convergiu,
+            'motivo': self.motivo,
+            'observacoes': self.observacoes,
+        }
+
+
+def summarize_values(valores, quantis=config.QUANTIS_METRICAS):
+    """Mesmo resumo de `MetricSeries.summary`, calculado de forma exata sobre um array."""
+    valores = np.asarray(valores, dtype=float)
+    n = len(valores)
+    resumo = {
+        'n': n,
+        'media': float(valores.mean()) if n else math.nan,
+        'desvio': float(valores.std(ddof=1)) if n > 1 else math.nan,
+    }
+    quantis_calculados = np.quantile(valores, quantis) if n else [math.nan] * len(quantis)
+    for q, valor in zip(quantis, quantis_calculados):
+        resumo[f'p{int(q * 100)}'] = float(valor)
+    return resumo
+
+
+def quantile_columns(resumo, rotulo, quantis=None):
+    """
+    Colunas de tabela com os quantis de um resumo de `summarize_values`/`MetricSeries`:
+    {'P90 <rotulo>': resumo['p90'], ...}, na ordem de `quantis` (por padrão,
+    config.QUANTIS_METRICAS). Quantis que o resumo não tem são omitidos.
+    """
+    quantis = config.QUANTIS_METRICAS if quantis is None else quantis
+    return {
+        f'P{int(q * 100)} {rotulo}': resumo[f'p{int(q * 100)}']
+        for q in quantis if f'p{int(q * 100)}' in resumo
+    }
+
+
+def new_stats(capacidade, armazenar=True):
+    """Dicionário `stats_locais` vazio, com as séries de tempos pré-alocadas para `capacidade` chamadas."""
+    stats_locais = {
+        'total_chamadas': 0,
+        'chamadas_simples': 0,
+        'chamadas_complexas': 0,
+    }
+    for chave in SERIES_TEMPOS:
+        stats_locais[chave] = MetricSeries(capacidade, armazenar)
+    return stats_locais
+
+
+def finalize_stats(stats_locais):
+    """
+    Converte as séries de `stats_locais` em arrays numpy e acrescenta a chave 'resumo'
+    com o resumo de cada uma. Aceita séries `MetricSeries` ou arrays já prontos.
+    """
+    resumo = {}
+    for chave in SERIES_TEMPOS + SERIES_OPCIONAIS:
+        if chave not in stats_locais:
+            continue
+        serie = stats_locais[chave]
+        if isinstance(serie, MetricSeries):
+            resumo[chave] = serie.summary()
+            stats_locais[chave] = serie.values()
+        else:
+            stats_locais[chave] = np.asarray(serie, dtype=float)
+            resumo[chave] = summarize_values(stats_locais[chave])
+    stats_locais['resumo'] = resumo
+    return stats_locais
+
+
+def build_results_table(all_results, chave='tempos_espera_bombeiros', coluna='Tempo de Espera'):
+    """
+    Tabela colunar única com as amostras de todos os cenários: uma concatenação só,
+    em vez de um `pd.concat` por cenário. A coluna 'Unidades' é categórica.
+    """
+    import pandas as pd
+    rotulos = [str(n_unidades) for n_unidades in all_results]
+    series = [np.asarray(data.get(chave, []), dtype=float) for data in all_results.values()]
+    tamanhos = [len(serie) for serie in series]
+    return pd.DataFrame({
+        coluna: np.concatenate(series) if series else np.empty(0),
+        'Unidades': pd.Categorical(np.repeat(rotulos, tamanhos), categories=rotulos),
+    })
@@ -0,0 +1,145 @@
+# src/simulation/random_streams.py
+import numpy as np
+
+import config
+from .arrivals import ArrivalProfile, NonHomogeneousArrivalStream
+
+
+def _expon(rng, n, loc=0.0, scale=1.0):
+    return rng.standard_exponential(n) * scale + loc
+
+
+def _lognorm(rng, n, s, loc=0.0, scale=1.0):
+    return np.exp(s * rng.standard_normal(n)) * scale + loc
+
+
+def _gamma(rng, n, a, loc=0.0, scale=1.0):
+    return rng.standard_gamma(a, n) * scale + loc
+
+
+def _weibull_min(rng, n, c, loc=0.0, scale=1.0):
+    return np.power(-np.log1p(-rng.uniform(size=n)), 1.0 / c) * scale + loc
+
+
+# Sorteio direto com o numpy para as candidatas de `distribution_fitter`, com o mesmo
+# algoritmo do `rvs` do scipy (os valores coincidem; na Weibull, a menos do último bit
+# em parte dos sorteios, pois o `log1p` do scipy.special difere do numpy). Assim a
+# simulação não precisa importar o scipy.stats.
+AMOSTRADORES_NUMPY = {
+    'expon': _expon,
+    'lognorm': _lognorm,
+    'gamma': _gamma,
+    'weibull_min': _weibull_min,
+}
+
+
+def distribution_name(dist):
+    """Nome da distribuição, seja ela um objeto do scipy.stats ou já o nome."""
+    return dist if isinstance(dist, str) else dist.name
+
+
+def scipy_distribution(dist):
+    """Objeto do scipy.stats da distribuição (importado só quando necessário)."""
+    if not isinstance(dist, str):
+        return dist
+    import scipy.stats as st
+    return getattr(st, dist)
+
+
+def distribution_moments(distribution_tuple):
+    """Média e coeficiente de variação ao quadrado (cv²) de uma tupla (distribuição, parâmetros)."""
+    dist, params = distribution_tuple
+    dist = scipy_distribution(dist)
+    media = float(dist.mean(*params))
+    return media, float(dist.var(*params)) / media ** 2
+
+
+def portable_distributions(distributions):
+    """
+    Troca cada (distribuição do scipy, parâmetros) por (nome, parâmetros), que os
+    fluxos aceitam igualmente. Enviado a processos trabalhadores, o dicionário não
+    obriga cada um a importar o scipy.stats só para desserializar as distribuições.
+    """
+    return {
+        chave: valor if isinstance(valor, ArrivalProfile) else (distribution_name(valor[0]), tuple(valor[1]))
+        for chave, valor in distributions.items()
+    }
+
+
+class VariateStream:
+    """
+    Fluxo de tempos aleatórios de uma distribuição, sorteados em blocos.
+
+    Em vez de uma chamada escalar a `dist.rvs` por evento (com toda a validação de
+    argumentos do scipy a cada sorteio), sorteia `tamanho_bloco` valores de uma vez,
+    aplica o corte em zero e o fator de escala de forma vetorizada e os entrega um a
+    um a partir do buffer, que é reabastecido quando se esgota.
+
+    A distribuição pode ser um objeto do scipy.stats ou o seu nome; as de
+    `AMOSTRADORES_NUMPY` são sorteadas direto com o numpy.
+    """
+
+    def __init__(self, distribution_tuple, rng=None, escala=1.0, tamanho_bloco=config.TAMANHO_BLOCO_VARIAVEIS):
+        self.dist, self.params = distribution_tuple
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.escala = escala
+        self.tamanho_bloco = tamanho_bloco
+        self._amostrador = AMOSTRADORES_NUMPY.get(distribution_name(self.dist))
+        self._buffer = []
+        self._pos = 0
+
+    def _sortear_bloco(self, n):
+        if self._amostrador is not None:
+            bloco = self._amostrador(self.rng, n, *self.params)
+        else:
+            bloco = scipy_distribution(self.dist).rvs(*self.params, size=n, random_state=self.rng)
+        np.maximum(bloco, 0, out=bloco)
+        if self.escala != 1.0:
+            bloco *= self.escala
+        return bloco
+
+    def next(self):
+        """Retorna o próximo tempo do fluxo."""
+        if self._pos == len(self._buffer):
+            # Lista de floats do Python: indexar é bem mais barato que extrair escalares numpy.
+            self._buffer = self._sortear_bloco(self.tamanho_bloco).tolist()
+            self._pos = 0
+        valor = self._buffer[self._pos]
+        self._pos += 1
+        return valor
+
+    __next__ = next
+
+    def __iter__(self):
+        return self
+
+    def take(self, n):
+        """Retorna os próximos `n` tempos do fluxo como um array numpy."""
+        restantes = self._buffer[self._pos:]
+        if len(restantes) >= n:
+            self._pos += n
+            return np.array(restantes[:n])
+        self._buffer, self._pos = [], 0
+        return np.concatenate([np.array(restantes), self._sortear_bloco(n - len(restantes))])
+
+
+def build_streams(distributions, rng=None):
+    """
+    Cria um fluxo por distribuição usada na simulação. O tempo do chatbot é o tempo
+    de atendimento simples multiplicado por `config.FATOR_TEMPO_CHATBOT`.
+
+    Cada fluxo recebe um gerador filho de `rng`, de modo que o consumo de um fluxo não
+    desloca os valores dos outros. Se `distributions['chegadas']` for um
+    `ArrivalProfile`, as chegadas seguem o perfil horário (Poisson não homogêneo).
+    """
+    rng_chegadas, rng_simples, rng_humano, rng_servico = rng.spawn(4) if rng is not None else [None] * 4
+    if isinstance(distributions['chegadas'], ArrivalProfile):
+        chegadas = NonHomogeneousArrivalStream(distributions['chegadas'], rng_chegadas)
+    else:
+        chegadas = VariateStream(distributions['chegadas'], rng_chegadas)
+    return {
+        'chegadas': chegadas,
+        'atendimento_simples': VariateStream(distributions['atendimento_simples'], rng_simples, escala=config.FATOR_TEMPO_CHATBOT),
+        'atendimento_humano': VariateStream(distributions['atendimento_humano'], rng_humano),
+        'servico_bombeiros': VariateStream(distributions['servico_bombeiros'], rng_servico),
+    }
@@ -0,0 +1,179 @@
+# src/simulation/replay.py
+import numpy as np
+import pandas as pd
+
+import config
+from .fast_engine import IncrementalPriorityQueue
+from .metrics import new_stats, finalize_stats, quantile_columns
+from src.utils.data_loader import ensure_snapshot, outlier_limit, simple_call_mask
+
+COLUNAS_REPLAY = ['Received DtTm', 'Entry DtTm', 'On Scene DtTm', 'Available DtTm', 'Final Priority', 'Call Type Group']
+
+CONFIGURACOES = ("baseline", "chatbot")
+
+
+def _minutos(delta):
+    return delta.dt.total_seconds().to_numpy() / 60.0
+
+
+class TraceReplay:
+    """
+    Chamadas históricas prontas para a simulação, como arrays numpy alinhados:
+    instante de chegada (min desde `origem`), prioridade da fila (0 = mais urgente),
+    tempo de atendimento pelo operador humano, tempo de serviço no local e se a
+    chamada é simples pela regra do KDD (atendível pelo chatbot).
+    """
+
+    def __init__(self, chegadas, prioridades, atendimento, servicos, simples):
+        self.chegadas = np.asarray(chegadas, dtype=float)
+        self.prioridades = np.asarray(prioridades, dtype=np.int64)
+        self.atendimento = np.asarray(atendimento, dtype=float)
+        self.servicos = np.asarray(servicos, dtype=float)
+        self.simples = np.asarray(simples, dtype=bool)
+
+    @classmethod
+    def from_dataframe(cls, df, origem=None, limite_outlier=None):
+        """
+        Monta o trace a partir do dataset: chegada = Received, atendimento = Entry -
+        Received, serviço = Available - On Scene (os mesmos tempos usados nos ajustes),
+        prioridade = 3 - Final Priority. Linhas incompletas são descartadas.
+        """
+        dados = df.dropna(subset=COLUNAS_REPLAY)
+        if not dados['Received DtTm'].is_monotonic_increasing:
+            dados = dados.sort_values('Received DtTm', kind='stable')
+        if origem is None:
+            origem = dados['Received DtTm'].iloc[0] if len(dados) else pd.Timestamp(0)
+        return cls(
+            chegadas=_minutos(dados['Received DtTm'] - origem),
+            prioridades=np.clip(3 - dados['Final Priority'].to_numpy(dtype=np.int64), 0, None),
+            atendimento=np.clip(_minutos(dados['Entry DtTm'] - dados['Received DtTm']), 0, None),
+            servicos=np.clip(_minutos(dados['Available DtTm'] - dados['On Scene DtTm']), 0, None),
+            simples=simple_call_mask(dados, limite_outlier),
+        )
+
+    def __len__(self):
+        return len(self.chegadas)
+
+    def chunks(self, tamanho_bloco=config.TAMANHO_BLOCO_REPLAY):
+        """Divide o trace em blocos consecutivos de até `tamanho_bloco` chamadas."""
+        for inicio in range(0, len(self), tamanho_bloco):
+            fatia = slice(inicio, inicio + tamanho_bloco)
+            yield TraceReplay(self.chegadas[fatia], self.prioridades[fatia], self.atendimento[fatia],
+                              self.servicos[fatia], self.simples[fatia])
+
+    def __iter__(self):
+        return self.chunks()
+
+
+class ParquetTraceChunks:
+    """
+    Fonte reiterável de `TraceReplay` lida em blocos do snapshot Parquet do dataset
+    (ordenado por 'Received DtTm'), sem carregar o histórico inteiro na memória.
+
+    O limite de outlier da regra de chamadas simples é calculado no primeiro bloco e
+    reaproveitado nos demais, e todas as chegadas usam a mesma origem de tempo.
+    """
+
+    def __init__(self, csv_path=config.DATASET_PATH, tamanho_bloco=config.TAMANHO_BLOCO_REPLAY):
+        self.snapshot = ensure_snapshot(csv_path)
+        self.tamanho_bloco = tamanho_bloco
+
+    def __iter__(self):
+        import pyarrow.parquet as pq
+
+        origem = limite_outlier = None
+        for lote in pq.ParquetFile(self.snapshot).iter_batches(batch_size=self.tamanho_bloco, columns=COLUNAS_REPLAY):
+            df = lote.to_pandas()
+            if origem is None:
+                validos = df.dropna(subset=COLUNAS_REPLAY)
+                if validos.empty:
+                    continue
+                origem = validos['Received DtTm'].iloc[0]
+                limite_outlier = outlier_limit((validos['Available DtTm'] - validos['Received DtTm']).dt.total_seconds() / 60.0)
+            yield TraceReplay.from_dataframe(df, origem=origem, limite_outlier=limite_outlier)
+
+
+def replay_trace(trace, num_unidades, configuracao="chatbot", fator_chatbot=config.FATOR_TEMPO_CHATBOT,
+                 armazenar_amostras=config.ARMAZENAR_AMOSTRAS, aquecimento=config.PERIODO_AQUECIMENTO):
+    """
+    Reproduz chamadas históricas na mesma fila com prioridade dos motores de simulação.
+
+    `trace` é um `TraceReplay` ou uma sequência de blocos `TraceReplay` em ordem de
+    chegada (por exemplo, `ParquetTraceChunks`). Na configuração "baseline" todas as
+    chamadas usam o tempo real de atendimento humano; em "chatbot", as simples têm esse
+    tempo multiplicado por `fator_chatbot`. Os blocos são simulados um a um com
+    `IncrementalPriorityQueue`, em memória proporcional ao bloco.
+
+    Retorna `stats_locais` no mesmo formato de `run_simulation`; as séries seguem a
+    ordem de início do serviço.
+    """
+    if configuracao not in CONFIGURACOES:
+        raise ValueError(f"Configuração desconhecida: '{configuracao}'. Use 'baseline' ou 'chatbot'.")
+    blocos = trace.chunks() if isinstance(trace, TraceReplay) else trace
+
+    stats_locais = new_stats(config.TAMANHO_BLOCO_REPLAY, armazenar_amostras)
+    fila = IncrementalPriorityQueue(num_unidades)
+    ultima_chegada = -np.inf
+    fim_maximo = 0.0
+
+    def registrar(iniciadas):
+        nonlocal fim_maximo
+        _, inicios, entradas, servicos, chegadas = iniciadas
+        medidas = chegadas >= aquecimento
+        fins = inicios + servicos
+        stats_locais['tempos_espera_bombeiros'].extend((inicios - entradas)[medidas])
+        stats_locais['tempos_servico_bombeiros'].extend(servicos[medidas])
+        stats_locais['tempos_atendimento_total'].extend((fins - chegadas)[medidas])
+        if len(fins):
+            fim_maximo = max(fim_maximo, float(fins.max()))
+
+    for bloco in blocos:
+        if not len(bloco):
+            continue
+        if bloco.chegadas[0] < ultima_chegada:
+            raise ValueError("Os blocos do trace precisam estar em ordem de chegada.")
+        ultima_chegada = bloco.chegadas[-1]
+
+        atendimento = bloco.atendimento
+        if configuracao == "chatbot":
+            atendimento = np.where(bloco.simples, atendimento * fator_chatbot, atendimento)
+        fila.add(bloco.chegadas + atendimento, bloco.prioridades, bloco.servicos, marcas=bloco.chegadas)
+        # Chamadas futuras chegam depois da última deste bloco e o atendimento não é
+        # negativo: até esse instante, nenhuma entrada na fila ainda pode aparecer.
+        registrar(fila.advance(ate=ultima_chegada))
+
+        medidas = bloco.chegadas >= aquecimento
+        num_simples = int((bloco.simples & medidas).sum()) if configuracao == "chatbot" else 0
+        stats_locais['total_chamadas'] += int(medidas.sum())
+        stats_locais['chamadas_simples'] += num_simples
+        stats_locais['chamadas_complexas'] += int(medidas.sum()) - num_simples
+
+    registrar(fila.advance())
+    stats_locais = finalize_stats(stats_locais)
+    stats_locais['tempo_simulado'] = fim_maximo
+    return stats_locais
+
+
+def compare_replay(trace, cenarios_unidades, **opcoes):
+    """
+    Reproduz o histórico nas configurações "baseline" e "chatbot" para cada número de
+    unidades e retorna uma tabela com espera média, diferença entre as duas e os
+    quantis da espera de config.QUANTIS_METRICAS.
+    """
+    linhas = []
+    for num_unidades in cenarios_unidades:
+        resumos = {
+            configuracao: replay_trace(trace, num_unidades, configuracao, **opcoes)['resumo']
+            for configuracao in CONFIGURACOES
+        }
+        base, chatbot = resumos['baseline']['tempos_espera_bombeiros'], resumos['chatbot']['tempos_espera_bombeiros']
+        linhas.append({
+            'Unidades': num_unidades,
+            'Chamadas': base['n'],
+            'Espera média sem chatbot (min)': base['media'],
+            'Espera média com chatbot (min)': chatbot['media'],
+            'Diferença da espera média (min)': chatbot['media'] - base['media'],
+            **quantile_columns(base, 'sem chatbot (min)'),
+            **quantile_columns(chatbot, 'com chatbot (min)'),
+        })
+    return pd.DataFrame(linhas)
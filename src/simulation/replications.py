@@ -0,0 +1,100 @@
+# src/simulation/replications.py
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import config
+from .environment import run_simulation
+from .metrics import t_quantile
+from .random_streams import portable_distributions
+
+# Estado compartilhado por todas as replicações de um processo trabalhador,
+# enviado uma única vez na criação do processo em vez de a cada tarefa.
+_triagens_worker = None
+_distributions_worker = None
+
+
+def build_jobs(cenarios_unidades, num_replicacoes, seed=config.SEED):
+    """
+    Monta a lista de tarefas (num_unidades, replicação, semente).
+
+    As sementes são fluxos independentes gerados por `numpy.random.SeedSequence.spawn`.
+    A replicação r usa a mesma semente em todos os cenários de unidades (números
+    aleatórios comuns), o que reduz o ruído na comparação entre capacidades.
+    """
+    sementes = np.random.SeedSequence(seed).spawn(num_replicacoes)
+    return [
+        (num_unidades, replicacao, sementes[replicacao])
+        for num_unidades in cenarios_unidades
+        for replicacao in range(num_replicacoes)
+    ]
+
+
+def _iniciar_worker(triagens, distributions):
+    global _triagens_worker, _distributions_worker
+    _triagens_worker = triagens
+    _distributions_worker = distributions
+
+
+def _executar_replicacao(job):
+    num_unidades, replicacao, semente = job
+    stats = run_simulation(
+        num_unidades=num_unidades,
+        triagens=_triagens_worker,
+        distributions=_distributions_worker,
+        rng=np.random.default_rng(semente),
+        armazenar_amostras=False
+    )
+    resumo = stats['resumo']
+    return {
+        'Unidades': num_unidades,
+        'Replicação': replicacao,
+        'Chamadas Atendidas': stats['total_chamadas'],
+        'Simples (Chatbot)': stats['chamadas_simples'],
+        'Complexas (Humano)': stats['chamadas_complexas'],
+        'Tempo médio de espera (min)': resumo['tempos_espera_bombeiros']['media'],
+        'Tempo médio de serviço (min)': resumo['tempos_servico_bombeiros']['media'],
+        'Tempo médio no sistema (min)': resumo['tempos_atendimento_total']['media'],
+    }
+
+
+def summarize_replications(df_replicacoes, confianca=0.95):
+    """
+    Calcula, por número de unidades, a média de cada métrica entre as replicações e a
+    meia-largura do intervalo de confiança (t de Student).
+    """
+    import pandas as pd
+    metricas = [c for c in df_replicacoes.columns if c.startswith('Tempo médio')]
+    linhas = []
+    for num_unidades, grupo in df_replicacoes.groupby('Unidades'):
+        n = len(grupo)
+        t = t_quantile(confianca, n - 1) if n > 1 else np.nan
+        linha = {'Unidades': num_unidades, 'Replicações': n}
+        for metrica in metricas:
+            media = grupo[metrica].mean()
+            meia_largura = t * grupo[metrica].std(ddof=1) / np.sqrt(n) if n > 1 else np.nan
+            linha[metrica] = media
+            linha[f'{metrica} ± IC{int(confianca * 100)}%'] = meia_largura
+        linhas.append(linha)
+    return pd.DataFrame(linhas)
+
+
+def run_replications(jobs, triagens, distributions, max_workers=config.MAX_WORKERS):
+    """
+    Executa as tarefas de `build_jobs` em um pool de processos.
+
+    Retorna dois DataFrames: as métricas de cada replicação e o resumo por número de
+    unidades (médias e intervalos de confiança).
+    """
+    import pandas as pd
+    print(f"Executando {len(jobs)} replicações em paralelo...")
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_iniciar_worker,
+        initargs=(triagens, portable_distributions(distributions))
+    ) as pool:
+        linhas = list(pool.map(_executar_replicacao, jobs))
+
+    df_replicacoes = pd.DataFrame(linhas)
+    print("-> Replicações concluídas.")
+    return df_replicacoes, summarize_replications(df_replicacoes)
@@ -0,0 +1,91 @@
+# src/simulation/tracing.py
+from array import array
+import os
+
+import numpy as np
+
+import config
+
+# --- Níveis de rastreamento ---
+NIVEL_DESLIGADO = 0  # Nada é registrado nem impresso
+NIVEL_EVENTOS = 1    # Eventos gravados no log colunar, sem impressão
+NIVEL_DETALHADO = 2  # Eventos gravados e impressos um a um (depuração)
+
+# --- Tipos de evento ---
+EVENTO_CHEGADA = 0
+EVENTO_INICIO_CHATBOT = 1
+EVENTO_INICIO_HUMANO = 2
+EVENTO_ENTRADA_FILA = 3
+EVENTO_INICIO_SERVICO = 4
+EVENTO_FIM = 5
+EVENTO_PREEMPCAO = 6
+
+NOMES_EVENTOS = {
+    EVENTO_CHEGADA: "chega",
+    EVENTO_INICIO_CHATBOT: "(Simples) sendo atendido por chatbot",
+    EVENTO_INICIO_HUMANO: "(Complexo) sendo atendido por humano",
+    EVENTO_ENTRADA_FILA: "entra na fila para despacho",
+    EVENTO_INICIO_SERVICO: "é atendido pelos bombeiros",
+    EVENTO_FIM: "finaliza o atendimento",
+    EVENTO_PREEMPCAO: "perde a unidade para uma chamada mais urgente e volta à fila",
+}
+
+
+class EventTracer:
+    """
+    Registro dos eventos da simulação (id da chamada, tipo de evento, tempo simulado).
+
+    Os eventos ficam em buffers `array` compactos e podem ser salvos como um arquivo
+    `.npz` colunar para análise posterior. Desligado, o simulador só consulta o
+    atributo `ativo` e não registra nem formata nada.
+    """
+
+    def __init__(self, nivel=config.NIVEL_RASTREAMENTO):
+        self.nivel = nivel
+        self.ativo = nivel > NIVEL_DESLIGADO
+        self.detalhado = nivel >= NIVEL_DETALHADO
+        self._ids = array('q')  # 64 bits em qualquer plataforma (o 'l' do C tem 32 bits no Windows)
+        self._eventos = array('b')
+        self._tempos = array('d')
+
+    def registrar(self, id_chamada, evento, tempo):
+        self._ids.append(id_chamada)
+        self._eventos.append(evento)
+        self._tempos.append(tempo)
+        if self.detalhado:
+            print(f"{tempo:.2f}: Chamada-{id_chamada} {NOMES_EVENTOS[evento]}.")
+
+    def registrar_lote(self, ids_chamadas, evento, tempos):
+        """Registra de uma vez o mesmo tipo de evento para várias chamadas."""
+        self._ids.extend(ids_chamadas)
+        self._eventos.extend([evento] * len(tempos))
+        self._tempos.extend(tempos)
+        if self.detalhado:
+            for id_chamada, tempo in zip(ids_chamadas, tempos):
+                print(f"{tempo:.2f}: Chamada-{id_chamada} {NOMES_EVENTOS[evento]}.")
+
+    def __len__(self):
+        return len(self._tempos)
+
+    def to_arrays(self):
+        """Colunas do log como arrays numpy (sem cópia)."""
+        return {
+            "id_chamada": np.frombuffer(self._ids, dtype=np.int64) if self._ids else np.empty(0, dtype=np.int64),
+            "evento": np.frombuffer(self._eventos, dtype=np.int8) if self._eventos else np.empty(0, dtype=np.int8),
+            "tempo": np.frombuffer(self._tempos, dtype=np.float64) if self._tempos else np.empty(0),
+        }
+
+    def save(self, path):
+        """Salva o log em formato colunar compactado (`.npz`)."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        np.savez_compressed(path, **self.to_arrays())
+        print(f"-> Log de eventos salvo em: {path} ({len(self)} eventos)")
+
+
+def load_trace(path):
+    """Carrega um log salvo por `EventTracer.save` como DataFrame."""
+    import pandas as pd
+    with np.load(path) as dados:
+        df = pd.DataFrame({coluna: dados[coluna] for coluna in dados.files})
+    df['nome_evento'] = df['evento'].map(NOMES_EVENTOS)
+    return df
@@ -0,0 +1,113 @@
+# src/utils/checkpoint.py
+import hashlib
+import logging
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+import config
+from . import instrumentation
+
+logger = logging.getLogger(__name__)
+
+VERSAO_ETAPAS = 2  # Incrementar quando o formato ou o cálculo de alguma etapa mudar
+
+
+def input_hash(*partes):
+    """
+    Hash das entradas de uma etapa. Aceita DataFrames/Series (conteúdo), arrays numpy,
+    textos, números, None e listas/tuplas/dicionários desses tipos. Para encadear
+    etapas, passe a chave da etapa anterior como uma das partes.
+    """
+    h = hashlib.blake2b(f"v{VERSAO_ETAPAS}".encode('utf-8'), digest_size=16)
+
+    def _atualizar(parte):
+        if isinstance(parte, (pd.DataFrame, pd.Series)):
+            h.update(pd.util.hash_pandas_object(parte, index=True).to_numpy().tobytes())
+            nomes = parte.columns if isinstance(parte, pd.DataFrame) else [parte.name]
+            h.update(",".join(map(str, nomes)).encode('utf-8'))
+        elif isinstance(parte, np.ndarray):
+            h.update(np.ascontiguousarray(parte).tobytes())
+            h.update(str(parte.dtype).encode('utf-8'))
+        elif isinstance(parte, dict):
+            for chave in sorted(parte, key=str):
+                _atualizar(str(chave))
+                _atualizar(parte[chave])
+        elif isinstance(parte, (list, tuple)):
+            h.update(f"[{len(parte)}]".encode('utf-8'))
+            for item in parte:
+                _atualizar(item)
+        elif parte is None or isinstance(parte, (str, int, float, bool)):
+            h.update(repr(parte).encode('utf-8'))
+        else:
+            raise TypeError(f"Tipo sem hash estável para chave de etapa: {type(parte).__name__}")
+        h.update(b"\0")
+
+    for parte in partes:
+        _atualizar(parte)
+    return h.hexdigest()
+
+
+def file_signature(path):
+    """Identifica um arquivo de entrada pelo caminho, tamanho e data de modificação."""
+    info = os.stat(path)
+    return f"{os.path.abspath(path)}:{info.st_size}:{info.st_mtime_ns}"
+
+
+class PipelineCheckpoint:
+    """
+    Guarda o resultado de cada etapa do pipeline em disco, identificado pelo nome da
+    etapa e pelo hash das suas entradas. Numa nova execução com as mesmas entradas, a
+    etapa é lida do disco em vez de recalculada, de modo que um estudo interrompido
+    retoma do ponto em que parou.
+
+    Os artefatos são gravados com pickle em `diretorio/<etapa>/<chave>.pkl`, por meio
+    de um arquivo temporário renomeado no fim, para que uma interrupção no meio da
+    gravação não deixe um artefato corrompido.
+    """
+
+    def __init__(self, diretorio=config.CHECKPOINT_DIR, ativo=config.RETOMAR_EXECUCAO):
+        self.diretorio = diretorio
+        self.ativo = ativo
+
+    def _path(self, etapa, chave):
+        return os.path.join(self.diretorio, etapa, f"{chave}.pkl")
+
+    def has(self, etapa, chave):
+        """Indica se a etapa já tem artefato salvo para essas entradas."""
+        return self.ativo and os.path.exists(self._path(etapa, chave))
+
+    def load(self, etapa, chave):
+        with open(self._path(etapa, chave), 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, etapa, chave, valor):
+        path = self._path(etapa, chave)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporario = f"{path}.{os.getpid()}.tmp"
+        with open(temporario, 'wb') as f:
+            pickle.dump(valor, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporario, path)
+
+    def run(self, etapa, chave, calcular):
+        """
+        Retorna o artefato salvo da etapa para `chave` ou, se não houver, executa
+        `calcular()`, salva o resultado e o retorna. O tempo e a memória da etapa,
+        retomada ou não, vão para a instrumentação da execução.
+        """
+        with instrumentation.stage(etapa) as medicao:
+            medicao['retomada'] = False
+            if self.has(etapa, chave):
+                try:
+                    valor = self.load(etapa, chave)
+                    print(f"-> Etapa '{etapa}' retomada do checkpoint ({chave[:12]}).")
+                    medicao['retomada'] = True
+                    return valor
+                except (OSError, pickle.UnpicklingError, EOFError) as erro:
+                    logger.warning("Checkpoint da etapa '%s' ilegível (%s); recalculando.", etapa, erro)
+            valor = calcular()
+            if self.ativo:
+                self.save(etapa, chave, valor)
+            return valor
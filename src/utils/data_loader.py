@@ -0,0 +1,156 @@
+# src/utils/data_loader.py
+import glob
+import os
+
+import pandas as pd
+
+import config
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+    PYARROW_DISPONIVEL = True
+except ImportError:
+    PYARROW_DISPONIVEL = False
+
+# Colunas usadas pelo pipeline (main.py e notebooks). As demais nem são lidas.
+TIMESTAMP_COLS = ['Received DtTm', 'Entry DtTm', 'Response DtTm', 'On Scene DtTm', 'Available DtTm']
+CATEGORY_COLS = ['Call Type', 'Call Type Group']
+NUMERIC_COLS = ['Final Priority']
+ID_COLS = ['Incident Number']
+USECOLS = TIMESTAMP_COLS + CATEGORY_COLS + NUMERIC_COLS + ID_COLS
+
+# Incrementar quando o tratamento das colunas mudar, para invalidar snapshots antigos.
+VERSAO_SNAPSHOT = 2
+
+
+def _snapshot_path(csv_path):
+    """Caminho do snapshot Parquet, identificado pelo tamanho e data de modificação do CSV."""
+    info = os.stat(csv_path)
+    nome = os.path.splitext(os.path.basename(csv_path))[0]
+    return os.path.join(
+        config.CACHE_DIR,
+        f"{nome}.v{VERSAO_SNAPSHOT}.{info.st_size}.{info.st_mtime_ns}.parquet"
+    )
+
+
+def _parse_timestamps(coluna):
+    """
+    Converte uma coluna de texto em datetime usando o formato explícito do dataset,
+    que é vetorizado. Se o formato não bater com o arquivo, cai na inferência do pandas.
+    """
+    convertida = pd.to_datetime(coluna, format=config.FORMATO_DATA_DATASET, errors='coerce')
+    if convertida.isna().sum() > coluna.isna().sum():
+        convertida = pd.to_datetime(coluna, errors='coerce')
+    return convertida
+
+
+def _read_csv_pyarrow(csv_path):
+    """Leitura multi-thread do pyarrow, com as datas convertidas em C pelo próprio pyarrow."""
+    tabela = pa_csv.read_csv(
+        csv_path,
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=USECOLS,
+            column_types={col: pa.string() for col in TIMESTAMP_COLS + NUMERIC_COLS},
+            strings_can_be_null=True,
+        )
+    )
+    for col in TIMESTAMP_COLS:
+        convertida = pc.strptime(tabela[col], format=config.FORMATO_DATA_DATASET, unit='s', error_is_null=True)
+        if convertida.null_count > tabela[col].null_count:
+            # Formato diferente do esperado: deixa a coluna para a inferência do pandas.
+            continue
+        tabela = tabela.set_column(tabela.schema.get_field_index(col), col, convertida)
+
+    df = tabela.to_pandas()
+    for col in TIMESTAMP_COLS:
+        if not pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = _parse_timestamps(df[col])
+    return df
+
+
+def _read_csv(csv_path):
+    if PYARROW_DISPONIVEL:
+        df = _read_csv_pyarrow(csv_path)
+    else:
+        dtypes = {col: 'string' for col in TIMESTAMP_COLS + NUMERIC_COLS}
+        df = pd.read_csv(csv_path, usecols=USECOLS, dtype=dtypes, engine='c')
+        for col in TIMESTAMP_COLS:
+            df[col] = _parse_timestamps(df[col])
+
+    for col in CATEGORY_COLS:
+        df[col] = df[col].astype('category')
+    for col in NUMERIC_COLS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    return df
+
+
+def load_dataset(csv_path=config.DATASET_PATH, use_snapshot=True):
+    """
+    Carrega o dataset de chamadas dos bombeiros apenas com as colunas usadas pelo
+    pipeline, já tipadas (datas, categorias e prioridade numérica).
+
+    Na primeira leitura grava um snapshot Parquet em `config.CACHE_DIR`; enquanto o
+    CSV não mudar (mesmo tamanho e data de modificação), as próximas execuções leem o
+    snapshot mapeado em memória e pulam o parse do CSV. As linhas vêm ordenadas por
+    'Received DtTm'.
+    Lança FileNotFoundError se o CSV não existir.
+    """
+    snapshot = _snapshot_path(csv_path)
+    use_snapshot = use_snapshot and PYARROW_DISPONIVEL
+
+    if use_snapshot and os.path.exists(snapshot):
+        print(f"-> Lendo snapshot do dataset: {snapshot}")
+        return pd.read_parquet(snapshot, memory_map=True)
+
+    print(f"-> Lendo CSV do dataset: {csv_path}")
+    df = _read_csv(csv_path)
+    # Em ordem de recebimento: o snapshot pode então ser lido em blocos (ver replay.py).
+    df.sort_values('Received DtTm', kind='stable', inplace=True, ignore_index=True)
+
+    if use_snapshot:
+        os.makedirs(config.CACHE_DIR, exist_ok=True)
+        # Remove snapshots de versões anteriores do mesmo CSV.
+        prefixo = os.path.splitext(os.path.basename(csv_path))[0]
+        for antigo in glob.glob(os.path.join(config.CACHE_DIR, f"{glob.escape(prefixo)}.v*.parquet")):
+            os.remove(antigo)
+        df.to_parquet(snapshot, index=False)
+        print(f"-> Snapshot salvo em: {snapshot}")
+
+    return df
+
+
+def ensure_snapshot(csv_path=config.DATASET_PATH):
+    """
+    Retorna o caminho do snapshot Parquet do CSV, gravando-o antes se ainda não existir.
+    Permite ler o dataset em blocos (pyarrow) sem carregá-lo inteiro a cada execução.
+    """
+    snapshot = _snapshot_path(csv_path)
+    if not os.path.exists(snapshot):
+        if not PYARROW_DISPONIVEL:
+            raise ImportError("A leitura do snapshot em blocos precisa do pyarrow.")
+        load_dataset(csv_path)
+    return snapshot
+
+
+def simple_call_mask(df, limite_outlier=None):
+    """
+    Regra do KDD para chamadas simples: prioridade final menor que 3, grupo fora de
+    'Fire' e 'Alarms' e duração do incidente (Received -> Available) até o limite de
+    outlier Q3 + 1.5·IQR. Com `limite_outlier`, usa esse limite em vez de calculá-lo
+    a partir de `df` (útil ao processar o dataset em blocos).
+    """
+    duracao = (df['Available DtTm'] - df['Received DtTm']).dt.total_seconds() / 60.0
+    if limite_outlier is None:
+        limite_outlier = outlier_limit(duracao)
+    regra_prioridade = (df['Final Priority'] < 3)
+    regra_grupo = (~df['Call Type Group'].isin(['Fire', 'Alarms']))
+    regra_outlier = (duracao <= limite_outlier)
+    return (regra_prioridade & regra_grupo & regra_outlier).to_numpy()
+
+
+def outlier_limit(duracao):
+    """Limite superior de outlier (Q3 + 1.5·IQR) de uma série de durações."""
+    q3 = duracao.quantile(0.75)
+    return q3 + 1.5 * (q3 - duracao.quantile(0.25))
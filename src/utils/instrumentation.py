@@ -0,0 +1,358 @@
+# src/utils/instrumentation.py
+"""
+Instrumentação da execução: tempo, CPU e pico de memória de cada etapa, contadores,
+valores e histogramas (latência do LLM, acertos do cache, eventos simulados por
+segundo). Os módulos registram tudo no objeto do processo (`registro`, usado pelas
+funções `stage`, `count`, `gauge` e `observe`), e `export` grava o relatório em JSON
+e/ou no formato texto do Prometheus no fim da execução.
+
+Só o processo principal é medido: o que roda em processos trabalhadores (ajustes em
+paralelo, replicações) aparece no tempo e na memória da etapa que os dispara.
+"""
+import bisect
+import contextlib
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from datetime import datetime
+
+import config
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Limites (em segundos) dos intervalos do histograma de latência do LLM.
+LIMITES_LATENCIA = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+PREFIXO_PROMETHEUS = "simulacao_"
+
+
+def _rss_mb():
+    """Memória residente atual do processo, em MB (None se não houver como medir)."""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss / (1024 * 1024)
+
+
+def _pico_processo_mb():
+    """Pico de memória residente do processo desde o início, em MB."""
+    if resource is None:
+        return _rss_mb()
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB; macOS, em bytes.
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+class Histogram:
+    """Histograma cumulativo no estilo do Prometheus: contagem por limite, soma e total."""
+
+    def __init__(self, limites=LIMITES_LATENCIA):
+        self.limites = tuple(sorted(limites))
+        self.contagens = [0] * (len(self.limites) + 1)  # A última posição é o +Inf
+        self.soma = 0.0
+        self.total = 0
+        self.maximo = None
+
+    def observe(self, valor):
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+        self.maximo = valor if self.maximo is None else max(self.maximo, valor)
+
+    def quantile(self, q):
+        """Quantil aproximado: limite superior do primeiro intervalo que alcança `q`."""
+        if not self.total:
+            return None
+        alvo = q * self.total
+        acumulado = 0
+        for limite, contagem in zip(self.limites + (self.maximo,), self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return min(limite, self.maximo)
+        return self.maximo
+
+    def to_dict(self):
+        acumuladas, acumulado = {}, 0
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            acumuladas[str(limite)] = acumulado
+        acumuladas['+Inf'] = self.total
+        return {
+            'total': self.total,
+            'soma': self.soma,
+            'media': self.soma / self.total if self.total else None,
+            'maximo': self.maximo,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'intervalos': acumuladas,
+        }
+
+
+class _MonitorMemoria(threading.Thread):
+    """
+    Amostra a memória residente a cada `intervalo` segundos e atualiza o pico de cada
+    etapa em andamento. O pico do processo (`ru_maxrss`) só cresce, então não separa as
+    etapas; a amostragem sim, ao custo de poder perder picos mais curtos que o intervalo.
+    """
+
+    def __init__(self, intervalo):
+        super().__init__(name="monitor-memoria", daemon=True)
+        self.intervalo = intervalo
+        self.picos = {}
+        self._lock = threading.Lock()
+        self._parar = threading.Event()
+
+    def track(self, nome):
+        with self._lock:
+            self.picos[nome] = _rss_mb()
+
+    def release(self, nome):
+        self._amostrar()
+        with self._lock:
+            return self.picos.pop(nome, None)
+
+    def _amostrar(self):
+        rss = _rss_mb()
+        with self._lock:
+            for nome, pico in self.picos.items():
+                self.picos[nome] = rss if pico is None else max(pico, rss)
+
+    def run(self):
+        while not self._parar.wait(self.intervalo):
+            self._amostrar()
+
+    def stop(self):
+        self._parar.set()
+
+
+class RunInstrumentation:
+    """
+    Métricas de uma execução. Etapas (`stage`) podem ser aninhadas e são nomeadas pelo
+    caminho ("distribuicoes/chegadas"); uma etapa repetida acumula tempo e execuções.
+    Contadores, valores e histogramas podem ser atualizados de qualquer thread.
+    Com `ativo=False`, tudo vira operação vazia.
+    """
+
+    def __init__(self, ativo=config.INSTRUMENTACAO, intervalo_memoria=config.INTERVALO_MEMORIA_SEGUNDOS):
+        self.ativo = ativo
+        self.intervalo_memoria = intervalo_memoria
+        self.inicio = datetime.now()
+        self.etapas = {}
+        self.contadores = {}
+        self.valores = {}
+        self.histogramas = {}
+        self._pilha = []
+        self._lock = threading.Lock()
+        self._monitor = None
+
+    @contextlib.contextmanager
+    def stage(self, nome):
+        """
+        Mede uma etapa: tempo de relógio, tempo de CPU do processo, memória residente no
+        início e pico durante a etapa. Produz um dicionário em que a etapa pode anotar
+        valores próprios (por exemplo, itens processados).
+        """
+        extras = {}
+        if not self.ativo:
+            yield extras
+            return
+        caminho = "/".join(self._pilha + [nome])
+        self._pilha.append(nome)
+        if self._monitor is None and self.intervalo_memoria:
+            self._monitor = _MonitorMemoria(self.intervalo_memoria)
+            self._monitor.start()
+        if self._monitor is not None:
+            self._monitor.track(caminho)
+        rss_inicial = _rss_mb()
+        inicio, cpu_inicio = time.perf_counter(), time.process_time()
+        try:
+            yield extras
+        finally:
+            segundos = time.perf_counter() - inicio
+            cpu = time.process_time() - cpu_inicio
+            pico = self._monitor.release(caminho) if self._monitor is not None else None
+            self._pilha.pop()
+            with self._lock:
+                etapa = self.etapas.setdefault(caminho, {'execucoes': 0, 'segundos': 0.0, 'cpu_segundos': 0.0})
+                etapa['execucoes'] += 1
+                etapa['segundos'] += segundos
+                etapa['cpu_segundos'] += cpu
+                etapa['rss_inicial_mb'] = etapa.get('rss_inicial_mb', rss_inicial)
+                if pico is not None:
+                    etapa['pico_rss_mb'] = max(pico, etapa.get('pico_rss_mb', pico))
+                etapa['pico_processo_mb'] = _pico_processo_mb()
+                etapa.update(extras)
+            logger.debug("Etapa '%s' concluída em %.2f s.", caminho, segundos)
+
+    def count(self, nome, valor=1):
+        """Soma `valor` ao contador `nome`."""
+        if self.ativo:
+            with self._lock:
+                self.contadores[nome] = self.contadores.get(nome, 0) + valor
+
+    def gauge(self, nome, valor):
+        """Registra o valor atual de `nome` (substitui o anterior)."""
+        if self.ativo:
+            with self._lock:
+                self.valores[nome] = valor
+
+    def observe(self, nome, valor, limites=LIMITES_LATENCIA):
+        """Acrescenta uma observação ao histograma `nome`, criado com `limites` no primeiro uso."""
+        if self.ativo:
+            with self._lock:
+                histograma = self.histogramas.get(nome)
+                if histograma is None:
+                    histograma = self.histogramas[nome] = Histogram(limites)
+                histograma.observe(valor)
+
+    def _taxas(self):
+        """Métricas derivadas dos contadores: taxa de acerto do cache e eventos por segundo."""
+        taxas = {}
+        acertos = self.contadores.get('triagem_cache_acertos', 0)
+        consultas = acertos + self.contadores.get('triagem_cache_faltas', 0)
+        if consultas:
+            taxas['triagem_taxa_acerto_cache'] = acertos / consultas
+        if self.contadores.get('simpy_segundos'):
+            taxas['simpy_eventos_por_segundo'] = self.contadores['simpy_eventos'] / self.contadores['simpy_segundos']
+        return taxas
+
+    def report(self):
+        """Relatório completo da execução como dicionário serializável em JSON."""
+        with self._lock:
+            return {
+                'inicio': self.inicio.isoformat(timespec='seconds'),
+                'segundos_total': (datetime.now() - self.inicio).total_seconds(),
+                'pico_processo_mb': _pico_processo_mb(),
+                'etapas': {nome: dict(etapa) for nome, etapa in self.etapas.items()},
+                'contadores': dict(self.contadores),
+                'valores': {**self.valores, **self._taxas()},
+                'histogramas': {nome: h.to_dict() for nome, h in self.histogramas.items()},
+            }
+
+    def prometheus_text(self):
+        """Relatório no formato de exposição em texto do Prometheus."""
+        relatorio = self.report()
+        linhas = []
+
+        def metrica(nome, tipo, amostras):
+            linhas.append(f"# TYPE {PREFIXO_PROMETHEUS}{nome} {tipo}")
+            for rotulos, valor in amostras:
+                if valor is None:
+                    continue
+                texto_rotulos = ",".join(f'{k}="{v}"' for k, v in rotulos.items())
+                linhas.append(f"{PREFIXO_PROMETHEUS}{nome}{{{texto_rotulos}}} {float(valor):.6g}"
+                              if texto_rotulos else f"{PREFIXO_PROMETHEUS}{nome} {float(valor):.6g}")
+
+        for campo in ('segundos', 'cpu_segundos', 'execucoes', 'rss_inicial_mb', 'pico_rss_mb'):
+            metrica(f"etapa_{campo}", 'gauge',
+                    [({'etapa': nome}, etapa.get(campo)) for nome, etapa in relatorio['etapas'].items()])
+        metrica("pico_processo_mb", 'gauge', [({}, relatorio['pico_processo_mb'])])
+        for nome, valor in relatorio['contadores'].items():
+            metrica(f"{nome}_total", 'counter', [({}, valor)])
+        for nome, valor in relatorio['valores'].items():
+            if isinstance(valor, (int, float)):
+                metrica(nome, 'gauge', [({}, valor)])
+        for nome, histograma in relatorio['histogramas'].items():
+            linhas.append(f"# TYPE {PREFIXO_PROMETHEUS}{nome} histogram")
+            for limite, contagem in histograma['intervalos'].items():
+                linhas.append(f'{PREFIXO_PROMETHEUS}{nome}_bucket{{le="{limite}"}} {contagem}')
+            linhas.append(f"{PREFIXO_PROMETHEUS}{nome}_sum {histograma['soma']:.6g}")
+            linhas.append(f"{PREFIXO_PROMETHEUS}{nome}_count {histograma['total']}")
+        return "\n".join(linhas) + "\n"
+
+    def export(self, diretorio=config.METRICS_DIR, formatos=config.FORMATOS_INSTRUMENTACAO, nome="execucao"):
+        """Grava o relatório em `diretorio` nos formatos pedidos ("json", "prometheus"). Retorna os caminhos."""
+        if not self.ativo:
+            return []
+        os.makedirs(diretorio, exist_ok=True)
+        caminhos = []
+        for formato in formatos:
+            if formato == "json":
+                caminho = os.path.join(diretorio, f"{nome}.json")
+                with open(caminho, "w", encoding="utf-8") as arquivo:
+                    json.dump(self.report(), arquivo, indent=2, ensure_ascii=False)
+            elif formato == "prometheus":
+                caminho = os.path.join(diretorio, f"{nome}.prom")
+                with open(caminho, "w", encoding="utf-8") as arquivo:
+                    arquivo.write(self.prometheus_text())
+            else:
+                raise ValueError(f"Formato de instrumentação desconhecido: '{formato}'. Use 'json' ou 'prometheus'.")
+            caminhos.append(caminho)
+        return caminhos
+
+    def close(self):
+        if self._monitor is not None:
+            self._monitor.stop()
+            self._monitor = None
+
+
+@contextlib.contextmanager
+def profile(perfilador=config.PERFILADOR, diretorio=config.METRICS_DIR, nome="perfil"):
+    """
+    Captura um perfil de CPU do bloco com "cprofile" (grava `<nome>.prof`, legível com
+    `pstats` ou snakeviz, e um resumo em texto) ou "pyinstrument" (grava `<nome>.html`;
+    exige o pacote instalado). Com `perfilador=None`, não faz nada.
+    """
+    if perfilador is None:
+        yield
+        return
+    os.makedirs(diretorio, exist_ok=True)
+    if perfilador == "cprofile":
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield
+        finally:
+            perfil.disable()
+            perfil.dump_stats(os.path.join(diretorio, f"{nome}.prof"))
+            resumo = io.StringIO()
+            pstats.Stats(perfil, stream=resumo).sort_stats('cumulative').print_stats(40)
+            with open(os.path.join(diretorio, f"{nome}.txt"), "w", encoding="utf-8") as arquivo:
+                arquivo.write(resumo.getvalue())
+    elif perfilador == "pyinstrument":
+        try:
+            from pyinstrument import Profiler
+        except ImportError as e:
+            raise ImportError("PERFILADOR = 'pyinstrument' exige o pacote pyinstrument (pip install pyinstrument).") from e
+        perfil = Profiler()
+        perfil.start()
+        try:
+            yield
+        finally:
+            perfil.stop()
+            with open(os.path.join(diretorio, f"{nome}.html"), "w", encoding="utf-8") as arquivo:
+                arquivo.write(perfil.output_html())
+    else:
+        raise ValueError(f"Perfilador desconhecido: '{perfilador}'. Use None, 'cprofile' ou 'pyinstrument'.")
+
+
+# Instrumentação do processo atual, compartilhada por todos os módulos.
+registro = RunInstrumentation()
+
+
+def stage(nome):
+    return registro.stage(nome)
+
+
+def count(nome, valor=1):
+    registro.count(nome, valor)
+
+
+def gauge(nome, valor):
+    registro.gauge(nome, valor)
+
+
+def observe(nome, valor, limites=LIMITES_LATENCIA):
+    registro.observe(nome, valor, limites)
@@ -1,62 +1,171 @@
 # src/utils/plotter.py
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import config
+
+if config.GRAFICOS_SEM_JANELA:
+    matplotlib.use('Agg')
+
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import numpy as np
-import os
-import config
 
-# Configura o estilo dos gráficos
-plt.style.use('seaborn-v0_8-whitegrid')
+PLOTS_DIR = os.path.join(config.RESULTS_DIR, "plots")
+
+_estilo_configurado = False
+
+
+def setup_style():
+    """
+    Configura o estilo dos gráficos uma vez por processo, no primeiro gráfico, e não na
+    importação do módulo.
+    """
+    global _estilo_configurado
+    if not _estilo_configurado:
+        plt.style.use('seaborn-v0_8-whitegrid')
+        _estilo_configurado = True
+
+
+def _finalizar(fig, nome_arquivo, save):
+    """Salva a figura (se pedido), mostra a janela fora do modo sem janela e libera a figura."""
+    if save:
+        os.makedirs(PLOTS_DIR, exist_ok=True)
+        path = os.path.join(PLOTS_DIR, nome_arquivo)
+        fig.savefig(path)
+        print(f"-> Gráfico salvo em: {path}")
+    if not config.GRAFICOS_SEM_JANELA:
+        plt.show()
+    plt.close(fig)
+
+
+def reduce_samples(df_plot_data, max_amostras=config.MAX_AMOSTRAS_GRAFICO):
+    """
+    Reduz cada cenário com mais de `max_amostras` tempos de espera a `max_amostras`
+    quantis igualmente espaçados (incluindo mínimo e máximo). Mantém a forma da
+    distribuição, os quartis e os extremos usados pelo boxplot.
+    """
+    partes = []
+    for unidades, grupo in df_plot_data.groupby('Unidades', observed=True):
+        valores = grupo['Tempo de Espera'].to_numpy()
+        if len(valores) > max_amostras:
+            valores = np.quantile(valores, np.linspace(0, 1, max_amostras))
+        partes.append(pd.DataFrame({'Tempo de Espera': valores, 'Unidades': unidades}))
+    if not partes:
+        return df_plot_data
+    reduzido = pd.concat(partes, ignore_index=True)
+    reduzido['Unidades'] = pd.Categorical(reduzido['Unidades'], categories=df_plot_data['Unidades'].cat.categories)
+    return reduzido
+
+
+def bin_samples(df_plot_data, max_amostras=config.MAX_AMOSTRAS_GRAFICO, num_bins=512):
+    """
+    Agrupa os tempos de espera de cada cenário grande em `num_bins` faixas, devolvendo
+    o centro de cada faixa com a contagem na coluna 'peso'. A KDE ponderada sobre os
+    bins custa O(bins) em vez de O(amostras). Cenários pequenos ficam com peso 1.
+    """
+    partes = []
+    for unidades, grupo in df_plot_data.groupby('Unidades', observed=True):
+        valores = grupo['Tempo de Espera'].to_numpy()
+        if len(valores) > max_amostras:
+            contagens, bordas = np.histogram(valores, bins=num_bins)
+            centros = (bordas[:-1] + bordas[1:]) / 2
+            com_dados = contagens > 0
+            valores, pesos = centros[com_dados], contagens[com_dados].astype(float)
+        else:
+            pesos = np.ones(len(valores))
+        partes.append(pd.DataFrame({'Tempo de Espera': valores, 'peso': pesos, 'Unidades': unidades}))
+    if not partes:
+        return df_plot_data.assign(peso=1.0)
+    binado = pd.concat(partes, ignore_index=True)
+    binado['Unidades'] = pd.Categorical(binado['Unidades'], categories=df_plot_data['Unidades'].cat.categories)
+    return binado
+
+
+def cumulative_curves(all_results, max_pontos=config.MAX_AMOSTRAS_GRAFICO):
+    """
+    Curvas de espera acumulada (esperas ordenadas e somadas) de cada cenário, com no
+    máximo `max_pontos` pontos cada. Retorna {unidades: (x, y)}.
+    """
+    curvas = {}
+    for n_unidades, data in all_results.items():
+        tempos_de_espera = data.get('tempos_espera_bombeiros', [])
+        if len(tempos_de_espera):
+            tempos_acumulados = np.cumsum(np.sort(tempos_de_espera))
+            x = np.arange(len(tempos_acumulados))
+            if len(x) > max_pontos:
+                x = np.unique(np.linspace(0, len(x) - 1, max_pontos).astype(np.int64))
+            curvas[n_unidades] = (x, tempos_acumulados[x])
+    return curvas
+
 
 def plot_boxplot(df_plot_data, save=True):
     """Gera um boxplot comparativo dos tempos de espera."""
     print("Gerando gráfico: Boxplot Comparativo do Tempo de Espera...")
+    df_plot_data = reduce_samples(df_plot_data)
+    setup_style()
     fig, ax = plt.subplots(figsize=(10, 6))
     sns.boxplot(x='Unidades', y='Tempo de Espera', data=df_plot_data, ax=ax)
     ax.set_title('Boxplot Comparativo do Tempo de Espera por Unidade (com Chatbot)', fontsize=16)
     ax.set_xlabel('Número de Unidades de Bombeiros', fontsize=12)
     ax.set_ylabel('Tempo de Espera por Bombeiros (minutos)', fontsize=12)
-    
-    if save:
-        path = os.path.join(config.BASE_DIR, "results", "plots", "boxplot_tempo_espera.png")
-        plt.savefig(path)
-        print(f"-> Gráfico salvo em: {path}")
-    plt.show()
+
+    _finalizar(fig, "boxplot_tempo_espera.png", save)
 
 def plot_distribution(df_plot_data, save=True):
     """Gera um gráfico de distribuição dos tempos de espera."""
     print("Gerando gráfico: Distribuição do Tempo de Espera...")
+    if 'peso' not in df_plot_data:
+        df_plot_data = bin_samples(df_plot_data)
+    setup_style()
     fig, ax = plt.subplots(figsize=(10, 6))
-    sns.kdeplot(data=df_plot_data, x='Tempo de Espera', hue='Unidades', 
+    sns.kdeplot(data=df_plot_data, x='Tempo de Espera', hue='Unidades', weights='peso',
                 fill=True, common_norm=False, alpha=0.3, ax=ax, bw_adjust=.5)
     ax.set_title('Distribuição do Tempo de Espera para Diferentes Números de Unidades', fontsize=16)
     ax.set_xlabel('Tempo de Espera por Bombeiros (minutos)', fontsize=12)
     ax.set_ylabel('Densidade', fontsize=12)
-    
-    if save:
-        path = os.path.join(config.BASE_DIR, "results", "plots", "distribuicao_tempo_espera.png")
-        plt.savefig(path)
-        print(f"-> Gráfico salvo em: {path}")
-    plt.show()
+
+    _finalizar(fig, "distribuicao_tempo_espera.png", save)
 
 def plot_cumulative_wait_time(all_results, save=True):
-    """Gera um gráfico do tempo de espera acumulado."""
+    """
+    Gera um gráfico do tempo de espera acumulado. Aceita os resultados da simulação
+    ou as curvas já calculadas por `cumulative_curves`.
+    """
     print("Gerando gráfico: Tempo de Espera Acumulado...")
+    curvas = all_results if all(isinstance(v, tuple) for v in all_results.values()) else cumulative_curves(all_results)
+    setup_style()
     fig, ax = plt.subplots(figsize=(10, 6))
-    for n_unidades, data in all_results.items():
-        tempos_de_espera = data.get('tempos_espera_bombeiros', [])
-        if tempos_de_espera:
-            tempos_acumulados = np.cumsum(np.sort(tempos_de_espera))
-            ax.plot(range(len(tempos_acumulados)), tempos_acumulados, label=f'{n_unidades} unidades')
+    for n_unidades, (x, tempos_acumulados) in curvas.items():
+        ax.plot(x, tempos_acumulados, label=f'{n_unidades} unidades')
 
     ax.set_title('Tempo de Espera Acumulado por Chamada (com Chatbot)', fontsize=16)
     ax.set_xlabel('Número de Chamadas Atendidas', fontsize=12)
     ax.set_ylabel('Tempo de Espera Acumulado Total (minutos)', fontsize=12)
     ax.legend()
-    
-    if save:
-        path = os.path.join(config.BASE_DIR, "results", "plots", "acumulado_tempo_espera.png")
-        plt.savefig(path)
-        print(f"-> Gráfico salvo em: {path}")
-    plt.show()
\ No newline at end of file
+
+    _finalizar(fig, "acumulado_tempo_espera.png", save)
+
+def plot_all(df_plot_data, all_results, save=True, paralelo=config.GRAFICOS_PARALELO):
+    """
+    Gera os três gráficos do relatório. Os dados são reduzidos antes (quantis, bins e
+    curvas com pontos limitados), de modo que só o necessário é enviado aos processos.
+    Em modo sem janela e com `paralelo`, cada gráfico é renderizado em um processo.
+    """
+    tarefas = [
+        (plot_boxplot, reduce_samples(df_plot_data)),
+        (plot_distribution, bin_samples(df_plot_data)),
+        (plot_cumulative_wait_time, cumulative_curves(all_results)),
+    ]
+    if not (paralelo and config.GRAFICOS_SEM_JANELA):
+        for funcao, dados in tarefas:
+            funcao(dados, save)
+        return
+
+    max_workers = min(len(tarefas), config.MAX_WORKERS or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futuros = [executor.submit(funcao, dados, save) for funcao, dados in tarefas]
+        for futuro in futuros:
+            futuro.result()
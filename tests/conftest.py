@@ -0,0 +1,52 @@
+# tests/conftest.py
+import numpy as np
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from src.agent.cache import TriageCache
+from src.agent.chatbot import EmergencyCallInfo, EmergencyResponseAgent
+
+
+class PreprocessadorPrioridade:
+    """Pré-processador mínimo: só a prioridade original vai para o classificador."""
+
+    def transform(self, df):
+        return df[['Original Priority']].to_numpy(dtype=float)
+
+
+class ClassificadorPrioridade:
+    """Classificador mínimo: é complexa a chamada com prioridade a partir de `limite`."""
+
+    def __init__(self, limite=3):
+        self.limite = limite
+
+    def predict(self, matriz):
+        return (np.asarray(matriz)[:, -1] >= self.limite).astype(int)
+
+
+@pytest.fixture
+def agente_offline(tmp_path):
+    """
+    Fábrica de `EmergencyResponseAgent` sem Ollama. A extração do "LLM" devolve
+    `respostas[texto]` e registra em `agente.enviados_llm` cada texto que chegou a ela;
+    o cache de triagem fica em `tmp_path` (compartilhado entre os agentes criados). Um
+    novo `limite_complexo` com outra `assinatura` simula a troca do classificador.
+    """
+    def criar(respostas, triagem_rapida=None, limite_complexo=3, assinatura="teste", max_entries=1000):
+        agente = EmergencyResponseAgent.__new__(EmergencyResponseAgent)
+        agente.cache = TriageCache(str(tmp_path / "triagem.sqlite"), max_entries=max_entries)
+        agente.preprocessor = PreprocessadorPrioridade()
+        agente.classifier = ClassificadorPrioridade(limite_complexo)
+        agente.assinatura_classificador = assinatura
+        agente.triagem_rapida = triagem_rapida
+        agente.enviados_llm = []
+
+        def extrair(entrada):
+            texto = entrada["natural_language_input"]
+            agente.enviados_llm.append(texto)
+            return EmergencyCallInfo(**respostas[texto])
+
+        agente.extraction_chain = RunnableLambda(extrair)
+        return agente
+
+    return criar
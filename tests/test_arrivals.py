@@ -0,0 +1,70 @@
+# tests/test_arrivals.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.simulation.arrivals import (
+    ArrivalProfile, NonHomogeneousArrivalStream, HORAS_POR_SEMANA, MINUTOS_POR_HORA, MINUTOS_POR_SEMANA
+)
+
+
+def _perfil_dia_noite(inicio_minutos=0):
+    # 2 chamadas/min das 8h às 20h, 0,25 chamada/min no resto do dia.
+    horas_do_dia = np.arange(HORAS_POR_SEMANA) % 24
+    return ArrivalProfile(np.where((horas_do_dia >= 8) & (horas_do_dia < 20), 2.0, 0.25), inicio_minutos)
+
+
+def test_perfil_exige_168_taxas():
+    with pytest.raises(ValueError):
+        ArrivalProfile(np.ones(24))
+
+
+def test_intensidade_acumulada_e_sua_inversa():
+    perfil = _perfil_dia_noite()
+    tempos = np.array([0.0, 30.0, 8 * 60 + 15.0, MINUTOS_POR_SEMANA - 1.0, 2 * MINUTOS_POR_SEMANA + 500.0])
+    assert perfil.cumulative(8 * 60) == pytest.approx(8 * 60 * 0.25)
+    assert perfil.cumulative(MINUTOS_POR_SEMANA) == pytest.approx(perfil.chamadas_por_semana)
+    np.testing.assert_allclose(perfil.inverse_cumulative(perfil.cumulative(tempos)), tempos, rtol=1e-12, atol=1e-9)
+
+
+def test_chegadas_seguem_as_taxas_por_hora():
+    perfil = _perfil_dia_noite()
+    fluxo = NonHomogeneousArrivalStream(perfil, np.random.default_rng(0))
+    semanas = 4
+    num_chegadas = int(perfil.chamadas_por_semana * semanas)
+    instantes = np.cumsum(fluxo.take(num_chegadas))
+    instantes = instantes[instantes < semanas * MINUTOS_POR_SEMANA]
+
+    horas = (instantes // MINUTOS_POR_HORA).astype(int) % HORAS_POR_SEMANA
+    taxas_observadas = np.bincount(horas, minlength=HORAS_POR_SEMANA) / (semanas * MINUTOS_POR_HORA)
+    horas_do_dia = np.arange(HORAS_POR_SEMANA) % 24
+    diurnas = (horas_do_dia >= 8) & (horas_do_dia < 20)
+    assert taxas_observadas[diurnas].mean() == pytest.approx(2.0, rel=0.03)
+    assert taxas_observadas[~diurnas].mean() == pytest.approx(0.25, rel=0.05)
+    # Número total de chegadas de um processo de Poisson: média Λ, desvio √Λ.
+    assert abs(len(instantes) - num_chegadas) < 4 * np.sqrt(num_chegadas)
+
+
+def test_inicio_da_simulacao_desloca_o_perfil():
+    # Começando às 8h, a primeira hora simulada já tem a taxa diurna.
+    fluxo = NonHomogeneousArrivalStream(_perfil_dia_noite(inicio_minutos=8 * 60), np.random.default_rng(1))
+    instantes = np.cumsum(fluxo.take(20000))
+    na_primeira_hora = np.count_nonzero(instantes < MINUTOS_POR_HORA)
+    assert 90 <= na_primeira_hora <= 150
+
+
+def test_next_e_take_produzem_o_mesmo_fluxo():
+    perfil = _perfil_dia_noite()
+    um_a_um = NonHomogeneousArrivalStream(perfil, np.random.default_rng(2), tamanho_bloco=7)
+    em_bloco = NonHomogeneousArrivalStream(perfil, np.random.default_rng(2), tamanho_bloco=7)
+    np.testing.assert_allclose([um_a_um.next() for _ in range(50)], em_bloco.take(50))
+
+
+def test_perfil_a_partir_do_dataset():
+    # Duas semanas completas: 3 chamadas em toda segunda às 10h e 1 nas demais horas.
+    horas = pd.date_range("2024-01-01", periods=2 * HORAS_POR_SEMANA, freq="h")  # 2024-01-01 é segunda-feira
+    repeticoes = np.where((horas.dayofweek == 0) & (horas.hour == 10), 3, 1)
+    df = pd.DataFrame({'Received DtTm': horas.repeat(repeticoes) + pd.Timedelta(minutes=5)})
+    perfil = ArrivalProfile.from_dataframe(df)
+    assert perfil.taxas[10] == pytest.approx(3 / MINUTOS_POR_HORA)
+    assert perfil.taxas[11] == pytest.approx(1 / MINUTOS_POR_HORA)
@@ -0,0 +1,66 @@
+# tests/test_auto_stop.py
+import functools
+import itertools
+
+import numpy as np
+import pytest
+
+from src.simulation import environment
+from src.simulation.environment import run_simulation
+from src.simulation.metrics import BatchMeansMonitor
+
+
+def _distribuicoes(media_servico):
+    return {
+        "chegadas": ("expon", (0, 1.0)),
+        "atendimento_humano": ("expon", (0, 0.1)),
+        "atendimento_simples": ("expon", (0, 0.1)),
+        "servico_bombeiros": ("expon", (0, media_servico)),
+    }
+
+
+@pytest.fixture
+def lotes_pequenos(monkeypatch):
+    """Lotes de 50 observações, para os testes não precisarem de dezenas de milhares de chamadas."""
+    monkeypatch.setattr(environment, "BatchMeansMonitor", functools.partial(BatchMeansMonitor, tamanho_lote=50, min_lotes=5))
+
+
+def _simular(media_servico, meia_largura_alvo, **opcoes):
+    # Fonte de chamadas ilimitada: só o critério de parada encerra a execução.
+    return run_simulation(3, itertools.repeat((1, 'Complexo')), _distribuicoes(media_servico),
+                          rng=np.random.default_rng(0), motor="simpy", armazenar_amostras=False,
+                          meia_largura_alvo=meia_largura_alvo, **opcoes)
+
+
+def test_fila_estavel_converge(lotes_pequenos):
+    stats = _simular(1.5, 0.1)
+    assert stats['resumo']['convergiu']
+    assert stats['medias_em_lotes']['motivo'] == 'meia_largura'
+    assert stats['medias_em_lotes']['meia_largura'] <= 0.1
+
+
+def test_fila_sobrecarregada_para_sem_convergir(lotes_pequenos):
+    # 3 unidades, 1 chamada/min e serviço médio de 4 min: utilização de 1,33.
+    stats = _simular(4.0, 1.0)
+    assert not stats['resumo']['convergiu']
+    assert stats['medias_em_lotes']['motivo'] == 'sobrecarga'
+    assert stats['medias_em_lotes']['observacoes'] == 250
+
+
+def test_orcamento_de_chamadas(lotes_pequenos):
+    stats = _simular(1.5, 1e-9, max_chamadas_automatico=2000)
+    assert not stats['resumo']['convergiu']
+    assert stats['medias_em_lotes']['motivo'] == 'orcamento'
+    assert stats['resumo']['tempos_espera_bombeiros']['n'] == 2000
+
+
+def test_medias_em_alta_encerram_o_monitor():
+    # Espera crescendo sem limite, como numa fila instável que a utilização não acusou.
+    monitor = BatchMeansMonitor(0.1, tamanho_lote=10, min_lotes=5, max_observacoes=None)
+    for i in itertools.count():
+        monitor.add(0.01 * i)
+        if monitor.concluido:
+            break
+    assert not monitor.convergiu
+    assert monitor.motivo == 'tendencia'
+    assert len(monitor.medias_lotes) == 20
@@ -0,0 +1,83 @@
+# tests/test_capacity.py
+import functools
+import itertools
+import math
+
+import pytest
+
+from src.simulation import capacity
+from src.simulation.capacity import analytic_wait_quantile, erlang_c, optimize_capacity
+
+
+def _distribuicoes(media_chegadas, media_servico):
+    return {
+        "chegadas": ("expon", (0, media_chegadas)),
+        "atendimento_humano": ("expon", (0, 0.1)),
+        "atendimento_simples": ("expon", (0, 0.1)),
+        "servico_bombeiros": ("expon", (0, media_servico)),
+    }
+
+
+def test_erlang_c_valor_conhecido():
+    # M/M/2 com carga de 1 erlang: P(espera) = 1/3.
+    assert erlang_c(2, 1.0) == pytest.approx(1 / 3)
+    assert erlang_c(2, 2.0) == 1.0
+
+
+def test_quantil_analitico_mmc():
+    # Em uma M/M/c, P(W > t) = C·exp(-(cμ - λ)t); com c = 2, λ = μ = 1, o P90 é ln(10/3).
+    assert analytic_wait_quantile(2, _distribuicoes(1.0, 1.0), 0.9) == pytest.approx(math.log(10 / 3))
+    # P(espera) abaixo de 10%: o P90 da espera é zero.
+    assert analytic_wait_quantile(5, _distribuicoes(1.0, 1.0), 0.9) == 0.0
+    # Sistema instável.
+    assert analytic_wait_quantile(2, _distribuicoes(1.0, 2.0), 0.9) == math.inf
+
+
+@pytest.fixture
+def viabilidade(monkeypatch):
+    """Troca a simulação de cada candidato por uma regra fixa: viável a partir de `minimo` unidades."""
+    avaliados = []
+    regra = {'minimo': 7}
+
+    def avaliar(num_unidades, *args):
+        avaliados.append(num_unidades)
+        return {'Unidades': num_unidades, 'Replicações': 1,
+                'Decisão': 'viável' if num_unidades >= regra['minimo'] else 'inviável'}
+
+    monkeypatch.setattr(capacity, "_avaliar_candidato", avaliar)
+    return avaliados, regra
+
+
+@pytest.mark.parametrize("estimativa", [1, 3, 7, 12, 40])
+def test_busca_encontra_a_menor_capacidade_viavel(monkeypatch, viabilidade, estimativa):
+    avaliados, _ = viabilidade
+    monkeypatch.setattr(capacity, "estimate_capacity", lambda *args: estimativa)
+    resultado = optimize_capacity([], _distribuicoes(1.0, 1.0), max_unidades=64)
+    assert resultado['unidades'] == 7
+    # Delimitação em passos dobrados + busca binária: bem menos candidatos que a grade.
+    assert len(avaliados) == len(set(avaliados)) <= 2 * math.ceil(math.log2(64)) + 1
+
+
+def test_busca_respeita_o_minimo_de_unidades(monkeypatch, viabilidade):
+    avaliados, regra = viabilidade
+    regra['minimo'] = 1
+    monkeypatch.setattr(capacity, "estimate_capacity", lambda *args: 5)
+    resultado = optimize_capacity([], _distribuicoes(1.0, 1.0), min_unidades=3)
+    assert resultado['unidades'] == 3
+    assert min(avaliados) == 3
+
+
+def test_busca_sem_capacidade_viavel(monkeypatch, viabilidade):
+    monkeypatch.setattr(capacity, "estimate_capacity", lambda *args: 2)
+    assert optimize_capacity([], _distribuicoes(1.0, 1.0), max_unidades=6)['unidades'] is None
+
+
+def test_candidatos_ignoram_o_modo_automatico(monkeypatch):
+    # Com MEIA_LARGURA_ALVO ligado e uma fonte de chamadas ilimitada, cada candidato
+    # ainda simula só `num_chamadas` chamadas, e os inviáveis terminam.
+    monkeypatch.setattr(capacity, "run_simulation", functools.partial(capacity.run_simulation, meia_largura_alvo=0.01))
+    resultado = optimize_capacity(itertools.repeat((1, 'Complexo')), _distribuicoes(1.0, 4.0), sla_minutos=1.0,
+                                  replicacoes=3, motor="simpy", max_unidades=16, num_chamadas=2000)
+    avaliacoes = resultado['avaliacoes'].set_index('Unidades')['Decisão']
+    assert resultado['unidades'] is not None
+    assert avaliacoes[resultado['unidades'] - 1].startswith('inviável')
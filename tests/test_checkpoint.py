@@ -0,0 +1,68 @@
+# tests/test_checkpoint.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.utils.checkpoint import PipelineCheckpoint, file_signature, input_hash
+
+
+def test_chave_estavel_e_sensivel_as_entradas():
+    df = pd.DataFrame({'a': [1, 2, 3], 'b': [0.5, 1.5, 2.5]})
+    chave = input_hash(df, np.arange(3), "texto", 1, 2.0, None, [1, (2, 3)], {'x': 1, 'y': 2})
+    assert chave == input_hash(df.copy(), np.arange(3), "texto", 1, 2.0, None, [1, (2, 3)], {'y': 2, 'x': 1})
+
+    df_alterado = df.copy()
+    df_alterado.loc[2, 'b'] = 9.0
+    assert input_hash(df_alterado) != input_hash(df)
+    assert input_hash(df.rename(columns={'b': 'c'})) != input_hash(df)
+    assert input_hash(np.arange(3, dtype=np.int32)) != input_hash(np.arange(3, dtype=np.int64))
+    assert input_hash(1, None) != input_hash(None, 1)
+    assert input_hash([1, 2], 3) != input_hash([1], 2, 3)
+
+
+def test_chave_recusa_tipos_sem_hash_estavel():
+    with pytest.raises(TypeError):
+        input_hash(object())
+
+
+def test_assinatura_muda_com_o_arquivo(tmp_path):
+    arquivo = tmp_path / "dados.csv"
+    arquivo.write_text("a,b\n1,2\n")
+    assinatura = file_signature(arquivo)
+    assert file_signature(arquivo) == assinatura
+    arquivo.write_text("a,b\n1,2\n3,4\n")
+    assert file_signature(arquivo) != assinatura
+
+
+def test_etapa_retomada_com_a_mesma_chave(tmp_path):
+    checkpoint = PipelineCheckpoint(str(tmp_path), ativo=True)
+    execucoes = []
+
+    def calcular():
+        execucoes.append(1)
+        return {'resultado': len(execucoes)}
+
+    assert checkpoint.run('etapa', 'chave1', calcular) == {'resultado': 1}
+    assert checkpoint.run('etapa', 'chave1', calcular) == {'resultado': 1}
+    assert len(execucoes) == 1
+    # Entradas diferentes invalidam o artefato.
+    assert checkpoint.run('etapa', 'chave2', calcular) == {'resultado': 2}
+    assert len(execucoes) == 2
+
+
+def test_checkpoint_desligado_sempre_recalcula(tmp_path):
+    checkpoint = PipelineCheckpoint(str(tmp_path), ativo=False)
+    execucoes = []
+    for _ in range(2):
+        checkpoint.run('etapa', 'chave', lambda: execucoes.append(1))
+    assert len(execucoes) == 2
+    assert not list(tmp_path.iterdir())
+
+
+def test_artefato_corrompido_e_recalculado(tmp_path):
+    checkpoint = PipelineCheckpoint(str(tmp_path), ativo=True)
+    checkpoint.run('etapa', 'chave', lambda: 1)
+    with open(checkpoint._path('etapa', 'chave'), 'wb') as f:
+        f.write(b"corrompido")
+    assert checkpoint.run('etapa', 'chave', lambda: 2) == 2
+    assert checkpoint.run('etapa', 'chave', lambda: 3) == 2
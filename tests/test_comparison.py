@@ -0,0 +1,97 @@
+# tests/test_comparison.py
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats as st
+
+from src.simulation.comparison import (
+    _sem_chatbot, compare_replication, draw_common_numbers, evaluate_policy, run_comparison,
+    summarize_paired_differences,
+)
+from src.simulation.metrics import t_quantile
+
+
+@pytest.fixture(scope="module")
+def triagens():
+    gerador = np.random.default_rng(1)
+    return [
+        (int(p), 'Simples' if s else 'Complexo')
+        for p, s in zip(gerador.integers(0, 2, 800), gerador.random(800) < 0.5)
+    ]
+
+
+@pytest.fixture(scope="module")
+def distributions():
+    return {
+        "chegadas": (st.expon, (0, 1.0)),
+        "atendimento_humano": (st.lognorm, (0.5, 0, 3.0)),
+        "atendimento_simples": (st.expon, (0, 0.5)),
+        "servico_bombeiros": (st.expon, (0, 2.5)),
+    }
+
+
+def test_numeros_comuns_independem_da_politica(triagens, distributions):
+    numeros = draw_common_numbers(triagens, distributions, np.random.default_rng(7), horizonte=None)
+    repetidos = draw_common_numbers(triagens, distributions, np.random.default_rng(7), horizonte=None)
+    for chave, valores in numeros.items():
+        np.testing.assert_array_equal(valores, repetidos[chave])
+    assert len(numeros['chegadas']) == len(triagens)
+    # O chatbot só troca o tempo de atendimento das chamadas simples.
+    baseline = evaluate_policy(numeros, 3, _sem_chatbot(numeros['prioridades'], numeros['simples']), None, 0.0)
+    chatbot = evaluate_policy(numeros, 3, numeros['simples'], None, 0.0)
+    assert baseline['Chatbot'] == 0 and chatbot['Chatbot'] == int(numeros['simples'].sum())
+    assert chatbot['Tempo médio de espera (min)'] != baseline['Tempo médio de espera (min)']
+
+
+def test_politica_igual_a_referencia_tem_diferenca_nula(triagens, distributions):
+    politicas = {'baseline': _sem_chatbot, 'copia': _sem_chatbot}
+    linhas = []
+    for replicacao in range(3):
+        for linha in compare_replication(triagens, distributions, [2, 3], semente=replicacao, politicas=politicas,
+                                         horizonte=None, aquecimento=0.0):
+            linha['Replicação'] = replicacao
+            linhas.append(linha)
+    resumo = summarize_paired_differences(pd.DataFrame(linhas))
+    assert list(resumo['Unidades']) == [2, 3]
+    assert (resumo['Diferença Tempo médio de espera (min)'] == 0).all()
+    assert (resumo['Diferença Tempo médio de espera (min) ± IC95%'] == 0).all()
+    assert not resumo['Significativa Tempo médio de espera (min)'].any()
+
+
+def test_diferencas_pareadas_calculadas_a_mao():
+    baseline = np.array([10.0, 12.0, 14.0, 16.0])
+    chatbot = np.array([9.0, 11.0, 13.0, 15.5])
+    linhas = [
+        {'Unidades': 2, 'Política': politica, 'Replicação': r, 'Tempo médio de espera (min)': valor,
+         'P90 do tempo de espera (min)': 2 * valor, 'Tempo médio no sistema (min)': valor + 5}
+        for politica, valores in (('baseline', baseline), ('chatbot', chatbot))
+        for r, valor in enumerate(valores)
+    ]
+    resumo = summarize_paired_differences(pd.DataFrame(linhas)).iloc[0]
+    diferencas = chatbot - baseline
+    t = t_quantile(0.95, 3)
+    metrica = 'Tempo médio de espera (min)'
+    assert resumo['Replicações'] == 4
+    assert resumo[f'Diferença {metrica}'] == pytest.approx(diferencas.mean())
+    assert resumo[f'Diferença {metrica} ± IC95%'] == pytest.approx(t * diferencas.std(ddof=1) / 2)
+    independente = t * np.sqrt((baseline.var(ddof=1) + chatbot.var(ddof=1)) / 4)
+    assert resumo[f'Diferença {metrica} ± IC95% (independente)'] == pytest.approx(independente)
+    # Replicações fortemente correlacionadas: o pareamento reduz muito a variância.
+    reducao = (baseline.var(ddof=1) + chatbot.var(ddof=1)) / diferencas.var(ddof=1)
+    assert resumo[f'Redução de variância {metrica}'] == pytest.approx(reducao)
+    assert reducao > 1
+    assert resumo[f'Significativa {metrica}']
+
+
+def test_comparacao_paralela_reproduz_as_replicacoes(triagens, distributions):
+    df, resumo = run_comparison(triagens, distributions, [2, 3], num_replicacoes=3, seed=11, horizonte=None,
+                                aquecimento=0.0, max_workers=2)
+    assert len(df) == 3 * 2 * 2
+    semente = np.random.SeedSequence(11).spawn(3)[1]
+    esperadas = compare_replication(triagens, distributions, [2, 3], semente=semente, horizonte=None,
+                                    aquecimento=0.0)
+    obtidas = df[df['Replicação'] == 1].drop(columns='Replicação').to_dict('records')
+    assert obtidas == [{chave: linha[chave] for chave in obtidas[0]} for linha in esperadas]
+    # Com números aleatórios comuns, a diferença pareada é mais precisa que a independente.
+    metrica = 'Tempo médio de espera (min)'
+    assert (resumo[f'Redução de variância {metrica}'] > 1).all()
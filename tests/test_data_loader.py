@@ -0,0 +1,89 @@
+# tests/test_data_loader.py
+import os
+
+import pandas as pd
+import pytest
+
+from src.utils import data_loader
+from src.utils.data_loader import load_dataset
+
+pytest.importorskip("pyarrow")
+
+LINHAS = [
+    # Fora de ordem de recebimento, com uma data e uma prioridade vazias.
+    ("02", "Structure Fire", "Fire", "01/01/2025 12:05:00 AM", "01/01/2025 12:06:00 AM", "3"),
+    ("01", "Medical Incident", "Potentially Life-Threatening", "01/01/2025 12:01:00 AM", "", "2"),
+    ("03", "Traffic Collision", "Non Life-threatening", "01/01/2025 01:30:00 PM", "01/01/2025 01:31:00 PM", ""),
+]
+
+
+def _escrever_csv(caminho, linhas):
+    cabecalho = ("Call Number,Incident Number,Call Type,Call Type Group,Received DtTm,Entry DtTm,"
+                 "Response DtTm,On Scene DtTm,Available DtTm,Final Priority,Address")
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(cabecalho + "\n")
+        for numero, tipo, grupo, recebida, entrada, prioridade in linhas:
+            f.write(f"1,{numero},{tipo},{grupo},{recebida},{entrada},{recebida},{recebida},{recebida},"
+                    f"{prioridade},Rua X\n")
+
+
+def _normalizar(df):
+    """Mesma resolução de datas e mesmo tipo numérico, qualquer que seja o leitor."""
+    df = df.copy()
+    for coluna in data_loader.TIMESTAMP_COLS:
+        df[coluna] = df[coluna].astype('datetime64[ns]')
+    for coluna in data_loader.NUMERIC_COLS:
+        df[coluna] = df[coluna].astype('float64')
+    return df
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader.config, "CACHE_DIR", str(tmp_path / "cache"))
+    caminho = tmp_path / "chamadas.csv"
+    _escrever_csv(caminho, LINHAS)
+    return str(caminho)
+
+
+def test_colunas_tipadas_e_ordenadas(dataset):
+    df = load_dataset(dataset, use_snapshot=False)
+    assert set(df.columns) == set(data_loader.USECOLS)
+    assert df['Received DtTm'].is_monotonic_increasing
+    assert list(df['Incident Number']) == [1, 2, 3]
+    for coluna in data_loader.TIMESTAMP_COLS:
+        assert pd.api.types.is_datetime64_any_dtype(df[coluna])
+    assert isinstance(df['Call Type'].dtype, pd.CategoricalDtype)
+    assert df['Received DtTm'].iloc[2] == pd.Timestamp("2025-01-01 13:30:00")
+    assert pd.isna(df['Entry DtTm'].iloc[0])
+    assert pd.isna(df['Final Priority'].iloc[2])
+
+
+def test_leitura_sem_pyarrow_e_equivalente(dataset, monkeypatch):
+    com_pyarrow = load_dataset(dataset, use_snapshot=False)
+    monkeypatch.setattr(data_loader, "PYARROW_DISPONIVEL", False)
+    sem_pyarrow = load_dataset(dataset, use_snapshot=False)
+    pd.testing.assert_frame_equal(_normalizar(com_pyarrow), _normalizar(sem_pyarrow), check_dtype=False,
+                                  check_categorical=False, check_like=True)
+
+
+def test_snapshot_reaproveitado_enquanto_o_csv_nao_muda(dataset, monkeypatch):
+    original = load_dataset(dataset)
+    snapshot = data_loader._snapshot_path(dataset)
+    assert os.path.exists(snapshot)
+
+    def falhar(_):
+        raise AssertionError("o CSV não deveria ser lido de novo")
+
+    monkeypatch.setattr(data_loader, "_read_csv", falhar)
+    pd.testing.assert_frame_equal(_normalizar(load_dataset(dataset)), _normalizar(original), check_categorical=False)
+
+
+def test_snapshot_invalidado_quando_o_csv_muda(dataset):
+    load_dataset(dataset)
+    antigo = data_loader._snapshot_path(dataset)
+    _escrever_csv(dataset, LINHAS + [("04", "Alarms", "Alarm", "01/02/2025 08:00:00 AM", "01/02/2025 08:01:00 AM", "2")])
+    df = load_dataset(dataset)
+    assert len(df) == 4
+    novo = data_loader._snapshot_path(dataset)
+    assert novo != antigo
+    assert os.path.exists(novo) and not os.path.exists(antigo)
@@ -0,0 +1,60 @@
+# tests/test_dispatch.py
+import simpy
+
+from src.simulation.dispatch import minimum_units, split_fleet
+from src.simulation.environment import CentralDeEmergencia, _servico_despachado
+from src.simulation.metrics import new_stats
+from src.simulation.tracing import EventTracer, NIVEL_DESLIGADO
+
+
+def _simular(chamadas, num_unidades=1):
+    """
+    Roda só a etapa das unidades, com preempção, para chamadas (chegada, prioridade,
+    serviço). Cada chegada é agendada em dois passos, o último na metade do caminho:
+    assim uma chegada no mesmo instante do fim de um serviço é processada depois da
+    liberação da unidade, mas antes de o próximo da fila retomar.
+    """
+    env = simpy.Environment()
+    central = CentralDeEmergencia(env, num_unidades, preempcao=True)
+    stats = new_stats(len(chamadas))
+    stats['preempcoes'] = 0
+    rastreador = EventTracer(NIVEL_DESLIGADO)
+    fins = {}
+
+    def chamada(id_chamada, chegada, prioridade, servico):
+        yield env.timeout(chegada / 2)
+        yield env.timeout(chegada / 2)
+        yield from _servico_despachado(env, id_chamada, central, prioridade, None, servico, stats, rastreador, None)
+        fins[id_chamada] = env.now
+
+    for id_chamada, (chegada, prioridade, servico) in enumerate(chamadas):
+        env.process(chamada(id_chamada, chegada, prioridade, servico))
+    env.run()
+    return fins, stats
+
+
+def test_preempcao_interrompe_servico_menos_urgente():
+    # A (prioridade 2) está em serviço quando C (prioridade 0) chega e toma a unidade;
+    # A volta à fila e cumpre só o que faltava depois de C.
+    fins, stats = _simular([(0.0, 2, 4.0), (1.0, 0, 1.0)])
+    assert stats['preempcoes'] == 1
+    assert fins == {1: 2.0, 0: 5.0}
+
+
+def test_preempcao_logo_apos_a_alocacao():
+    # A libera a unidade em t=1 e ela vai para B, mas C (prioridade 0) chega no mesmo
+    # instante e a toma antes de o processo de B retomar.
+    fins, stats = _simular([(0.0, 2, 1.0), (0.5, 1, 2.0), (1.0, 0, 1.0)])
+    assert stats['preempcoes'] == 1
+    assert fins == {0: 1.0, 2: 2.0, 1: 4.0}
+    assert len(stats['tempos_espera_bombeiros']) == 3
+
+
+def test_divisao_da_frota():
+    assert split_fleet(10, {"engine": 0.4, "medic": 0.5, "truck": 0.1}) == {"engine": 4, "medic": 5, "truck": 1}
+    assert split_fleet(3, {"engine": 0.1, "medic": 0.8, "truck": 0.1}) == {"engine": 1, "medic": 1, "truck": 1}
+
+
+def test_minimo_de_unidades():
+    assert minimum_units({}) == 1
+    assert minimum_units({"engine": 0.4, "medic": 0.5, "truck": 0.1}) == 3
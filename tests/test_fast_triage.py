@@ -0,0 +1,86 @@
+# tests/test_fast_triage.py
+import pytest
+
+from src.agent.fast_triage import FastTriage
+
+PERFIS = {
+    "Structure Fire": {"call_type": "Structure Fire", "call_type_group": "Fire", "original_priority": 3},
+    "Medical Incident": {"call_type": "Medical Incident", "call_type_group": "Potentially Life-Threatening",
+                         "original_priority": 3},
+    "Traffic Collision": {"call_type": "Traffic Collision", "call_type_group": "Non Life-threatening",
+                          "original_priority": 2},
+}
+
+FRASES = {
+    "Structure Fire": [
+        "incêndio no prédio com muita fumaça",
+        "fogo na cozinha do apartamento",
+        "fumaça saindo do telhado da casa",
+        "incêndio na garagem com chamas altas",
+        "chamas e fumaça preta no galpão",
+    ],
+    "Medical Incident": [
+        "homem desmaiou e não responde",
+        "mulher com dor forte no peito",
+        "idoso com dificuldade para respirar",
+        "criança desmaiou na escola",
+        "paciente com dor e falta de ar",
+    ],
+    "Traffic Collision": [
+        "batida entre dois carros na avenida",
+        "acidente de moto no cruzamento",
+        "carro capotou na rodovia",
+        "colisão entre ônibus e carro",
+        "acidente com carro e moto na ponte",
+    ],
+}
+
+
+def _treino():
+    textos = [frase for frases in FRASES.values() for frase in frases]
+    infos = [PERFIS[tipo] for tipo, frases in FRASES.items() for _ in frases]
+    return textos, infos
+
+
+@pytest.fixture
+def triagem():
+    textos, infos = _treino()
+    return FastTriage(limiar=0.6).fit(textos, infos, PERFIS)
+
+
+def test_texto_fora_da_tabela_passa_pelo_modelo(triagem):
+    assert triagem.rotulos == {}
+    claro, ambiguo = "fumaça e fogo no prédio", "barulho estranho lá fora"
+    claro_info, ambiguo_info = triagem.predict([claro, ambiguo])
+    assert claro_info == PERFIS["Structure Fire"]
+    # Sem nenhuma palavra conhecida, as probabilidades ficam perto de 1/3: abaixo do limiar.
+    assert ambiguo_info is None
+    assert triagem.stats()['rapidas'] == 1
+    assert triagem.stats()['enviadas_llm'] == 1
+
+
+def test_abaixo_do_limiar_vai_ao_llm(agente_offline, triagem):
+    claro, ambiguo = "fumaça e fogo no prédio", "barulho estranho lá fora"
+    agente = agente_offline({ambiguo: PERFIS["Traffic Collision"]}, triagem_rapida=triagem)
+    resultados = agente.classify_calls([claro, ambiguo])
+    assert agente.enviados_llm == [ambiguo]
+    assert resultados[0]['info_extraida']['call_type'] == "Structure Fire"
+    assert resultados[1]['info_extraida']['call_type'] == "Traffic Collision"
+    # Só a resposta do LLM vai para o cache; a triagem local não.
+    assert agente.cache.peek_many([claro, ambiguo]) == {ambiguo: PERFIS["Traffic Collision"]}
+
+
+def test_concordancia_vem_das_previsoes_do_modelo():
+    textos, infos = _treino()
+    # O LLM rotulou como acidente uma frase que o texto aponta como incêndio: a tabela
+    # concordaria por construção, a previsão fora da dobra não.
+    rotulos = dict(zip(textos, infos))
+    rotulos[textos[0]] = PERFIS["Traffic Collision"]
+    infos[0] = PERFIS["Traffic Collision"]
+    triagem = FastTriage(limiar=0.6).fit(textos, infos, PERFIS, rotulos=rotulos)
+    triagem.compare(rotulos)
+    stats = triagem.stats()
+    assert stats['comparadas'] == len(textos)
+    assert stats['concordancia_validacao'] < 1.0
+    assert stats['concordancia_call_type'] == pytest.approx(stats['concordancia_validacao'])
+    assert stats['concordancia_call_type'] < 1.0
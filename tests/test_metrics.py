@@ -0,0 +1,88 @@
+# tests/test_metrics.py
+import math
+
+import numpy as np
+import pytest
+
+import config
+from src.simulation.metrics import (
+    BatchMeansMonitor, MetricSeries, P2Quantile, quantile_columns, summarize_values, t_quantile,
+)
+
+
+@pytest.fixture(scope="module")
+def amostras():
+    # Assimétrica e de cauda longa, como os tempos de espera.
+    return np.random.default_rng(0).lognormal(1.0, 0.8, 50000)
+
+
+@pytest.mark.parametrize("p", [0.5, 0.9, 0.99])
+def test_p2_proximo_do_quantil_exato(amostras, p):
+    estimador = P2Quantile(p)
+    for valor in amostras:
+        estimador.add(valor)
+    assert estimador.value() == pytest.approx(np.quantile(amostras, p), rel=0.02)
+
+
+def test_p2_com_poucas_observacoes_e_exato():
+    estimador = P2Quantile(0.9)
+    assert math.isnan(estimador.value())
+    for valor in (4.0, 1.0, 3.0):
+        estimador.add(valor)
+    assert estimador.value() == np.quantile([4.0, 1.0, 3.0], 0.9)
+
+
+def test_serie_sem_amostras_resume_em_fluxo(amostras):
+    serie = MetricSeries(armazenar=False, quantis=(0.5, 0.9))
+    for valor in amostras:
+        serie.append(valor)
+    assert len(serie) == len(amostras)
+    assert len(serie.values()) == 0
+    resumo, exato = serie.summary(), summarize_values(amostras, (0.5, 0.9))
+    assert resumo['n'] == exato['n']
+    assert resumo['media'] == pytest.approx(exato['media'], rel=1e-12)
+    assert resumo['desvio'] == pytest.approx(exato['desvio'], rel=1e-9)
+    assert resumo['p50'] == pytest.approx(exato['p50'], rel=0.02)
+    assert resumo['p90'] == pytest.approx(exato['p90'], rel=0.02)
+
+
+def test_serie_com_amostras_e_exata(amostras):
+    serie = MetricSeries(capacidade=10, quantis=(0.9,))
+    serie.extend(amostras[:100])
+    for valor in amostras[100:1000]:
+        serie.append(valor)
+    np.testing.assert_array_equal(serie.values(), amostras[:1000])
+    assert serie.summary() == summarize_values(amostras[:1000], (0.9,))
+
+
+def test_medias_em_lotes(amostras):
+    monitor = BatchMeansMonitor(meia_largura_alvo=0.0, tamanho_lote=500, min_lotes=10, max_observacoes=None)
+    for valor in amostras[:10250]:
+        monitor.add(valor)
+    medias = amostras[:10000].reshape(20, 500).mean(axis=1)
+    np.testing.assert_allclose(monitor.medias_lotes, medias)
+    esperada = t_quantile(0.95, 19) * medias.std(ddof=1) / math.sqrt(20)
+    assert monitor.meia_largura == pytest.approx(esperada)
+    assert not monitor.concluido
+
+
+def test_medias_em_lotes_para_no_alvo(amostras):
+    monitor = BatchMeansMonitor(meia_largura_alvo=0.1, tamanho_lote=500, min_lotes=10, max_observacoes=None)
+    for valor in amostras:
+        monitor.add(valor)
+        if monitor.concluido:
+            break
+    assert monitor.convergiu
+    assert monitor.meia_largura <= 0.1
+    assert len(monitor.medias_lotes) >= 10
+    # O IC contém a média exata das observações usadas.
+    usadas = amostras[:monitor.observacoes]
+    assert abs(usadas.mean() - monitor.summary()['media']) <= monitor.meia_largura
+
+
+def test_colunas_seguem_os_quantis_configurados(monkeypatch):
+    resumo = summarize_values(np.arange(101.0), (0.5, 0.95))
+    monkeypatch.setattr(config, "QUANTIS_METRICAS", (0.5, 0.95))
+    assert quantile_columns(resumo, 'da espera') == {'P50 da espera': 50.0, 'P95 da espera': 95.0}
+    # Sem o P90 no resumo, a coluna é omitida em vez de gerar KeyError.
+    assert quantile_columns(resumo, 'da espera', quantis=(0.9, 0.5)) == {'P50 da espera': 50.0}
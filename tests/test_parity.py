@@ -0,0 +1,63 @@
+# tests/test_parity.py
+import numpy as np
+import pytest
+import scipy.stats as st
+
+from src.simulation.fast_engine import _maior_diferenca, _tempos_por_chamada, check_parity
+from src.simulation.tracing import (
+    EVENTO_CHEGADA, EVENTO_ENTRADA_FILA, EVENTO_FIM, EVENTO_INICIO_SERVICO, NIVEL_EVENTOS, EventTracer,
+)
+
+
+@pytest.fixture(scope="module")
+def triagens():
+    gerador = np.random.default_rng(0)
+    return [
+        (int(p), 'Simples' if s else 'Complexo')
+        for p, s in zip(gerador.integers(0, 2, 5000), gerador.random(5000) < 0.6)
+    ]
+
+
+@pytest.fixture(scope="module")
+def distributions():
+    return {
+        "chegadas": (st.expon, (0, 1.0)),
+        "atendimento_humano": (st.lognorm, (0.8, 0, 2.0)),
+        "atendimento_simples": (st.gamma, (2.0, 0, 1.0)),
+        "servico_bombeiros": (st.weibull_min, (1.2, 0, 4.0)),
+    }
+
+
+@pytest.mark.parametrize("unidades", [1, 3, 5, 8])
+def test_motores_coincidem(unidades, triagens, distributions):
+    resultado = check_parity(unidades, triagens, distributions, seed=unidades)
+    assert resultado['paridade'], resultado
+    assert all(diferenca <= 1e-9 for diferenca in resultado['por_chamada'].values())
+
+
+@pytest.mark.parametrize("unidades", [1, 3, 5, 8])
+def test_motores_coincidem_com_horizonte_e_aquecimento(unidades, triagens, distributions):
+    resultado = check_parity(unidades, triagens, distributions, seed=unidades, horizonte=3000.0, aquecimento=500.0)
+    assert resultado['paridade'], resultado
+    assert all(diferenca <= 1e-9 for diferenca in resultado['por_chamada'].values())
+
+
+def _log(esperas):
+    # Chamadas que chegam e entram na fila em t=0, com serviços de 1 min.
+    rastreador = EventTracer(NIVEL_EVENTOS)
+    for id_chamada, espera in enumerate(esperas, start=1):
+        rastreador.registrar(id_chamada, EVENTO_CHEGADA, 0.0)
+        rastreador.registrar(id_chamada, EVENTO_ENTRADA_FILA, 0.0)
+        rastreador.registrar(id_chamada, EVENTO_INICIO_SERVICO, espera)
+        rastreador.registrar(id_chamada, EVENTO_FIM, espera + 1.0)
+    return _tempos_por_chamada(rastreador)
+
+
+def test_tempos_por_chamada_seguem_o_id():
+    # As mesmas esperas em outra ordem: iguais ordenadas, diferentes chamada a chamada.
+    a, b = _log([0.0, 2.0, 5.0]), _log([2.0, 0.0, 5.0])
+    np.testing.assert_array_equal(np.sort(a['tempos_espera_bombeiros']), np.sort(b['tempos_espera_bombeiros']))
+    np.testing.assert_array_equal(a['tempos_espera_bombeiros'], [0.0, 2.0, 5.0])
+    np.testing.assert_array_equal(b['tempos_espera_bombeiros'], [2.0, 0.0, 5.0])
+    assert _maior_diferenca(a['tempos_espera_bombeiros'], b['tempos_espera_bombeiros']) == 2.0
+    np.testing.assert_array_equal(a['tempos_servico_bombeiros'], [1.0, 1.0, 1.0])
@@ -0,0 +1,90 @@
+# tests/test_replay.py
+import numpy as np
+import pandas as pd
+import pytest
+
+import config
+from src.simulation.replay import TraceReplay, compare_replay, replay_trace
+
+
+def _trace():
+    # Uma unidade, serviços de 5 min; a chamada 1 é simples e a 2 é a mais urgente.
+    return TraceReplay(
+        chegadas=[0.0, 1.0, 2.0],
+        prioridades=[1, 1, 0],
+        atendimento=[0.0, 4.0, 0.0],
+        servicos=[5.0, 5.0, 5.0],
+        simples=[False, True, False],
+    )
+
+
+def test_fila_com_prioridade_reproduz_o_historico():
+    stats = replay_trace(_trace(), 1, "baseline", aquecimento=0.0, armazenar_amostras=True)
+    # Em t=5 a unidade fica livre com as chamadas 1 (entrou em 5) e 2 (em 2) na fila:
+    # a 2, mais urgente, vai primeiro.
+    np.testing.assert_allclose(stats['tempos_espera_bombeiros'], [0.0, 3.0, 5.0])
+    np.testing.assert_allclose(stats['tempos_atendimento_total'], [5.0, 8.0, 14.0])
+    assert stats['tempo_simulado'] == 15.0
+    assert stats['total_chamadas'] == 3 and stats['chamadas_simples'] == 0
+
+
+def test_chatbot_encurta_o_atendimento_das_simples():
+    stats = replay_trace(_trace(), 1, "chatbot", fator_chatbot=0.5, aquecimento=0.0, armazenar_amostras=True)
+    # A chamada 1 entra na fila em t=3 (atendimento de 2 min) e espera até t=10.
+    np.testing.assert_allclose(stats['tempos_espera_bombeiros'], [0.0, 3.0, 7.0])
+    assert stats['chamadas_simples'] == 1 and stats['chamadas_complexas'] == 2
+
+
+def test_blocos_dao_o_mesmo_resultado():
+    inteiro = replay_trace(_trace(), 1, "chatbot", aquecimento=0.0, armazenar_amostras=True)
+    em_blocos = replay_trace(list(_trace().chunks(tamanho_bloco=1)), 1, "chatbot", aquecimento=0.0,
+                             armazenar_amostras=True)
+    for chave in ('tempos_espera_bombeiros', 'tempos_servico_bombeiros', 'tempos_atendimento_total'):
+        np.testing.assert_allclose(em_blocos[chave], inteiro[chave])
+
+
+def test_aquecimento_descarta_as_primeiras_chegadas():
+    stats = replay_trace(_trace(), 1, "baseline", aquecimento=1.5, armazenar_amostras=True)
+    assert stats['total_chamadas'] == 1
+    np.testing.assert_allclose(stats['tempos_espera_bombeiros'], [3.0])
+
+
+def test_blocos_fora_de_ordem_sao_recusados():
+    blocos = list(_trace().chunks(tamanho_bloco=2))
+    with pytest.raises(ValueError):
+        replay_trace(blocos[::-1], 1, "baseline")
+
+
+def test_trace_a_partir_do_dataset():
+    inicio = pd.Timestamp("2025-01-01 08:00")
+    minutos = lambda valores: inicio + pd.to_timedelta(valores, unit="min")
+    df = pd.DataFrame({
+        'Received DtTm': minutos([10.0, 0.0, 5.0]),
+        'Entry DtTm': minutos([12.0, 1.0, np.nan]),
+        'On Scene DtTm': minutos([20.0, 8.0, 9.0]),
+        'Available DtTm': minutos([50.0, 30.0, 40.0]),
+        'Final Priority': [3, 2, 2],
+        'Call Type Group': pd.Categorical(['Fire', 'Non Life-threatening', 'Alarm']),
+    })
+    trace = TraceReplay.from_dataframe(df)
+    # A linha sem Entry é descartada; as demais ficam em ordem de chegada.
+    np.testing.assert_allclose(trace.chegadas, [0.0, 10.0])
+    np.testing.assert_array_equal(trace.prioridades, [1, 0])
+    np.testing.assert_allclose(trace.atendimento, [1.0, 2.0])
+    np.testing.assert_allclose(trace.servicos, [22.0, 30.0])
+    np.testing.assert_array_equal(trace.simples, [True, False])
+
+
+def test_comparacao_sem_e_com_chatbot():
+    tabela = compare_replay(_trace(), [1, 2], fator_chatbot=0.5, aquecimento=0.0)
+    assert list(tabela['Unidades']) == [1, 2]
+    uma_unidade = tabela.iloc[0]
+    assert uma_unidade['Espera média sem chatbot (min)'] == pytest.approx(8 / 3)
+    assert uma_unidade['Espera média com chatbot (min)'] == pytest.approx(10 / 3)
+    assert uma_unidade['Diferença da espera média (min)'] == pytest.approx(2 / 3)
+
+
+def test_comparacao_sem_p90_configurado(monkeypatch):
+    monkeypatch.setattr(config, "QUANTIS_METRICAS", (0.5,))
+    tabela = compare_replay(_trace(), [1], aquecimento=0.0)
+    assert [c for c in tabela.columns if c.startswith('P')] == ['P50 sem chatbot (min)', 'P50 com chatbot (min)']
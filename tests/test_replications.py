@@ -0,0 +1,60 @@
+# tests/test_replications.py
+import numpy as np
+import pandas as pd
+import pytest
+import scipy.stats as st
+
+from src.simulation.metrics import t_quantile
+from src.simulation.replications import build_jobs, run_replications, summarize_replications
+
+
+def test_mesma_semente_por_replicacao_em_todos_os_cenarios():
+    jobs = build_jobs([2, 4], 3, seed=5)
+    assert [(u, r) for u, r, _ in jobs] == [(2, 0), (2, 1), (2, 2), (4, 0), (4, 1), (4, 2)]
+    estado = lambda semente: tuple(semente.generate_state(4))
+    por_cenario = {}
+    for num_unidades, replicacao, semente in jobs:
+        por_cenario.setdefault(num_unidades, []).append(estado(semente))
+    assert por_cenario[2] == por_cenario[4]
+    assert len(set(por_cenario[2])) == 3
+    assert [estado(s) for _, _, s in build_jobs([2, 4], 3, seed=5)] == [estado(s) for _, _, s in jobs]
+    assert [estado(s) for _, _, s in build_jobs([2, 4], 3, seed=6)] != [estado(s) for _, _, s in jobs]
+
+
+def test_intervalo_de_confianca_calculado_a_mao():
+    esperas = {2: [10.0, 14.0, 12.0], 3: [4.0, 5.0, 6.0]}
+    df = pd.DataFrame([
+        {'Unidades': u, 'Replicação': r, 'Tempo médio de espera (min)': valor, 'Chamadas Atendidas': 100}
+        for u, valores in esperas.items() for r, valor in enumerate(valores)
+    ])
+    resumo = summarize_replications(df).set_index('Unidades')
+    for num_unidades, valores in esperas.items():
+        valores = np.array(valores)
+        assert resumo.loc[num_unidades, 'Replicações'] == 3
+        assert resumo.loc[num_unidades, 'Tempo médio de espera (min)'] == pytest.approx(valores.mean())
+        meia_largura = t_quantile(0.95, 2) * valores.std(ddof=1) / np.sqrt(3)
+        assert resumo.loc[num_unidades, 'Tempo médio de espera (min) ± IC95%'] == pytest.approx(meia_largura)
+    # Só as métricas de tempo médio ganham IC.
+    assert 'Chamadas Atendidas' not in resumo.columns
+
+
+def test_replicacoes_sao_reprodutiveis():
+    gerador = np.random.default_rng(2)
+    triagens = [
+        (int(p), 'Simples' if s else 'Complexo')
+        for p, s in zip(gerador.integers(0, 2, 400), gerador.random(400) < 0.5)
+    ]
+    distributions = {
+        "chegadas": (st.expon, (0, 1.0)),
+        "atendimento_humano": (st.lognorm, (0.5, 0, 3.0)),
+        "atendimento_simples": (st.expon, (0, 0.5)),
+        "servico_bombeiros": (st.expon, (0, 2.5)),
+    }
+    jobs = build_jobs([2, 3], 3, seed=9)
+    df, resumo = run_replications(jobs, triagens, distributions, max_workers=2)
+    de_novo, _ = run_replications(jobs, triagens, distributions, max_workers=1)
+    pd.testing.assert_frame_equal(df, de_novo)
+    assert len(df) == 6 and (df['Chamadas Atendidas'] == len(triagens)).all()
+    # Replicações diferentes usam sementes diferentes.
+    assert df.groupby('Unidades')['Tempo médio de espera (min)'].nunique().eq(3).all()
+    assert list(resumo['Replicações']) == [3, 3]
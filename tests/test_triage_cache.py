@@ -0,0 +1,95 @@
+# tests/test_triage_cache.py
+from src.agent import cache as cache_module
+from src.agent.cache import TriageCache
+
+INFO_FOGO = {"call_type": "Structure Fire", "call_type_group": "Fire", "original_priority": 3}
+INFO_QUEDA = {"call_type": "Fall", "call_type_group": "Non Life-threatening", "original_priority": 2}
+
+
+def test_lru_descarta_a_entrada_menos_usada(tmp_path):
+    cache = TriageCache(str(tmp_path / "triagem.sqlite"), max_entries=3)
+    for texto in ("a", "b", "c"):
+        cache.put(texto, INFO_FOGO, "Complexo", "v1")
+    assert cache.get("a") is not None  # "a" passa a ser a mais recente
+    cache.put("d", INFO_FOGO, "Complexo", "v1")
+    assert len(cache) == 3
+    assert cache.get("b") is None
+    assert all(cache.get(texto) is not None for texto in ("a", "c", "d"))
+    assert cache.stats()['hits'] == 4 and cache.stats()['misses'] == 1
+
+
+def test_lru_persiste_entre_aberturas(tmp_path):
+    caminho = str(tmp_path / "triagem.sqlite")
+    cache = TriageCache(caminho, max_entries=2)
+    cache.put("a", INFO_FOGO, "Complexo", "v1")
+    cache.put("b", INFO_FOGO, "Complexo", "v1")
+    cache.get("a")
+    cache.close()
+    reaberto = TriageCache(caminho, max_entries=2)
+    reaberto.put("c", INFO_FOGO, "Complexo", "v1")
+    assert reaberto.get("b") is None
+    assert reaberto.get("a") is not None
+
+
+def test_chave_muda_com_o_modelo_do_llm(tmp_path, monkeypatch):
+    cache = TriageCache(str(tmp_path / "triagem.sqlite"))
+    cache.put("a", INFO_FOGO, "Complexo", "v1")
+    monkeypatch.setattr(cache_module.config, "OLLAMA_MODEL", "outro-modelo")
+    assert cache.get("a") is None
+
+
+def test_segunda_execucao_nao_chama_o_llm(agente_offline):
+    respostas = {"prédio pegando fogo": INFO_FOGO, "idoso caiu em casa": INFO_QUEDA}
+    primeiro = agente_offline(respostas)
+    resultados = primeiro.classify_calls(list(respostas))
+    assert primeiro.enviados_llm == list(respostas)
+
+    segundo = agente_offline(respostas)
+    assert segundo.classify_calls(list(respostas)) == resultados
+    assert segundo.enviados_llm == []
+
+
+def test_novo_classificador_refaz_so_a_decisao(agente_offline):
+    respostas = {"prédio pegando fogo": INFO_FOGO, "idoso caiu em casa": INFO_QUEDA}
+    antigo = agente_offline(respostas, assinatura="v1")
+    assert [r['decisao_final'] for r in antigo.classify_calls(list(respostas))] == ["Complexo", "Simples"]
+
+    # O novo classificador considera complexas também as chamadas de prioridade 2.
+    novo = agente_offline(respostas, limite_complexo=2, assinatura="v2")
+    resultados = novo.classify_calls(list(respostas))
+    assert novo.enviados_llm == []
+    assert [r['decisao_final'] for r in resultados] == ["Complexo", "Complexo"]
+    assert [r['info_extraida'] for r in resultados] == [INFO_FOGO, INFO_QUEDA]
+    # A nova decisão fica gravada com a assinatura do novo classificador.
+    entrada = novo.cache.get("idoso caiu em casa")
+    assert entrada['decisao_final'] == "Complexo"
+    assert entrada['assinatura_classificador'] == "v2"
+
+
+def test_acertos_do_lote_atualizam_o_lru_em_um_commit(tmp_path):
+    cache = TriageCache(str(tmp_path / "triagem.sqlite"), max_entries=4)
+    for texto in ("a", "b", "c", "d"):
+        cache.put(texto, INFO_FOGO, "Complexo", "v1")
+    comandos = []
+    cache.conn.set_trace_callback(comandos.append)
+    encontrados = cache.get_many(["c", "a", "x"])
+    cache.conn.set_trace_callback(None)
+
+    assert set(encontrados) == {"c", "a"}
+    assert encontrados["a"]["assinatura_classificador"] == "v1"
+    assert cache.stats()['hits'] == 2 and cache.stats()['misses'] == 1
+    assert sum(comando.startswith("UPDATE") for comando in comandos) == 2
+    assert comandos.count("COMMIT") == 1
+    # "b" e "d" ficaram sem acesso: são os primeiros a sair.
+    cache.put_many([("e", INFO_FOGO, "Complexo", "v1"), ("f", INFO_FOGO, "Complexo", "v1")])
+    assert cache.peek_many("abcdef").keys() == {"a", "c", "e", "f"}
+
+
+def test_lote_em_cache_faz_um_commit(agente_offline):
+    respostas = {"prédio pegando fogo": INFO_FOGO, "idoso caiu em casa": INFO_QUEDA}
+    agente_offline(respostas).classify_calls(list(respostas))
+    agente = agente_offline(respostas)
+    comandos = []
+    agente.cache.conn.set_trace_callback(comandos.append)
+    agente.classify_calls(list(respostas) * 3)
+    assert comandos.count("COMMIT") == 1
@@ -0,0 +1,101 @@
+# tests/test_triage_service.py
+import threading
+import time
+
+from src.agent.triage_service import PrefetchedTriages, TriageService
+
+
+class AgenteLento:
+    """
+    Agente de teste: cada lote espera `liberar` antes de responder e fica registrado em
+    `lotes`. A prioridade da triagem é a paridade do tamanho do texto, para conferir a ordem.
+    """
+
+    def __init__(self):
+        self.liberar = threading.Event()
+        self.lotes = []
+
+    def classify_calls(self, textos):
+        self.lotes.append(list(textos))
+        self.liberar.wait(5)
+        return [
+            {"info_extraida": {"original_priority": 3 - len(texto) % 2, "call_type_group": "Fire"},
+             "decisao_final": "Complexo"}
+            for texto in textos
+        ]
+
+
+def _esperar(condicao, limite=5.0):
+    fim = time.monotonic() + limite
+    while not condicao():
+        assert time.monotonic() < fim, "tempo esgotado"
+        time.sleep(0.005)
+
+
+def test_pedidos_do_mesmo_texto_sao_coalescidos():
+    agente = AgenteLento()
+    with TriageService(agente, max_pendentes=8, tamanho_lote=4) as servico:
+        primeiro = servico.submit("incêndio")
+        _esperar(lambda: agente.lotes)
+        # Enquanto o lote está no agente, o mesmo texto reaproveita o pedido em andamento.
+        assert servico.submit("incêndio") is primeiro
+        agente.liberar.set()
+        assert primeiro.result(5) == (0, "Complexo", "Fire")
+        # Depois de resolvido, vem da memória de resultados recentes.
+        assert servico.submit("incêndio").result(0) == (0, "Complexo", "Fire")
+        stats = servico.stats()
+    assert agente.lotes == [["incêndio"]]
+    assert stats['pedidos'] == 3 and stats['coalescidos'] == 2 and stats['enviados'] == 1
+
+
+def test_contrapressao_limita_os_textos_pendentes():
+    agente = AgenteLento()
+    with TriageService(agente, max_pendentes=2, tamanho_lote=2) as servico:
+        servico.submit("a")
+        servico.submit("bb")
+        bloqueado = threading.Thread(target=servico.submit, args=("ccc",))
+        bloqueado.start()
+        bloqueado.join(0.2)
+        # Dois textos distintos já aguardam: o terceiro pedido espera uma vaga.
+        assert bloqueado.is_alive()
+        agente.liberar.set()
+        bloqueado.join(5)
+        assert not bloqueado.is_alive()
+        stats = servico.stats()
+    assert stats['bloqueios'] == 1
+    assert all(len(lote) <= 2 for lote in agente.lotes)
+    assert sorted(texto for lote in agente.lotes for texto in lote) == ["a", "bb", "ccc"]
+
+
+def test_llm_recebe_no_maximo_max_concurrency_pedidos(agente_offline):
+    info = {"call_type": "Fall", "call_type_group": "Non Life-threatening", "original_priority": 2}
+    textos = [f"chamada {i}" for i in range(12)]
+    agente = agente_offline(dict.fromkeys(textos, info))
+    simultaneos = {'atual': 0, 'maximo': 0}
+    trava = threading.Lock()
+    extrair = agente.extraction_chain.invoke
+
+    def extrair_devagar(entrada):
+        with trava:
+            simultaneos['atual'] += 1
+            simultaneos['maximo'] = max(simultaneos['maximo'], simultaneos['atual'])
+        time.sleep(0.02)
+        with trava:
+            simultaneos['atual'] -= 1
+        return extrair(entrada)
+
+    agente._extract = extrair_devagar
+    agente.classify_calls(textos, max_concurrency=3)
+    assert sorted(agente.enviados_llm) == sorted(textos)
+    assert 1 < simultaneos['maximo'] <= 3
+
+
+def test_triagem_antecipada_preserva_a_ordem():
+    agente = AgenteLento()
+    agente.liberar.set()
+    textos = ["a", "bb", "a", "ccc", "dddd", "bb", "a"]
+    triagens = PrefetchedTriages(textos, agente, antecedencia=3, max_pendentes=4, tamanho_lote=2)
+    assert [triagem[0] for triagem in triagens] == [len(texto) % 2 for texto in textos]
+    assert triagens.ultimo_stats['enviados'] == 4
+    # Reiterável: uma nova passada repete a mesma sequência.
+    assert len(list(triagens)) == len(textos)